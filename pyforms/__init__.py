@@ -21,6 +21,7 @@ from pyforms.src.treeview import TreeView, TreeNode
 from pyforms.src.colors import Color
 from pyforms.src.enums import *
 from pyforms.src.dialogs import FileOpenDialog, FileSaveDialog, FolderBrowserDialog
+from pyforms.src.autocomplete import AutoComplete
 from pyforms.src.control import connect
 from pyforms.src.commons import Font, sendThreadMsg
 
@@ -0,0 +1,106 @@
+# Created on 17-Oct-2026 07:05:00
+# acbench module - AutoComplete benchmark.
+# A user types a word into a TextBox, one key in every 'gap' ms. A lookup takes 'cost' ms.
+# Old way is a lookup in onTextChanged, which blocks the UI thread on every key press.
+# Then the same typing with AutoComplete. We count the lookups & the time the UI thread
+# was busy in the key press handlers. Last part types into a ComboBox and deletes the
+# text, to check that the combo's own items come back after the suggestions.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.acbench [key gap ms] [lookup cost ms]
+
+import sys, time, io, contextlib
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.commons import MyMessages
+from pyforms.src.forms import Form
+from pyforms.src.textbox import TextBox
+from pyforms.src.combobox import ComboBox
+from pyforms.src.autocomplete import AutoComplete
+
+WORDS = [f"{prefix}{i}" for prefix in ("auto", "autumn", "author", "avenue") for i in range(2000)]
+
+
+def makeLookup(cost, counter):
+    def lookup(text, cancelled = None):
+        counter["lookups"] += 1
+        end = time.perf_counter() + cost / 1000
+        while time.perf_counter() < end: # Works in small steps, like a query which checks the flag.
+            if cancelled and cancelled.is_set(): return []
+            time.sleep(0.001)
+        return [w for w in WORDS if w.startswith(text)]
+    return lookup
+
+
+def runLoop(ms):
+    # Message loop of the simulator for 'ms' milli seconds of real time.
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        sim.advance(1)
+        sim.pump()
+        time.sleep(0.001)
+
+
+def typeWord(ctl, word, gap, texts = None):
+    # Returns the time spent in the change handlers.
+    busy = 0.0
+    code = con.CBN_EDITCHANGE if isinstance(ctl, ComboBox) else con.EN_CHANGE
+    for text in texts or [word[:i] for i in range(1, len(word) + 1)]:
+        api.SetWindowText(ctl._hwnd, text)
+        start = time.perf_counter()
+        sim.send(ctl._hwnd, MyMessages.CTL_COMMAND, code << 16, 0)
+        busy += time.perf_counter() - start
+        runLoop(gap)
+    return busy
+
+
+def main(gap = 60, cost = 100):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    frm = Form("AutoComplete bench")
+    frm.createHandle()
+    tbOld = TextBox(frm, 10, 10)
+    tbNew = TextBox(frm, 10, 50)
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+    word = "autumn19"
+    print(f"Typing {word!r}, a key in every {gap} ms, lookup cost {cost} ms\n")
+
+    oldCount = {"lookups": 0}
+    oldShown = []
+    oldLookup = makeLookup(cost, oldCount)
+    tbOld.onTextChanged = lambda tb, e: oldShown.append(len(oldLookup(tb.text)))
+    busy = typeWord(tbOld, word, gap)
+    print(f"    onTextChanged : UI busy {busy * 1000:.1f} ms, {oldCount['lookups']} lookups, last shown {oldShown[-1]} items")
+
+    newCount = {"lookups": 0}
+    newShown = []
+    ac = AutoComplete(tbNew, makeLookup(cost, newCount), delay = 150)
+    ac.onResults = lambda tb, text, results: newShown.append(len(results))
+    busy = typeWord(tbNew, word, gap)
+    runLoop(ac.delay + cost + 100) # Wait for the last one.
+    print(f"    AutoComplete  : UI busy {busy * 1000:.1f} ms, {newCount['lookups']} lookups, last shown {newShown[-1] if newShown else None} items")
+    print(f"    stats         : {ac.stats()}")
+
+    cmb = ComboBox(frm, 10, 90, items = ["autumn leaves", "blue", "green"])
+    cmb.enableInput = True
+    cmb.createHandle()
+    items = list(cmb.items)
+    cmbAc = AutoComplete(cmb, makeLookup(0, {"lookups": 0}), delay = 20, minChars = 2)
+    typeWord(cmb, word, 10)
+    runLoop(200)
+    shown = cmb.visibleCount
+    typeWord(cmb, word, 10, [word[:i] for i in range(len(word) - 1, -1, -1)]) # Back space till empty.
+    runLoop(200)
+    dropDown = sim.window(cmb._hwnd).items
+    print(f"\n    ComboBox      : {shown} suggestions shown, items kept {cmb.items == items and dropDown == items}")
+    frm.close()
+    sim.pump()
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:3]]
+    main(*args)
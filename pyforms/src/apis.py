@@ -1,9 +1,10 @@
 
 # Created on 13-Nov-2022 15:06:46
-from ctypes import WINFUNCTYPE, Structure, windll, POINTER, c_void_p
+from ctypes import Structure, POINTER, c_void_p
 from ctypes.wintypes import HICON, HWND, UINT, DWORD, LONG, HDC, LPCWSTR, LPWSTR, INT, HMENU, HINSTANCE, LPVOID, USHORT
 from ctypes.wintypes import HMODULE, ATOM, BOOL, HBRUSH, HGDIOBJ, HBITMAP, COLORREF, HPEN, HANDLE, BYTE, WCHAR, HFONT, WORD, HRGN
 import ctypes as ct
+import os, sys
 # from .colors import clrReffrom_RGB
 
 LONG_PTR = ct.c_longlong
@@ -18,6 +19,17 @@ LPARAM = LONG_PTR
 PUINT = POINTER(UINT)
 HTREEITEM = HANDLE
 
+# -region Backend
+# Real Win32 dlls on Windows. Otherwise (or if PYFORMS_BACKEND=sim) the headless simulator in simwin.
+# simwin imports constants module, which imports ULONG_PTR from here. So this must be after the types.
+BACKEND = os.environ.get("PYFORMS_BACKEND", "win32" if sys.platform == "win32" else "sim").lower()
+if BACKEND == "sim":
+    from ctypes import CFUNCTYPE as WINFUNCTYPE
+    from pyforms.src.simwin import windll
+else:
+    from ctypes import WINFUNCTYPE, windll
+# -endregion Backend
+
 WNDPROC = WINFUNCTYPE(LRESULT, HWND, UINT, WPARAM, LPARAM)
 SUBCLASSPROC = WINFUNCTYPE(LRESULT, HWND, UINT, WPARAM, LPARAM, UINT_PTR, DWORD_PTR)
 LPOFNHOOKPROC = WINFUNCTYPE(UINT_PTR, HWND, UINT, WPARAM, LPARAM)
@@ -301,6 +313,13 @@ class LVITEMW(Structure):
 
 LPLVITEMW = POINTER(LVITEMW)
 
+class NMLVDISPINFOW(Structure):
+    _fields_ = [
+        ("hdr", NMHDR),
+        ("item", LVITEMW),
+    ]
+LPNMLVDISPINFOW = POINTER(NMLVDISPINFOW)
+
 class HDITEM(Structure):
     _fields_ = [
         ("mask", UINT),
@@ -327,6 +346,21 @@ class HDLAYOUT(Structure):
 
 LPHDLAYOUT = POINTER(HDLAYOUT)
 
+class BITMAPINFOHEADER(Structure):
+    _fields_ = [
+        ("biSize", DWORD),
+        ("biWidth", LONG),
+        ("biHeight", LONG),
+        ("biPlanes", WORD),
+        ("biBitCount", WORD),
+        ("biCompression", DWORD),
+        ("biSizeImage", DWORD),
+        ("biXPelsPerMeter", LONG),
+        ("biYPelsPerMeter", LONG),
+        ("biClrUsed", DWORD),
+        ("biClrImportant", DWORD),
+    ]
+
 class NMITEMACTIVATE(Structure):
     _fields_ = [
         ("hdr", NMHDR),
@@ -414,6 +448,38 @@ class NMTVCUSTOMDRAW(Structure):
     ]
 LPNMTVCUSTOMDRAW = POINTER(NMTVCUSTOMDRAW)
 
+class TVITEMW(Structure):
+    _fields_ = [
+        ("mask", UINT),
+        ("hItem", HTREEITEM),
+        ("state", UINT),
+        ("stateMask", UINT),
+        ("pszText", LPWSTR),
+        ("cchTextMax", INT),
+        ("iImage", INT),
+        ("iSelectedImage" , INT),
+        ("cChildren", INT),
+        ("lParam", LPARAM),
+    ]
+LPTVITEMW = POINTER(TVITEMW)
+
+class NMTREEVIEWW(Structure):
+    _fields_ = [
+        ("hdr", NMHDR),
+        ("action", UINT),
+        ("itemOld", TVITEMW),
+        ("itemNew", TVITEMW),
+        ("ptDrag", POINT),
+    ]
+LPNMTREEVIEWW = POINTER(NMTREEVIEWW)
+
+class NMTVDISPINFOW(Structure):
+    _fields_ = [
+        ("hdr", NMHDR),
+        ("item", TVITEMW),
+    ]
+LPNMTVDISPINFOW = POINTER(NMTVDISPINFOW)
+
 class MENUINFO(Structure):
     _fields_ = [
         ("cbSize", DWORD),
@@ -629,6 +695,16 @@ DrawEdge = windll.user32.DrawEdge
 DrawEdge.argtypes = (HDC, LPRECT, UINT, UINT )
 DrawEdge.restype = BOOL
 
+DrawFocusRect = windll.user32.DrawFocusRect
+""" (HDC, LPRECT, ) -> BOOL"""
+DrawFocusRect.argtypes = (HDC, LPRECT, )
+DrawFocusRect.restype = BOOL
+
+GetSysColor = windll.user32.GetSysColor
+""" (INT, ) -> DWORD"""
+GetSysColor.argtypes = (INT, )
+GetSysColor.restype = DWORD
+
 SendMessage = windll.user32.SendMessageW
 """ [HWND, UINT, WPARAM, LPARAM] -> LRESULT"""
 SendMessage.argtypes = [HWND, UINT, WPARAM, LPARAM]
@@ -639,6 +715,26 @@ SendNotifyMessage = windll.user32.SendNotifyMessageW
 SendNotifyMessage.argtypes = [HWND, UINT, WPARAM, LPARAM]
 SendNotifyMessage.restype = BOOL
 
+PostMessage = windll.user32.PostMessageW
+""" [HWND, UINT, WPARAM, LPARAM] -> BOOL"""
+PostMessage.argtypes = [HWND, UINT, WPARAM, LPARAM]
+PostMessage.restype = BOOL
+
+PeekMessage = windll.user32.PeekMessageW
+""" [POINTER(MSG), HWND, UINT, UINT, UINT] -> BOOL"""
+PeekMessage.argtypes = [POINTER(MSG), HWND, UINT, UINT, UINT]
+PeekMessage.restype = BOOL
+
+MsgWaitForMultipleObjectsEx = windll.user32.MsgWaitForMultipleObjectsEx
+""" [DWORD, POINTER(HANDLE), DWORD, DWORD, DWORD] -> DWORD"""
+MsgWaitForMultipleObjectsEx.argtypes = [DWORD, POINTER(HANDLE), DWORD, DWORD, DWORD]
+MsgWaitForMultipleObjectsEx.restype = DWORD
+
+GetMessagePos = windll.user32.GetMessagePos
+""" () -> DWORD"""
+GetMessagePos.argtypes = []
+GetMessagePos.restype = DWORD
+
 GetSystemMetrics = windll.user32.GetSystemMetrics
 """ (INT,) -> INT"""
 GetSystemMetrics.argtypes = (INT,)
@@ -759,6 +855,21 @@ SetWindowPos = windll.user32.SetWindowPos
 SetWindowPos.argtypes = [HWND, HWND, INT, INT, INT, INT, UINT]
 SetWindowPos.restype = BOOL
 
+BeginDeferWindowPos = windll.user32.BeginDeferWindowPos
+""" [INT] -> HDWP"""
+BeginDeferWindowPos.argtypes = [INT]
+BeginDeferWindowPos.restype = HANDLE
+
+DeferWindowPos = windll.user32.DeferWindowPos
+""" [HDWP, HWND, HWND, INT, INT, INT, INT, UINT] -> HDWP"""
+DeferWindowPos.argtypes = [HANDLE, HWND, HWND, INT, INT, INT, INT, UINT]
+DeferWindowPos.restype = HANDLE
+
+EndDeferWindowPos = windll.user32.EndDeferWindowPos
+""" [HDWP] -> BOOL"""
+EndDeferWindowPos.argtypes = [HANDLE]
+EndDeferWindowPos.restype = BOOL
+
 GetDCEx = windll.user32.GetDCEx
 """ [HWND, HRGN, DWORD] -> HDC"""
 GetDCEx.argtypes = [HWND, HRGN, DWORD]
@@ -963,6 +1074,11 @@ CreateCompatibleBitmap = windll.gdi32.CreateCompatibleBitmap
 CreateCompatibleBitmap.argtypes = [HDC, INT, INT]
 CreateCompatibleBitmap.restype = HBITMAP
 
+CreateDIBSection = windll.gdi32.CreateDIBSection
+""" [HDC, POINTER(BITMAPINFOHEADER), UINT, POINTER(c_void_p), HANDLE, DWORD] -> HBITMAP"""
+CreateDIBSection.argtypes = [HDC, POINTER(BITMAPINFOHEADER), UINT, POINTER(c_void_p), HANDLE, DWORD]
+CreateDIBSection.restype = HBITMAP
+
 CreateFontIndirect = windll.gdi32.CreateFontIndirectW
 """ [LOGFONTPTR] -> HFONT"""
 CreateFontIndirect.argtypes = [LOGFONTPTR]
@@ -998,6 +1114,11 @@ LineTo = windll.gdi32.LineTo
 LineTo.argtypes = [HDC, INT, INT]
 LineTo.restype = BOOL
 
+PolyPolyline = windll.gdi32.PolyPolyline
+""" [HDC, POINTER(POINT), POINTER(DWORD), DWORD] -> BOOL"""
+PolyPolyline.argtypes = [HDC, POINTER(POINT), POINTER(DWORD), DWORD]
+PolyPolyline.restype = BOOL
+
 GetTextAlign = windll.gdi32.GetTextAlign
 """ [HDC] -> UINT"""
 GetTextAlign.argtypes = [HDC]
@@ -1056,8 +1177,52 @@ MulDiv.restype = INT
 GetLastError = windll.kernel32.GetLastError
 """NONE -> DWORD"""
 GetLastError.restype = DWORD
+
+CreateWaitableTimerEx = windll.kernel32.CreateWaitableTimerExW
+""" [LPVOID, LPCWSTR, DWORD, DWORD] -> HANDLE"""
+CreateWaitableTimerEx.argtypes = [LPVOID, LPCWSTR, DWORD, DWORD]
+CreateWaitableTimerEx.restype = HANDLE
+
+SetWaitableTimer = windll.kernel32.SetWaitableTimer
+""" [HANDLE, POINTER(LARGE_INTEGER), LONG, LPVOID, LPVOID, BOOL] -> BOOL"""
+SetWaitableTimer.argtypes = [HANDLE, POINTER(ct.c_longlong), LONG, LPVOID, LPVOID, BOOL]
+SetWaitableTimer.restype = BOOL
+
+CancelWaitableTimer = windll.kernel32.CancelWaitableTimer
+""" [HANDLE] -> BOOL"""
+CancelWaitableTimer.argtypes = [HANDLE]
+CancelWaitableTimer.restype = BOOL
+
+CloseHandle = windll.kernel32.CloseHandle
+""" [HANDLE] -> BOOL"""
+CloseHandle.argtypes = [HANDLE]
+CloseHandle.restype = BOOL
 # -endregion KERNEL32 Functions
 
+# -region WS2_32 Functions
+SOCKET = UINT_PTR
+
+WSACreateEvent = windll.ws2_32.WSACreateEvent
+""" () -> HANDLE"""
+WSACreateEvent.argtypes = []
+WSACreateEvent.restype = HANDLE
+
+WSAEventSelect = windll.ws2_32.WSAEventSelect
+""" [SOCKET, HANDLE, LONG] -> INT"""
+WSAEventSelect.argtypes = [SOCKET, HANDLE, LONG]
+WSAEventSelect.restype = INT
+
+WSAResetEvent = windll.ws2_32.WSAResetEvent
+""" [HANDLE] -> BOOL"""
+WSAResetEvent.argtypes = [HANDLE]
+WSAResetEvent.restype = BOOL
+
+WSACloseEvent = windll.ws2_32.WSACloseEvent
+""" [HANDLE] -> BOOL"""
+WSACloseEvent.argtypes = [HANDLE]
+WSACloseEvent.restype = BOOL
+# -endregion WS2_32 Functions
+
 #==================================================================================MISCS
 # -region MISC DLL Functions
 DefSubclassProc = windll.comctl32.DefSubclassProc
@@ -0,0 +1,89 @@
+# asyncbench module - Wake up check for the asyncio message loop.
+# A window message handler schedules loop work (call_soon, create_task).
+# Then the selector must not go into a blocking wait with that work unrun.
+# Simulator has no kernel objects. So the wait & WSA event functions are replaced
+# with stand-ins which record the timeout, and the event path is forced on.
+# Needs the simulator backend. It's the default on non Windows systems.
+# Usage: python -m pyforms.src.asyncbench [rounds]
+
+import sys, time, io, asyncio, contextlib
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.commons import MyMessages
+from pyforms.src.forms import Form
+from pyforms.src.asyncloop import MsgLoop
+
+
+class WaitRecorder:
+    """Stand-in for MsgWaitForMultipleObjectsEx. Records each timeout and
+        whether the loop had ready callbacks when it was asked to wait."""
+    def __init__(self, loop) -> None:
+        self.loop = loop
+        self.waits = 0
+        self.blocked = 0 # Blocking waits with ready callbacks. Must be zero.
+
+    def __call__(self, count, handles, ms, mask, flags):
+        self.waits += 1
+        if ms == con.INFINITE and self.loop._ready: self.blocked += 1
+        time.sleep(min(ms, 10) / 1000) # Don't hang if we got it wrong.
+        return con.WAIT_TIMEOUT
+
+
+def patchEvents(loop):
+    rec = WaitRecorder(loop)
+    loop._selector._useEvents = True
+    api.MsgWaitForMultipleObjectsEx = rec
+    api.WSACreateEvent = lambda: 1
+    api.WSAEventSelect = lambda fd, hev, flags: 0
+    api.WSAResetEvent = lambda hev: 1
+    api.WSACloseEvent = lambda hev: 1
+    return rec
+
+
+def main(rounds = 200):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    frm = Form("Async bench")
+    frm.createHandle()
+    with contextlib.redirect_stdout(io.StringIO()): frm.display()
+    sim.pump()
+
+    loop = MsgLoop()
+    rec = patchEvents(loop)
+    pending = []
+    async def setLater(fut): fut.set_result(None)
+    def onThreadMsg(wp, lp):
+        # Like a click handler. Work is scheduled after asyncio computed the timeout.
+        fut = pending.pop()
+        if wp:
+            loop.create_task(setLater(fut))
+        else:
+            loop.call_soon(fut.set_result, None)
+
+    frm.onThreadMsg = onThreadMsg
+    async def driver():
+        for i in range(rounds):
+            fut = loop.create_future()
+            pending.append(fut)
+            api.PostMessage(frm.handle, MyMessages.THREAD_MSG, i & 1, 0)
+            await fut # Nothing else to do. So asyncio asks the selector to wait forever.
+
+    start = time.perf_counter()
+    try:
+        loop.run_until_complete(driver())
+    finally:
+        loop.close()
+    elapsed = time.perf_counter() - start
+    frm.close()
+    sim.pump()
+    print(f"{rounds} messages which schedule loop work\n")
+    print(f"    time           : {elapsed * 1000:.2f} ms")
+    print(f"    waits          : {rec.waits}")
+    print(f"    blocked waits  : {rec.blocked} (must be 0)")
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:2]]
+    main(*args)
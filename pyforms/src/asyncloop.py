@@ -0,0 +1,140 @@
+# Created on 17-Oct-2026 03:05:00
+# asyncloop module - An asyncio event loop which runs the Win32 message loop too.
+# Window messages are dispatched from the selector. So coroutines can update
+# the controls directly, without a thread hop or a polling timer.
+# Usage: frm.runAsync(main()) or asyncio.set_event_loop_policy(MsgLoopPolicy())
+
+import asyncio, selectors, math
+from ctypes import byref
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.commons import IdleQueue
+from pyforms.src.timers import TimerWheel
+
+_readEvents = con.FD_READ | con.FD_ACCEPT | con.FD_CLOSE
+_writeEvents = con.FD_WRITE | con.FD_CONNECT | con.FD_CLOSE
+
+
+class MsgSelector(selectors.SelectSelector):
+    """A select() based selector which dispatches the window messages while it waits.
+        Sockets get a WSA event each, so MsgWaitForMultipleObjectsEx can wait on both."""
+    _maxHandles = con.MAXIMUM_WAIT_OBJECTS - 1 # One is for the message queue.
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._msg = api.MSG()
+        self._events = {} # Key - socket fd, Value - WSA event handle
+        self._useEvents = api.BACKEND == "win32" # Simulator has no kernel objects to wait on.
+        self.onQuit = None # Called with the exit code when WM_QUIT comes.
+        self.loop = None # MsgLoop sets itself here. We check it's ready callbacks before waiting.
+        self._dispatched = False # True if the last pumpMessages dispatched anything.
+
+    def register(self, fileobj, events, data = None):
+        key = super().register(fileobj, events, data)
+        if self._useEvents:
+            flags = (_readEvents if events & selectors.EVENT_READ else 0) | (_writeEvents if events & selectors.EVENT_WRITE else 0)
+            hev = api.WSACreateEvent()
+            api.WSAEventSelect(key.fd, hev, flags)
+            self._events[key.fd] = hev
+        return key
+
+    def unregister(self, fileobj):
+        key = super().unregister(fileobj)
+        hev = self._events.pop(key.fd, None)
+        if hev:
+            api.WSAEventSelect(key.fd, None, 0) # Socket might be closed already. That's fine.
+            api.WSACloseEvent(hev)
+        return key
+
+    def close(self):
+        for hev in self._events.values(): api.WSACloseEvent(hev)
+        self._events.clear()
+        super().close()
+
+    def select(self, timeout = None):
+        # asyncio computed the timeout before calling us. But the handlers we run here can
+        # schedule new work (create_task, call_soon, set_result). If so, we must not block.
+        if not self.pumpMessages(): return []
+        if self._dispatched: timeout = 0
+        if TimerWheel.hiResArmed: TimerWheel.fireDue()
+        if IdleQueue.hasWork():
+            IdleQueue.runSlice()
+            timeout = 0 # More idle work or new messages, we will check them in the next round.
+        if self.loop and self.loop._ready: timeout = 0
+        # Events are reset before the check. So a socket which gets ready after this will wake us.
+        for hev in self._events.values(): api.WSAResetEvent(hev)
+        ready = super().select(0)
+        if ready or (timeout is not None and timeout <= 0): return ready
+        self._wait(timeout)
+        if not self.pumpMessages(): return []
+        return super().select(0)
+
+    def pumpMessages(self) -> bool:
+        """Dispatch all the messages in the queue. Returns False if WM_QUIT is received."""
+        msg = self._msg
+        self._dispatched = False
+        while api.PeekMessage(byref(msg), None, 0, 0, con.PM_REMOVE):
+            if msg.message == con.WM_QUIT:
+                if self.onQuit: self.onQuit(msg.wParam)
+                return False
+            api.TranslateMessage(byref(msg))
+            api.DispatchMessage(byref(msg))
+            IdleQueue.messageDone()
+            self._dispatched = True
+        return True
+
+    def _wait(self, timeout):
+        if not self._useEvents:
+            # Only the sockets can wake us. So messages are checked every 10 ms.
+            super().select(0.01 if timeout is None else min(timeout, 0.01))
+            return
+        ms = con.INFINITE if timeout is None else min(math.ceil(timeout * 1000), con.INFINITE - 1)
+        handles = list(self._events.values())
+        if TimerWheel.hiResArmed: handles.insert(0, TimerWheel._hiResHandle)
+        if len(handles) > self._maxHandles:
+            # Rest of the sockets are checked in every 10 ms.
+            handles = handles[:self._maxHandles]
+            ms = min(ms, 10)
+        harr = (api.HANDLE * len(handles))(*handles)
+        api.MsgWaitForMultipleObjectsEx(len(handles), harr, ms, con.QS_ALLINPUT, con.MWMO_INPUTAVAILABLE)
+#-----------------End of MsgSelector Class----------------------------
+
+
+class MsgLoop(asyncio.SelectorEventLoop):
+    """asyncio event loop which runs the message loop of the forms.
+        Await 'quitFuture' to know when the main form is closed.
+        NOTE: Modal loops (message boxes, menus, moving or sizing a window) will pause
+        the coroutines, just like they pause the other messages."""
+    def __init__(self) -> None:
+        selector = MsgSelector()
+        super().__init__(selector)
+        self.quitFuture = self.create_future()
+        selector.onQuit = self._quitReceived
+        selector.loop = self
+
+    def _quitReceived(self, code):
+        if not self.quitFuture.done(): self.quitFuture.set_result(code)
+
+
+class MsgLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """Event loop policy which makes MsgLoop. Set it before asyncio.run"""
+    def new_event_loop(self): return MsgLoop()
+
+
+def run(form, main = None):
+    """Display the form and run a MsgLoop until the form is closed. 'main' is an
+        optional coroutine to run along with the form. Returns the exit code."""
+    async def runForm():
+        loop = asyncio.get_running_loop()
+        form.display()
+        task = loop.create_task(main) if main else None
+        code = await loop.quitFuture
+        if task and task.done(): task.result() # Raise the error of main, if any.
+        return code
+
+    oldPolicy = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(MsgLoopPolicy())
+    try:
+        return asyncio.run(runForm())
+    finally:
+        asyncio.set_event_loop_policy(oldPolicy)
@@ -0,0 +1,136 @@
+# Created on 17-Oct-2026 06:40:00
+# autocomplete module - Suggestions for the text of a TextBox or an input ComboBox.
+# Key presses only restart a timer. When the user stops typing for 'delay' ms, the
+# lookup function runs on a worker thread. A new key press cancels the running lookup.
+# Results come back to the UI thread with Form.beginInvoke, so they go through the
+# message queue. Results of an old text are dropped, only the newest one is shown.
+
+import threading, traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AutoComplete:
+    """Runs 'lookup' for the text of a TextBox or a ComboBox while the user types.
+        'lookup' is called on a worker thread as lookup(text, cancelled) and returns a list.
+        'cancelled' is a threading.Event. It's set when the text changes, so a long lookup
+        can check it and return early. Results are given to 'onResults' on the UI thread as
+        onResults(control, text, results). Without a handler, a ComboBox shows them in the drop down."""
+    maxWorkers = 2 # Size of the shared worker pool. Set it before the first lookup.
+    _sharedPool = None # Used by all instances. Created on first use.
+    __slots__ = ("_control", "_form", "_lookup", "_pool", "_timer", "_gen", "_cancel", "_future",
+                 "_shownText", "_updating", "_counters", "delay", "minChars", "onResults")
+
+    def __init__(self, control, lookup, delay: int = 150, minChars: int = 1, executor = None) -> None:
+        if not hasattr(control, "_autoComplete"): raise Exception("AutoComplete needs a TextBox or a ComboBox")
+        form = control._parent # Controls are always created on a form, even inside a GroupBox.
+        if control._autoComplete: control._autoComplete.detach()
+        self._control = control
+        self._form = form
+        self._lookup = lookup
+        self._pool = executor # None means the shared pool.
+        self._timer = form.addTimer(delay, self._timerTick)
+        self._gen = 0 # Changes with every text change. Results of an older one are stale.
+        self._cancel = None # Event of the running lookup
+        self._future = None
+        self._shownText = None
+        self._updating = False
+        self._counters = {"changes": 0, "lookups": 0, "cancelled": 0, "stale": 0, "shown": 0}
+        self.delay = delay
+        self.minChars = minChars
+        self.onResults = None
+        control._autoComplete = self
+
+    def cancel(self):
+        """Stop the waiting timer and the running lookup. Nothing will be shown till the next key press."""
+        self._gen += 1
+        self._timer.stop()
+        self._cancelRunning()
+
+    def detach(self):
+        """Cancel everything and remove this from the control. A ComboBox shows it's items again."""
+        self.cancel()
+        if hasattr(self._control, "_endSuggestions"): self._control._endSuggestions()
+        self._form._timerDic.pop(self._timer._idNum, None)
+        if self._control._autoComplete is self: self._control._autoComplete = None
+
+    def stats(self) -> dict:
+        """Returns the text change, lookup, cancelled lookup, dropped (stale) result & shown result counts"""
+        return dict(self._counters)
+
+    # -region Private functions
+
+    def _textChanged(self):
+        # Called by the control for every key press. Just restart the timer.
+        if self._updating: return # We are setting the text ourself.
+        self._counters["changes"] += 1
+        self._gen += 1
+        self._cancelRunning() # It's looking for an old text. No need to wait for the timer.
+        self._timer.interval = self.delay
+        self._timer.start()
+
+    def _cancelRunning(self):
+        if self._cancel:
+            if not self._future.done():
+                self._cancel.set()
+                self._future.cancel() # Works only if it's still waiting in the pool.
+                self._counters["cancelled"] += 1
+            self._cancel = None
+            self._future = None
+
+    def _timerTick(self, sender, e):
+        self._timer.stop()
+        text = self._control._getCtrlText()
+        if text == self._shownText: return # User typed & deleted, we have them already.
+        if len(text) < self.minChars:
+            self._show(text, [])
+            return
+        pool = self._pool or AutoComplete._getPool()
+        self._cancel = threading.Event()
+        self._counters["lookups"] += 1
+        self._future = pool.submit(self._runLookup, self._gen, text, self._cancel)
+
+    def _runLookup(self, gen, text, cancel):
+        # Worker thread
+        if cancel.is_set(): return
+        try:
+            results = self._lookup(text, cancel)
+        except Exception as err:
+            results = err
+        if cancel.is_set(): return # A newer text came. Don't even post it.
+        try:
+            self._form.beginInvoke(self._deliver, gen, text, results)
+        except Exception: # Form is closed.
+            pass
+
+    def _deliver(self, gen, text, results):
+        # UI thread. Only the result of the current text is shown.
+        if gen != self._gen:
+            self._counters["stale"] += 1
+            return
+        self._cancel = None
+        self._future = None
+        if isinstance(results, Exception):
+            traceback.print_exception(results) # Same as an error in a handler. Control keeps working.
+            return
+        self._show(text, results)
+
+    def _show(self, text, results):
+        self._shownText = text
+        self._counters["shown"] += 1
+        self._updating = True
+        try:
+            if self.onResults:
+                self.onResults(self._control, text, results)
+            elif hasattr(self._control, "_showSuggestions"):
+                self._control._showSuggestions(results)
+        finally:
+            self._updating = False
+
+    @classmethod
+    def _getPool(cls):
+        if cls._sharedPool is None:
+            cls._sharedPool = ThreadPoolExecutor(cls.maxWorkers, thread_name_prefix = "autocomplete")
+        return cls._sharedPool
+
+    # -endregion
+#-----------------End of AutoComplete Class----------------------------
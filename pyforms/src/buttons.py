@@ -6,16 +6,15 @@ from ctypes import byref, cast
 
 # import horology
 from pyforms.src.apis import LRESULT, LPNMCUSTOMDRAW, SUBCLASSPROC
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 from pyforms.src.commons import MyMessages, inflateRect
 from pyforms.src.enums import ControlType
 # from . import winmsgs
 import pyforms.src.apis as api
-from pyforms.src.colors import Color, RgbColor, _createGradientBrush
+from pyforms.src.colors import Color, RgbColor, GdiPool, getGradientBrush
 import pyforms.src.constants as con
 
 
-btnDic = {}
 btnStyle = con.WS_CHILD | con.BS_NOTIFY | con.WS_TABSTOP | con.WS_VISIBLE | con.BS_PUSHBUTTON
 txtFlag = con.DT_SINGLELINE | con.DT_VCENTER | con.DT_CENTER | con.DT_NOPREFIX
 
@@ -51,7 +50,7 @@ class Button(Control):
     def createHandle(self):
         self._createControl()
         if self._hwnd:
-            btnDic[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setFontInternal()
             self._setSubclass(btnwndproc)
 
@@ -128,30 +127,13 @@ class Button(Control):
                     if nmcd.dwDrawStage == con.CDDS_PREERASE:
                         return con.CDRF_NOTIFYPOSTERASE
                     elif nmcd.dwDrawStage == con.CDDS_PREPAINT:
-                        if (nmcd.uItemState & 0b1) == 0b1: #--------------mouse click   (plain form clr = -1), (grad form =
-                            if self._gdraw.defbrush == None:
-                                # print("going to create gradient brush for mouse click")
-                                self._gdraw.defbrush = _createGradientBrush(nmcd.hdc, nmcd.rc,
-                                                                                self._gdraw.gcDef.c1,
-                                                                                self._gdraw.gcDef.c2, True)
-
-                            self._drawBkgColor(nmcd, self._gdraw.defbrush, self._gdraw.defpen)
-
-                        elif (nmcd.uItemState & 0b1000000) == 0b1000000: #---mouse over
-                            if self._gdraw.hotbrush == None:
-                                self._gdraw.hotbrush = _createGradientBrush(nmcd.hdc, nmcd.rc,
-                                                                                self._gdraw.gcHot.c1,
-                                                                                self._gdraw.gcHot.c2, True)
-
-                            self._drawBkgColor(nmcd, self._gdraw.hotbrush, self._gdraw.hotpen)
-
-                        else: #--------------------------------------------- Normal button state
-                            if self._gdraw.defbrush == None:
-                                self._gdraw.defbrush = _createGradientBrush(nmcd.hdc, nmcd.rc,
-                                                                                self._gdraw.gcDef.c1,
-                                                                                self._gdraw.gcDef.c2, True)
-
-                            self._drawBkgColor(nmcd, self._gdraw.defbrush, self._gdraw.defpen)
+                        # Gradient brushes are cached by size & colors. So a resize will get a new one.
+                        if (nmcd.uItemState & 0b1000000) == 0b1000000 and (nmcd.uItemState & 0b1) != 0b1: #---mouse over
+                            gc = self._gdraw.gcHot
+                            self._drawBkgColor(nmcd, getGradientBrush(nmcd.rc, gc.c1, gc.c2, True), self._gdraw.hotpen)
+                        else: #--------------------------------------------- Mouse click & normal button state
+                            gc = self._gdraw.gcDef
+                            self._drawBkgColor(nmcd, getGradientBrush(nmcd.rc, gc.c1, gc.c2, True), self._gdraw.defpen)
 
                         if self._drawFlag & 1:
                             self._drawforecolor(nmcd)
@@ -161,21 +143,12 @@ class Button(Control):
 
         return con.CDRF_DODEFAULT
 
-    def _resetBrushes(self):
-        # Button size changed. So we need to reset our...
-        # gradient brushes to zero. So that we can...
-        # recreate these brushes with new size.
-        if self._drawFlag > 3:
-            self.defbrush = 0
-            self.hotbrush = 0
-
     def finalize(self, scID):
-        match self._drawFlag:
-            case 2 | 3: self._fdraw.finalize() # Freeing flat draw resources
-            case 4 | 5: self._gdraw.finalize() # Freeing grad draw resources
+        if self._fdraw: self._fdraw.finalize() # Freeing flat draw resources
+        if self._gdraw: self._gdraw.finalize() # Freeing grad draw resources
 
         api.RemoveWindowSubclass(self._hwnd, btnwndproc, scID)
-        del btnDic[self._hwnd]
+        HwndRegistry.remove(self._hwnd)
 
 
 
@@ -191,17 +164,21 @@ class FlatDraw:
         self.hotpen = None
 
     def setData(self, c: Color):
+        # Brushes & pens are coming from GdiPool. Give back the old ones first.
+        self.finalize()
         adj = 1.5 if c.isDark() else 1.2
-        self.defbrush = c.createHBrush()
-        self.hotbrush = c.createHBrush(adj)
-        self.defpen = c.createHPen(0.8)
-        self.hotpen = c.createHPen(0.4)
+        self.defbrush = c.getBrush()
+        self.hotbrush = c.getBrush(adj)
+        self.defpen = c.getPen(0.8)
+        self.hotpen = c.getPen(0.4)
 
     def finalize(self):
-        if self.defbrush: api.DeleteObject(self.defbrush)
-        if self.hotbrush: api.DeleteObject(self.hotbrush)
-        if self.defpen: api.DeleteObject(self.defpen)
-        if self.hotpen: api.DeleteObject(self.hotpen)
+        for handle in (self.defbrush, self.hotbrush, self.defpen, self.hotpen):
+            if handle: GdiPool.release(handle)
+        self.defbrush = None
+        self.hotbrush = None
+        self.defpen = None
+        self.hotpen = None
 
 
 
@@ -216,8 +193,6 @@ class GradDraw:
         self.gcHot = GradColor()
         self.defpen = None
         self.hotpen = None
-        self.defbrush = None
-        self.hotbrush = None
 
     def setData(self, uc1, uc2):
         self.gcDef.c1.updateColor(uc1)
@@ -227,14 +202,14 @@ class GradDraw:
         self.gcHot.c1 = self.gcDef.c1.getShadedColor(hadj1)
         self.gcHot.c2 = self.gcDef.c2.getShadedColor(hadj2)
 
-        self.defpen = self.gcDef.c1.createHPen(0.8)
-        self.hotpen = self.gcHot.c1.createHPen(0.4)
+        if self.defpen: GdiPool.release(self.defpen)
+        if self.hotpen: GdiPool.release(self.hotpen)
+        self.defpen = self.gcDef.c1.getPen(0.8)
+        self.hotpen = self.gcHot.c1.getPen(0.4)
 
     def finalize(self):
-        if self.defpen: api.DeleteObject(self.defpen)
-        if self.hotpen: api.DeleteObject(self.hotpen)
-        if self.defbrush: api.DeleteObject(self.defbrush)
-        if self.hotbrush: api.DeleteObject(self.hotbrush)
+        if self.defpen: GdiPool.release(self.defpen)
+        if self.hotpen: GdiPool.release(self.hotpen)
 
 
 
@@ -243,24 +218,23 @@ class GradDraw:
 def btnwndproc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # winmsgs.log_msg(msg, "Button")
 
-    btn = btnDic[hw]
-    match msg:
-        case con.WM_NCDESTROY: btn.finalize(scID)
-
-        case con.WM_SETFOCUS: return btn._gotFocusHandler()
-        case con.WM_KILLFOCUS: return btn._lostFocusHandler()
-        case con.WM_LBUTTONDOWN:btn._leftMouseDownHandler(msg, wp, lp)
-
-        case con.WM_LBUTTONUP: btn._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: btn._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: btn._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: btn._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: btn._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: btn._mouseLeaveHandler()
-        case MyMessages.CTRL_NOTIFY : return btn._wmNotifyHandler(lp)
-        case con.WM_SIZE: btn._resetBrushes()
-        # We are using pre prepared gradient brushes for drawing gradient button background
-        # So, whenever, we get a wm_size message, we need to set the brushes to zero value.
-        # Otherwise, brushes will remain old button size and we get a weird background drawing.
+    btn = HwndRegistry.get(hw)
+    handler = btn._msgMap.get(msg)
+    if handler:
+        ret = handler(btn, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_NCDESTROY:
+        btn.finalize(scID)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _btnSetFocusMsg(btn, hw, msg, wp, lp): return btn._gotFocusHandler()
+def _btnKillFocusMsg(btn, hw, msg, wp, lp): return btn._lostFocusHandler()
+def _btnNotifyMsg(btn, hw, msg, wp, lp): return btn._wmNotifyHandler(lp)
+
+Button._msgTable = makeMsgMap({
+    con.WM_SETFOCUS: _btnSetFocusMsg,
+    con.WM_KILLFOCUS: _btnKillFocusMsg,
+    MyMessages.CTRL_NOTIFY: _btnNotifyMsg,
+})
@@ -5,7 +5,7 @@ from ctypes.wintypes import HWND, UINT, LPCWSTR
 from ctypes import addressof, cast
 import sys
 
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType, ViewMode
@@ -16,7 +16,6 @@ from pyforms.src.colors import Color
 from datetime import datetime
 # from horology import Timing
 
-calDict = {}
 calStyle = con.WS_CHILD | con.WS_VISIBLE
 
 
@@ -73,7 +72,7 @@ class CalendarBox(Control):
         self._setStyles()
         self._createControl()
         if self._hwnd:
-            calDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(calWndProc)
 
             # Set the size for CalendarBox, because it is created with zero size
@@ -174,38 +173,34 @@ class CalendarBox(Control):
 @SUBCLASSPROC
 def calWndProc(hw, msg, wp, lp, scID, refData):
     # printWinMsg(msg)
-    cal = calDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, calWndProc, scID)
-            del calDict[hw]
-
-        case MyMessages.CTRL_NOTIFY:
-            nm = cast(lp, LPNMHDR).contents
-            match nm.code:
-                case con.MCN_SELECT: # 4294966550
-                    nms = cast(lp, LPNMSELCHANGE).contents
-                    cal._setValue(nms.stSelStart)
-                    if cal.onValueChanged: cal.onValueChanged(cal, EventArgs())
-                case con.MCN_SELCHANGE:
-                    nms = cast(lp, LPNMSELCHANGE).contents
-                    cal._setValue(nms.stSelStart)
-                    if cal.onSelectionChanged: cal.onSelectionChanged(cal, EventArgs())
-
-                case con.MCN_VIEWCHANGE:
-                    nmv = cast(lp, LPNMVIEWCHANGE).contents
-                    cal._viewMode = ViewMode(nmv.dwNewView)
-                    cal._oldView = ViewMode(nmv.dwOldView)
-                    if cal.onViewChanged: cal.onViewChanged(cal, EventArgs())
-
-        case con.WM_SETFOCUS: cal._gotFocusHandler()
-        case con.WM_KILLFOCUS: cal._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: cal._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: cal._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: cal._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: cal._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: cal._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: cal._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: cal._mouseLeaveHandler()
+    cal = HwndRegistry.get(hw)
+    handler = cal._msgMap.get(msg)
+    if handler:
+        ret = handler(cal, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, calWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _calNotifyMsg(cal, hw, msg, wp, lp):
+    nm = cast(lp, LPNMHDR).contents
+    match nm.code:
+        case con.MCN_SELECT: # 4294966550
+            nms = cast(lp, LPNMSELCHANGE).contents
+            cal._setValue(nms.stSelStart)
+            if cal.onValueChanged: cal.onValueChanged(cal, EventArgs())
+        case con.MCN_SELCHANGE:
+            nms = cast(lp, LPNMSELCHANGE).contents
+            cal._setValue(nms.stSelStart)
+            if cal.onSelectionChanged: cal.onSelectionChanged(cal, EventArgs())
+
+        case con.MCN_VIEWCHANGE:
+            nmv = cast(lp, LPNMVIEWCHANGE).contents
+            cal._viewMode = ViewMode(nmv.dwNewView)
+            cal._oldView = ViewMode(nmv.dwOldView)
+            if cal.onViewChanged: cal.onViewChanged(cal, EventArgs())
+
+CalendarBox._msgTable = makeMsgMap({MyMessages.CTRL_NOTIFY: _calNotifyMsg})
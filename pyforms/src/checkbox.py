@@ -1,8 +1,8 @@
 
 # CheckBox module - Created on 08-Dec-2022 18:49:20
 
-from ctypes import WINFUNCTYPE, byref, cast, addressof, create_unicode_buffer
-from pyforms.src.control import Control
+from ctypes import byref, cast, addressof, create_unicode_buffer
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType
 from pyforms.src.apis import LRESULT, LPNMCUSTOMDRAW, SUBCLASSPROC
@@ -11,7 +11,6 @@ from pyforms.src.colors import Color
 import pyforms.src.constants as con
 from pyforms.src.events import EventArgs
 
-cb_dict = {}
 cb_style = con.WS_CHILD | con.WS_VISIBLE | con.WS_TABSTOP | con.BS_AUTOCHECKBOX
 
 
@@ -62,10 +61,10 @@ class CheckBox(Control):
 
         if self._width > 0 or self.height > 0: self._autosize = False
 
-        self._bkgBrush = self._bgColor.createHBrush()
+        self._resetBkgBrush()
         self._createControl()
         if self._hwnd:
-            cb_dict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(cbWndProc)
             self._setFontInternal()
             if self._autosize: self._setAutoSize()
@@ -109,46 +108,47 @@ class CheckBox(Control):
 @SUBCLASSPROC
 def cbWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # printWinMsg(msg)
-    cb = cb_dict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, cbWndProc, scID)
-            del cb_dict[hw]
-
-        case con.WM_SETFOCUS: cb._gotFocusHandler()
-        case con.WM_KILLFOCUS: cb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: cb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: cb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: cb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: cb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: cb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: cb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: cb._mouseLeaveHandler()
-
-        case MyMessages.LABEL_COLOR:
-            # Unfortunately changing fore color here won't work.
-            if cb._drawFlag & 2: api.SetBkColor(wp, cb._bgColor.ref)
-            return cb._bkgBrush
-
-        case MyMessages.CTRL_NOTIFY:
-            nmc = cast(lp, LPNMCUSTOMDRAW).contents
-            match nmc.dwDrawStage:
-                case con.CDDS_PREERASE: return con.CDRF_NOTIFYPOSTERASE
-                case con.CDDS_PREPAINT:
-                    rct = nmc.rc
-                    if not cb._rightAlign:
-                        rct.left += 17 # Adjusting rect,otherwise text will be drawn upon the check area
-                    else:
-                        rct.right -= 17
-
-                    if cb._drawFlag & 1: api.SetTextColor(nmc.hdc, cb._fgColor.ref)
-                    api.SetBkMode(nmc.hdc, 1)
-                    api.DrawText(nmc.hdc, cb._text, len(cb._text), byref(rct), cb._txtStyle )
-                    return con.CDRF_SKIPDEFAULT
-
-        case MyMessages.CTL_COMMAND:
-            cb._isChecked = bool(api.SendMessage(hw, con.BM_GETCHECK, 0, 0))
-            if cb.onCheckedChanged: cb.onCheckedChanged(cb, EventArgs() )
+    cb = HwndRegistry.get(hw)
+    handler = cb._msgMap.get(msg)
+    if handler:
+        ret = handler(cb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, cbWndProc, scID)
+        cb._releaseBkgBrush()
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _cbLabelColorMsg(cb, hw, msg, wp, lp):
+    # Unfortunately changing fore color here won't work.
+    if cb._drawFlag & 2: api.SetBkColor(wp, cb._bgColor.ref)
+    return cb._bkgBrush
+
+def _cbNotifyMsg(cb, hw, msg, wp, lp):
+    nmc = cast(lp, LPNMCUSTOMDRAW).contents
+    match nmc.dwDrawStage:
+        case con.CDDS_PREERASE: return con.CDRF_NOTIFYPOSTERASE
+        case con.CDDS_PREPAINT:
+            rct = nmc.rc
+            if not cb._rightAlign:
+                rct.left += 17 # Adjusting rect,otherwise text will be drawn upon the check area
+            else:
+                rct.right -= 17
+
+            if cb._drawFlag & 1: api.SetTextColor(nmc.hdc, cb._fgColor.ref)
+            api.SetBkMode(nmc.hdc, 1)
+            api.DrawText(nmc.hdc, cb._text, len(cb._text), byref(rct), cb._txtStyle )
+            return con.CDRF_SKIPDEFAULT
+
+def _cbCommandMsg(cb, hw, msg, wp, lp):
+    cb._isChecked = bool(api.SendMessage(hw, con.BM_GETCHECK, 0, 0))
+    if cb.onCheckedChanged: cb.onCheckedChanged(cb, EventArgs() )
+
+CheckBox._msgTable = makeMsgMap({
+    MyMessages.LABEL_COLOR: _cbLabelColorMsg,
+    MyMessages.CTRL_NOTIFY: _cbNotifyMsg,
+    MyMessages.CTL_COMMAND: _cbCommandMsg,
+})
+
@@ -0,0 +1,90 @@
+# Created on 17-Oct-2026 06:05:00
+# cmbbench module - ComboBox type to filter benchmark.
+# A combo with lot of part numbers is filtered on each key press of a typing session.
+# Old way is what the users did before filterItems: clear the combo, scan all the
+# items and add the matches again. Then the same session with filterItems.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.cmbbench [items]
+
+import sys, time, io, contextlib, random
+from ctypes import addressof, create_unicode_buffer
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.forms import Form
+from pyforms.src.combobox import ComboBox
+from pyforms.src.enums import FilterMode
+
+
+def makeParts(count):
+    rnd = random.Random(7)
+    return [f"PN-{rnd.randint(0, 99999):05d}-{rnd.choice('ABCDEFGH')}{rnd.randint(0, 99)}" for _ in range(count)]
+
+
+def makeSession():
+    # User types a part number, goes back few letters and types another one.
+    typed = "PN-4217"
+    session = [typed[:i] for i in range(1, len(typed) + 1)]
+    session += [typed[:i] for i in range(len(typed) - 1, 3, -1)]
+    session += ["PN-9", "PN-98", "PN-981"]
+    return session
+
+
+def oldFilter(cmb, parts, text):
+    # Rebuild the whole drop down for each key press.
+    api.SendMessage(cmb._hwnd, con.CB_RESETCONTENT, 0, 0)
+    key = text.lower()
+    count = 0
+    for part in parts:
+        if part.lower().startswith(key):
+            buff = create_unicode_buffer(part)
+            api.SendMessage(cmb._hwnd, con.CB_ADDSTRING, 0, addressof(buff))
+            count += 1
+    return count
+
+
+def runSession(title, session, func):
+    sim.sent.clear()
+    counts = []
+    start = time.perf_counter()
+    for text in session: counts.append(func(text))
+    elapsed = time.perf_counter() - start
+    sent = sum(sim.sent.values())
+    print(f"    {title:<12}: {elapsed * 1000 / len(session):.2f} ms/key, {sent // len(session)} messages/key")
+    return counts
+
+
+def main(count = 50_000):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    parts = makeParts(count)
+    frm = Form("Combo bench")
+    frm.createHandle()
+    cmbOld = ComboBox(frm, 10, 10)
+    cmbNew = ComboBox(frm, 200, 10)
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+    start = time.perf_counter()
+    cmbNew.addItems(*parts)
+    print(f"{count} part numbers, loaded & indexed in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    session = makeSession()
+    print(f"Typing session: {' '.join(session)}\n")
+    oldCounts = runSession("rebuild", session, lambda text: oldFilter(cmbOld, parts, text))
+    newCounts = runSession("filterItems", session, cmbNew.filterItems)
+    print(f"    same results : {oldCounts == newCounts} {newCounts}")
+    subSession = ["42", "421", "4217", "217", "17-"]
+    subFilter = lambda text: cmbNew.filterItems(text, FilterMode.SUBSTRING)
+    runSession("substring", subSession, subFilter) # Trigram map is built on the first one.
+    runSession("again", subSession, subFilter)
+    runSession("clear", [""], cmbNew.filterItems)
+    frm.close()
+    sim.pump()
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:2]]
+    main(*args)
@@ -1,12 +1,70 @@
 # Color module - Created on 16-Nov-2022 01:37
 
 from pyforms.src. apis import CreateSolidBrush, CreatePen
-from pyforms.src. constants import PS_SOLID
-from ctypes import byref
+from pyforms.src. constants import PS_SOLID, BI_RGB, DIB_RGB_COLORS
+from collections import OrderedDict
+from ctypes import byref, sizeof, memmove, c_void_p, c_uint32
 from ctypes.wintypes import HDC, COLORREF, HBRUSH
 from pyforms.src.apis import RECT, CreateSolidBrush, FillRect, DeleteObject, DeleteDC
-from pyforms.src.apis import CreatePatternBrush, SelectObject
-from pyforms.src.apis import CreateCompatibleDC, CreateCompatibleBitmap
+from pyforms.src.apis import CreatePatternBrush, CreateDIBSection, BITMAPINFOHEADER
+
+
+class GdiPool:
+    """Shared pool of solid brushes & pens. Same color (and same pen width & style)
+        will give the same handle. Handles are reference counted and deleted when
+        the last user releases them. Get handles with Color.getBrush & Color.getPen
+        and give them back with GdiPool.release."""
+    _objects = {} # Key - (kind, COLORREF, width, style), Value - [handle, ref count]
+    _keys = {} # Key - handle, Value - key of _objects
+    _live = {"brush": 0, "pen": 0}
+    _peak = {"brush": 0, "pen": 0}
+
+    @classmethod
+    def getBrush(cls, cref: int) -> HBRUSH:
+        """Returns a shared solid brush for given COLORREF"""
+        return cls._acquire(("brush", cref, 0, 0))
+
+    @classmethod
+    def getPen(cls, cref: int, width: int = 1, style: int = PS_SOLID):
+        """Returns a shared pen for given COLORREF, width & style"""
+        return cls._acquire(("pen", cref, width, style))
+
+    @classmethod
+    def release(cls, handle):
+        """Give back a handle. It will be deleted if nobody else is using it."""
+        key = cls._keys.get(handle)
+        if key is None: return # Not from our pool.
+        entry = cls._objects[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del cls._objects[key]
+            del cls._keys[handle]
+            cls._live[key[0]] -= 1
+            DeleteObject(handle)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Returns the live handle counts & high water marks of brushes and pens"""
+        return {"brushes": cls._live["brush"], "pens": cls._live["pen"],
+                "peakBrushes": cls._peak["brush"], "peakPens": cls._peak["pen"],
+                "references": sum(entry[1] for entry in cls._objects.values())}
+
+    @classmethod
+    def _acquire(cls, key):
+        entry = cls._objects.get(key)
+        if entry:
+            entry[1] += 1
+            return entry[0]
+
+        kind, cref, width, style = key
+        handle = CreateSolidBrush(cref) if kind == "brush" else CreatePen(style, width, cref)
+        if handle:
+            cls._objects[key] = [handle, 1]
+            cls._keys[handle] = key
+            cls._live[kind] += 1
+            if cls._live[kind] > cls._peak[kind]: cls._peak[kind] = cls._live[kind]
+        return handle
+#-----------------End of GdiPool Class----------------------------
 
 def getColorRef(clr: int) -> COLORREF:
     red = clr >> 16
@@ -132,6 +190,14 @@ class Color:
         else:
             return CreatePen(PS_SOLID, 1, self.ref)
 
+    def getBrush(self, adj: float = 0) -> HBRUSH:
+        """Returns a shared brush from GdiPool. Give it back with GdiPool.release"""
+        return GdiPool.getBrush(self.ref if adj == 0 else self.changeToColorRef(adj))
+
+    def getPen(self, adj: float = 0, width: int = 1, style: int = PS_SOLID):
+        """Returns a shared pen from GdiPool. Give it back with GdiPool.release"""
+        return GdiPool.getPen(self.changeToColorRef(adj) if adj > 0 else self.ref, width, style)
+
     def changeToColorRef(self, adj: float):
         r1 = clamp(self.red * adj)
         g1 = clamp(self.green * adj)
@@ -212,31 +278,60 @@ def clamp(n, minVal = 0, maxVal = 255): return int(max(min(maxVal, n), minVal))
 def ref_from_RGB(r, g, b) -> COLORREF: return int((b << 16) | (g << 8) | r)
 
 
-def _createGradientBrush(dc: HDC, rct: RECT, rc1, rc2, isT2B: bool):
-    # tBrush = wt.HBRUSH()
-    memHdc = CreateCompatibleDC(dc)
-    hBmp = CreateCompatibleBitmap(dc, rct.right, rct.bottom)
-    loopEnd = rct.bottom if isT2B else rct.right
+def _gradientRamp(length: int, rc1, rc2):
+    # Colors of the whole gradient as 32 bit BGRA values, one per pixel.
     x = rc2.red - rc1.red
     y = rc2.green - rc1.green
     z = rc2.blue - rc1.blue
-    SelectObject(memHdc, hBmp)
-    for i in range(loopEnd):
-        r, g, b = 0, 0, 0
-        r = rc1.red + int((i * x) / loopEnd)
-        g = rc1.green + int((i * y) / loopEnd)
-        b = rc1.blue + int((i * z) / loopEnd)
-        tBrush = CreateSolidBrush((b << 16) | (g << 8) | r)
-        rc = RECT()
-        rc.left = 0 if isT2B else i
-        rc.top = i if isT2B else 0
-        rc.right = rct.right if isT2B else i + 1
-        rc.bottom = i + 1 if isT2B else loopEnd
-        FillRect(memHdc, byref(rc), tBrush)
-        DeleteObject(tBrush)
-
+    return [((rc1.red + int((i * x) / length)) << 16) |
+            ((rc1.green + int((i * y) / length)) << 8) |
+            (rc1.blue + int((i * z) / length)) for i in range(length)]
+
+
+def _makeGradientBrush(length: int, rc1, rc2, isT2B: bool) -> HBRUSH:
+    # A gradient only changes in one direction. So a single pixel wide (or high)
+    # DIB section is enough. Pattern brush will tile it over the whole rect.
+    # Ramp is written to the DIB memory in one go. No per line brushes.
+    if length <= 0: return None
+    bmi = BITMAPINFOHEADER()
+    bmi.biSize = sizeof(BITMAPINFOHEADER)
+    bmi.biWidth = 1 if isT2B else length
+    bmi.biHeight = -length if isT2B else -1 # Negative height means top-down DIB
+    bmi.biPlanes = 1
+    bmi.biBitCount = 32
+    bmi.biCompression = BI_RGB
+    bits = c_void_p()
+    hBmp = CreateDIBSection(None, byref(bmi), DIB_RGB_COLORS, byref(bits), None, 0)
+    if not hBmp: return None
+    ramp = (c_uint32 * length)(*_gradientRamp(length, rc1, rc2))
+    memmove(bits, ramp, sizeof(ramp))
     gBrush = CreatePatternBrush(hBmp)
-    DeleteDC(memHdc)
     DeleteObject(hBmp)
     return gBrush
 
+
+_gradCache = OrderedDict() # Key - (length, COLORREF 1, COLORREF 2, isT2B), Value - HBRUSH
+_GRAD_CACHE_SIZE = 64
+
+def getGradientBrush(rct: RECT, rc1, rc2, isT2B: bool) -> HBRUSH:
+    """Returns a cached gradient brush for given rect size, colors & direction.
+        Brush is owned by the cache, so don't delete it. Get it when painting."""
+    length = rct.bottom if isT2B else rct.right
+    key = (length, rc1.ref, rc2.ref, isT2B)
+    hbr = _gradCache.get(key)
+    if hbr:
+        _gradCache.move_to_end(key)
+        return hbr
+
+    hbr = _makeGradientBrush(length, rc1, rc2, isT2B)
+    if hbr:
+        _gradCache[key] = hbr
+        if len(_gradCache) > _GRAD_CACHE_SIZE:
+            _, oldBrush = _gradCache.popitem(last = False)
+            DeleteObject(oldBrush)
+    return hbr
+
+
+def _createGradientBrush(dc: HDC, rct: RECT, rc1, rc2, isT2B: bool):
+    # Caller owns this brush. Use getGradientBrush for a cached one.
+    return _makeGradientBrush(rct.bottom if isT2B else rct.right, rc1, rc2, isT2B)
@@ -1,20 +1,20 @@
 # Created on 24-Nov-2022 05:00:20
 
 from ctypes.wintypes import HWND, UINT, HDC
-from ctypes import WINFUNCTYPE, byref, sizeof, addressof, create_unicode_buffer
-from pyforms.src.control import Control
+from ctypes import byref, sizeof, addressof, create_unicode_buffer
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap, ownerMouseMsg
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages, getMousePosOnMsg, pointInRect
-from pyforms.src.enums import ControlType
+from pyforms.src.enums import ControlType, FilterMode
 from pyforms.src.events import EventArgs
 from pyforms.src.apis import LRESULT, UINT_PTR, DWORD_PTR, RECT, COMBOBOXINFO, WPARAM, LPARAM, SUBCLASSPROC
 import pyforms.src.apis as api
 from pyforms.src.colors import COLOR_WHITE
+from pyforms.src.itemindex import ItemIndex
+from bisect import bisect_left
 # from .winmsgs import log_msg
 # from horology import Timing
 
-cmbDict = {}
-cmbTbDict = {}
 cmbStyle = con.WS_CHILD | con.WS_VISIBLE
 
 class ComboBox(Control):
@@ -25,7 +25,7 @@ class ComboBox(Control):
     __slots__ = ( "_onceCreated", "_items", "_visItemCount", "_selIndex", "_oldHwnd",
                     "_enableInput", "_recreated", "onSelectionCommitted", "onListClosed",
                     "onListOpened", "onTextUpdated", "onTextChanged", "onSelectionChanged",
-                    "onSelectionCancelled" )
+                    "onSelectionCancelled", "_index", "_seqs", "_visible", "_filterText", "_filterMode", "_autoComplete", "_suggestions" )
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 150, height: int = 30, auto = False, items = None) -> None:
         super().__init__()
@@ -43,6 +43,13 @@ class ComboBox(Control):
         self._exStyle = 0x00000200
         self._onceCreated = False
         self._items = []
+        self._index = ItemIndex() # Search index of the item texts.
+        self._seqs = [] # Index's sequence numbers of _items, in the same order.
+        self._visible = None # Sequence numbers of the items in the drop down. None means all items.
+        self._filterText = ""
+        self._filterMode = FilterMode.PREFIX
+        self._autoComplete = None # An AutoComplete sets this.
+        self._suggestions = None # AutoComplete results in the drop down. None means items are shown.
         self._visItemCount = 0
         self._selIndex = -1
         self._oldHwnd = None
@@ -70,9 +77,7 @@ class ComboBox(Control):
 
         """Create's combo box handle"""
 
-        if self._recreated: # This is recreation.
-            del cmbDict[self._hwnd]
-        else: # First time creation
+        if not self._recreated: # First time creation
             self._setCtlID()
             self._setStyles()
 
@@ -89,7 +94,7 @@ class ComboBox(Control):
                                         self._parent.wnd_class.hInstance, None )
 
         if self._hwnd:
-            cmbDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             if not self._isCreated:
                 self._isCreated = True
 
@@ -97,8 +102,9 @@ class ComboBox(Control):
             self._setSubclass(cmbWndProc)
             self._setFontInternal()
             self._getComboInfo()
+            self._suggestions = None # A new combo starts with the items.
             self._insertItems()
-            if self._selIndex > -1: api.SendMessage(self._hwnd, con.CB_SETCURSEL, self._selIndex, 0)
+            if self._selIndex > -1: api.SendMessage(self._hwnd, con.CB_SETCURSEL, self._toListPos(self._selIndex), 0)
 
     # -region private_funcs
 
@@ -108,7 +114,7 @@ class ComboBox(Control):
             self._style |= con.CBS_DROPDOWN
         else:
             self._style |= con.CBS_DROPDOWNLIST
-        self._bkgBrush = self._bgColor.createHBrush()
+        self._resetBkgBrush()
 
     # Get the combo's internal info from OS
     def _getComboInfo(self):
@@ -117,17 +123,154 @@ class ComboBox(Control):
         ciPtr = addressof(ci)
         api.SendMessage(self._hwnd, con.CB_GETCOMBOBOXINFO, 0, ciPtr)
         self.parent._comboDict[ci.hwndList] = self._hwnd  # Putting list hwnd in form's special dict.
+        if ci.hwndItem: HwndRegistry.add(ci.hwndItem, self)
         api.SetWindowSubclass(ci.hwndItem, cmbEditWndProc, ComboBox._tb_subcls_id, self._hwnd)
         ComboBox._tb_subcls_id += 1
 
 
     # Helper function for inserting items to combo
-    def _insertItems(self):
-        if self._items:
-            for item in self._items:
-                sitem = item if isinstance(item, str) else str(item)
-                buff = create_unicode_buffer(sitem)
-                api.SendMessage(self._hwnd, con.CB_ADDSTRING, 0, addressof(buff))
+    def _insertItems(self, texts = None):
+        if texts is None:
+            if self._visible is None:
+                texts = [item if isinstance(item, str) else str(item) for item in self._items]
+            else:
+                texts = [self._itemText(seq) for seq in self._visible]
+        self._addStringsBulk(texts, con.CB_ADDSTRING, con.CB_INITSTORAGE, cmbWndProc)
+
+    def _itemText(self, seq):
+        item = self._items[bisect_left(self._seqs, seq)]
+        return item if isinstance(item, str) else str(item)
+
+    def _sendString(self, msg, index, txt):
+        buff = create_unicode_buffer(txt)
+        return api.SendMessage(self._hwnd, msg, index, addressof(buff))
+
+    def _addToIndex(self, item):
+        self._endSuggestions()
+        sitem = item if isinstance(item, str) else str(item)
+        seq = self._index.add(sitem)
+        self._items.append(item)
+        self._seqs.append(seq)
+        if self._visible is not None:
+            # Combo is filtered. New item goes to the drop down only if it matches.
+            if not self._index.matches(seq, self._filterText, self._filterMode == FilterMode.SUBSTRING): return
+            self._visible.append(seq)
+        if self._isCreated: self._sendString(con.CB_ADDSTRING, 0, sitem)
+
+    def _removeAt(self, index):
+        # Position in the drop down is found with a binary search. No CB_FINDSTRING.
+        self._endSuggestions()
+        seq = self._seqs[index]
+        if self._visible is None:
+            cIndex = index
+        else:
+            cIndex = bisect_left(self._visible, seq)
+            if cIndex < len(self._visible) and self._visible[cIndex] == seq:
+                del self._visible[cIndex]
+            else:
+                cIndex = -1 # Filtered out, it's not in the drop down.
+        if self._isCreated and cIndex > -1: api.SendMessage(self._hwnd, con.CB_DELETESTRING, cIndex, 0)
+        del self._items[index]
+        del self._seqs[index]
+        self._index.remove(seq)
+
+    def _findItem(self, item):
+        # Returns the position of item in _items or -1
+        sitem = item if isinstance(item, str) else str(item)
+        for seq in self._index.find(sitem):
+            index = bisect_left(self._seqs, seq)
+            if self._items[index] == item: return index
+        return -1
+
+    def _resetItems(self, seqs):
+        self._resetTexts([self._itemText(seq) for seq in seqs])
+
+    def _resetTexts(self, texts):
+        # CB_RESETCONTENT clears the edit part too. User might be typing there, so we keep the text & caret.
+        hwnd = self._hwnd
+        txt = ""
+        if self._enableInput:
+            size = api.GetWindowTextLength(hwnd) + 1
+            buff = create_unicode_buffer(size)
+            api.GetWindowText(hwnd, buff, size)
+            txt = buff.value
+            sel = api.SendMessage(hwnd, con.CB_GETEDITSEL, 0, 0)
+        api.SendMessage(hwnd, con.CB_RESETCONTENT, 0, 0)
+        self._insertItems(texts)
+        if txt:
+            self._sendString(con.WM_SETTEXT, 0, txt)
+            api.SendMessage(hwnd, con.CB_SETEDITSEL, 0, sel)
+
+    # While a filter or suggestions are on, positions in the drop down are not the indexes of 'items'.
+    def _toListPos(self, index):
+        if self._suggestions is not None:
+            if not 0 <= index < len(self._items): return index
+            text = self._itemText(self._seqs[index])
+            return self._suggestions.index(text) if text in self._suggestions else -1
+        if self._visible is None or not 0 <= index < len(self._seqs): return index
+        seq = self._seqs[index]
+        pos = bisect_left(self._visible, seq)
+        return pos if pos < len(self._visible) and self._visible[pos] == seq else -1 # Filtered out.
+
+    def _toItemIndex(self, pos):
+        if self._suggestions is not None:
+            return self._findItem(self._suggestions[pos]) if 0 <= pos < len(self._suggestions) else pos
+        if self._visible is None or not 0 <= pos < len(self._visible): return pos
+        return bisect_left(self._seqs, self._visible[pos])
+
+    def _showOnly(self, seqs):
+        # Drop down has the items of _visible. We walk both sorted lists together and
+        # send only the deletes & inserts. Unchanged items cost nothing to the combo.
+        # If the changes are more than the items which stay, it's cheaper to reset the
+        # combo & add the new ones in bulk. So a key press costs the matches, not the items.
+        self._endSuggestions()
+        old = self._seqs if self._visible is None else self._visible
+        if seqs == old or not self._isCreated: # Comparing the lists is far cheaper than walking them.
+            self._visible = seqs
+            return
+        stay = len(set(old).intersection(seqs))
+        if len(old) + len(seqs) - 2 * stay >= stay:
+            self._resetItems(seqs)
+        else:
+            send = api.SendMessage
+            hwnd = self._hwnd
+            i = j = pos = 0
+            oldLen, newLen = len(old), len(seqs)
+            while i < oldLen or j < newLen:
+                if j == newLen or (i < oldLen and old[i] < seqs[j]):
+                    send(hwnd, con.CB_DELETESTRING, pos, 0)
+                    i += 1
+                elif i == oldLen or seqs[j] < old[i]:
+                    self._sendString(con.CB_INSERTSTRING, pos, self._itemText(seqs[j]))
+                    j += 1
+                    pos += 1
+                else:
+                    i += 1
+                    j += 1
+                    pos += 1
+        self._visible = seqs
+
+
+    def _showSuggestions(self, items):
+        # Default view of AutoComplete results. They are shown in the drop down for a while,
+        # 'items' & the index are not changed. Empty results bring back the items.
+        # Opening or closing the drop down can change the edit text. So it's done first
+        # and _resetTexts puts back the text & caret which the user is typing.
+        texts = [item if isinstance(item, str) else str(item) for item in items]
+        if self._isCreated:
+            dropped = api.SendMessage(self._hwnd, con.CB_GETDROPPEDSTATE, 0, 0)
+            if bool(texts) != bool(dropped): api.SendMessage(self._hwnd, con.CB_SHOWDROPDOWN, bool(texts), 0)
+        if not texts:
+            self._endSuggestions()
+            return
+        self._suggestions = texts
+        if self._isCreated: self._resetTexts(texts)
+
+    def _endSuggestions(self):
+        # Put the items (or the filtered ones) back to the drop down.
+        if self._suggestions is None: return
+        self._suggestions = None
+        if self._isCreated: self._resetItems(self._seqs if self._visible is None else self._visible)
 
 
     # Helper function for checking mouse lieaved from combo
@@ -152,18 +295,24 @@ class ComboBox(Control):
         """Get the item count of this combo"""
         return len(self._items)
 
+    @property
+    def visibleCount(self):
+        """Get the count of items in the drop down. It's less than itemCount when the combo is filtered."""
+        if self._suggestions is not None: return len(self._suggestions)
+        return len(self._items) if self._visible is None else len(self._visible)
+
     @property
     def selectedIndex(self):
-        """Get the selected index of this combo."""
-        if self._isCreated: return api.SendMessage(self._hwnd, con.CB_GETCURSEL, 0, 0)
+        """Get the selected index of this combo. It's an index of 'items', even when a filter is on."""
+        if self._isCreated: return self._toItemIndex(api.SendMessage(self._hwnd, con.CB_GETCURSEL, 0, 0))
         return -1
 
 
     @selectedIndex.setter
     def selectedIndex(self, value):
-        """Set the selected index of this combo"""
+        """Set the selected index of this combo. If a filter hides that item, selection is cleared."""
         self._selIndex = value
-        if self._isCreated: api.SendMessage(self._hwnd, con.CB_SETCURSEL, value, 0)
+        if self._isCreated: api.SendMessage(self._hwnd, con.CB_SETCURSEL, self._toListPos(value), 0)
 
     @property
     def enableInput(self):
@@ -195,67 +344,78 @@ class ComboBox(Control):
     # -region public functions
     def addItem(self, item):
         """Add an item to this combo"""
-        self._items.append(item)
-        if self._isCreated:
-            sitem = item if isinstance(item, str) else str(item)
-            buff = create_unicode_buffer(sitem)
-            api.SendMessage(self._hwnd, con.CB_ADDSTRING, 0, addressof(buff))
+        self._addToIndex(item)
 
 
     def addItems(self, *args):
         """Add items to this combo"""
+        self._endSuggestions()
+        if not self._isCreated or self._visible is not None:
+            for item in args: self._addToIndex(item)
+            return
+        texts = [item if isinstance(item, str) else str(item) for item in args]
+        self._seqs.extend(self._index.addMany(texts))
         self._items.extend(args)
-        if self._isCreated:
-            for item in args:
-                sitem = item if isinstance(item, str) else str(item)
-                buff = create_unicode_buffer(sitem)
-                api.SendMessage(self._hwnd, con.CB_ADDSTRING, 0, addressof(buff))
+        self._insertItems(texts) # Same bulk path of createHandle, only for the new items.
 
 
     def removeItemAt(self, index):
         """Remove an item at the given index"""
-        if index in range(len(self._items)):
-            item = self._items[index]
-            sitem = item if isinstance(item, str) else str(item)
-            create_unicode_buffer(sitem)
-            cIndex = api.SendMessage(self._hwnd, con.CB_FINDSTRING, -1, addressof(item))
-            if cIndex > -1 :
-                api.SendMessage(self._hwnd, con.CB_DELETESTRING, cIndex, 0)
-                del self._items[index]
+        if 0 <= index < len(self._items): self._removeAt(index)
 
 
     def removeItem(self, item):
         """Remove the given item from combo"""
-        if self._items.__contains__(item):
-            sitem = item if isinstance(item, str) else str(item)
-            buff = create_unicode_buffer(sitem)
-            cIndex = api.SendMessage(self._hwnd, con.CB_FINDSTRING, -1, addressof(buff))
-            if cIndex > -1 :
-                api.SendMessage(self._hwnd, con.CB_DELETESTRING, cIndex, 0)
-                self._items.remove(item)
+        index = self._findItem(item)
+        if index > -1:
+            self._removeAt(index)
         else:
             print("item is not in list")
 
 
     def removeItems(self, *args):
         """Remove the given items from this combo"""
-        if(all(x in self._items for x in args)):
-            for item in args:
-                sitem = item if isinstance(item, str) else str(item)
-                buff = create_unicode_buffer(sitem)
-                cIndex = api.SendMessage(self._hwnd, con.CB_FINDSTRING, -1, addressof(buff))
-                if cIndex > -1 :
-                    api.SendMessage(self._hwnd, con.CB_DELETESTRING, cIndex, 0)
-                    self._items.remove(item)
+        if all(self._findItem(x) > -1 for x in args):
+            for item in args: self._removeAt(self._findItem(item))
         else:
             print("Given items are not in list")
 
 
     def clearItems(self):
         """Delete all items from this combo"""
+        self._endSuggestions()
         if self._items:
             del self._items[:]
-            api.SendMessage(self._hwnd, con.CB_DELETESTRING, 0, 0)
+            del self._seqs[:]
+            self._index.clear()
+            if self._visible is not None: self._visible = []
+            if self._isCreated: api.SendMessage(self._hwnd, con.CB_RESETCONTENT, 0, 0)
+
+
+    def filterItems(self, text: str, mode: FilterMode = FilterMode.PREFIX) -> int:
+        """Show only the items starting with (or having) given text in the drop down.
+            Case is ignored. Empty text shows all items. Returns the count of shown items.
+            Only the changes are sent to the combo, so it's cheap to call on every key press.
+            'selectedIndex' still uses the indexes of 'items', not the positions in the filtered drop down."""
+        self._filterText = text
+        self._filterMode = mode
+        if not text:
+            self.clearFilter()
+            return len(self._items)
+        if mode == FilterMode.SUBSTRING:
+            seqs = self._index.contains(text)
+        else:
+            seqs = self._index.prefix(text)
+        self._showOnly(seqs)
+        return len(seqs)
+
+
+    def clearFilter(self):
+        """Show all the items in the drop down"""
+        if self._visible is None: return
+        self._filterText = ""
+        self._showOnly(list(self._seqs))
+        self._visible = None
 
     # -endregion
     # def dumm(self): pass
@@ -267,102 +427,108 @@ class ComboBox(Control):
 @SUBCLASSPROC
 def cmbWndProc(hw, msg, wp, lp, scID, refData):
     # printWinMsg(msg)
-    cmb = cmbDict[hw]
-    match msg:
-        case con.WM_NCDESTROY:
-            api.RemoveWindowSubclass(hw, cmbWndProc, scID)
-            if not cmb._recreated: del cmbDict[hw] # Only remove if this is a natural end
-
-        case MyMessages.LIST_COLOR:
-            if cmb._drawFlag:
-                hdc = HDC(wp)
-                if cmb._drawFlag & 1: api.SetTextColor(hdc, cmb._fgColor.ref )
-                if cmb._drawFlag & 2: api.SetBkColor(hdc, cmb._bgColor.ref)
-
-            return cmb._bkgBrush
-
-        case MyMessages.CTL_COMMAND:
-            ncode = api.HIWORD(wp)
-            match ncode:
-                case con.CBN_SELCHANGE:
-                    if cmb.onSelectionChanged: cmb.onSelectionChanged(cmb, EventArgs())
-                case con.CBN_EDITCHANGE:
-                    if cmb.onTextChanged: cmb.onTextChanged(cmb, EventArgs())
-                case con.CBN_EDITUPDATE:
-                    if cmb.onTextUpdated: cmb.onTextUpdated(cmb, EventArgs())
-                case con.CBN_DROPDOWN:
-                    if cmb.onListOpened: cmb.onListOpened(cmb, EventArgs())
-                case con.CBN_CLOSEUP:
-                    if cmb.onListClosed: cmb.onListClosed(cmb, EventArgs())
-                case con.CBN_SELENDOK:
-                    if cmb.onSelectionCommitted: cmb.onSelectionCommitted(cmb, EventArgs())
-                case con.CBN_SELENDCANCEL:
-                    if cmb.onSelectionCancelled: cmb.onSelectionCancelled(cmb, EventArgs())
-
-        case con.WM_SETFOCUS: cmb._gotFocusHandler()
-        case con.WM_KILLFOCUS: cmb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: cmb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: cmb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: cmb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: cmb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: cmb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: cmb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE:
-            # Here, we need to do a trick. Actually, in a Combobox, when it's
-            # text input mode enabled, we get two mouse leave msg & two mouse move msg
-            # Because, combo's text area is an edit control. It is surrounded by the combo.
-            # So, when mouse enters the combo's rect, we get a mouse move msg.
-            # But when mouse enters into text box's rect, we get a mouse leave from
-            # combo and mouse move from textbox. So here we are checking the mouse is
-            # in combo's rect or not. If it is stil inside, we suppress the mouse leave
-            # and continue receiving the mouse move msgs from text are.
-            if cmb._enableInput:
-                if cmb._checkMouseLeave():
-                    return 1
-                else:
-                    cmb._mouseLeaveHandler()
-            else:
-                cmb._mouseLeaveHandler()
+    cmb = HwndRegistry.get(hw)
+    handler = cmb._msgMap.get(msg)
+    if handler:
+        ret = handler(cmb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_NCDESTROY:
+        api.RemoveWindowSubclass(hw, cmbWndProc, scID)
+        HwndRegistry.remove(hw)
+        if not cmb._recreated: # Only release if this is a natural end
+            cmb._releaseBkgBrush()
+            if cmb._autoComplete: cmb._autoComplete.cancel()
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
 
+def _cmbListColorMsg(cmb, hw, msg, wp, lp):
+    if cmb._drawFlag:
+        hdc = HDC(wp)
+        if cmb._drawFlag & 1: api.SetTextColor(hdc, cmb._fgColor.ref )
+        if cmb._drawFlag & 2: api.SetBkColor(hdc, cmb._bgColor.ref)
+
+    return cmb._bkgBrush
+
+def _cmbCommandMsg(cmb, hw, msg, wp, lp):
+    ncode = api.HIWORD(wp)
+    match ncode:
+        case con.CBN_SELCHANGE:
+            if cmb.onSelectionChanged: cmb.onSelectionChanged(cmb, EventArgs())
+        case con.CBN_EDITCHANGE:
+            if cmb._autoComplete: cmb._autoComplete._textChanged()
+            if cmb.onTextChanged: cmb.onTextChanged(cmb, EventArgs())
+        case con.CBN_EDITUPDATE:
+            if cmb.onTextUpdated: cmb.onTextUpdated(cmb, EventArgs())
+        case con.CBN_DROPDOWN:
+            if cmb.onListOpened: cmb.onListOpened(cmb, EventArgs())
+        case con.CBN_CLOSEUP:
+            if cmb.onListClosed: cmb.onListClosed(cmb, EventArgs())
+        case con.CBN_SELENDOK:
+            if cmb.onSelectionCommitted: cmb.onSelectionCommitted(cmb, EventArgs())
+        case con.CBN_SELENDCANCEL:
+            if cmb.onSelectionCancelled: cmb.onSelectionCancelled(cmb, EventArgs())
+
+def _cmbMouseLeaveMsg(cmb, hw, msg, wp, lp):
+    # Here, we need to do a trick. Actually, in a Combobox, when it's
+    # text input mode enabled, we get two mouse leave msg & two mouse move msg
+    # Because, combo's text area is an edit control. It is surrounded by the combo.
+    # So, when mouse enters the combo's rect, we get a mouse move msg.
+    # But when mouse enters into text box's rect, we get a mouse leave from
+    # combo and mouse move from textbox. So here we are checking the mouse is
+    # in combo's rect or not. If it is stil inside, we suppress the mouse leave
+    # and continue receiving the mouse move msgs from text are.
+    if cmb._enableInput:
+        if cmb._checkMouseLeave():
+            return 1
+        else:
+            cmb._mouseLeaveHandler()
+    else:
+        cmb._mouseLeaveHandler()
+
+ComboBox._msgTable = makeMsgMap({
+    MyMessages.LIST_COLOR: _cmbListColorMsg,
+    MyMessages.CTL_COMMAND: _cmbCommandMsg,
+    con.WM_MOUSELEAVE: _cmbMouseLeaveMsg,
+})
+
+
 # Wndproc for edit control of this combo
-@WINFUNCTYPE(LRESULT, HWND, UINT, WPARAM, LPARAM, UINT_PTR, DWORD_PTR)
+@SUBCLASSPROC
 def cmbEditWndProc(hw, msg, wp, lp, scID, refData):
     # log_msg(msg)
-    cmb = cmbDict[refData]
-    match msg:
-        case con.WM_NCDESTROY:
-            api.RemoveWindowSubclass(hw, cmbEditWndProc, scID)
-
-        case MyMessages.EDIT_COLOR:
-            if cmb._drawFlag:
-                hdc = HDC(wp)
-                if cmb._drawFlag & (1 << 0): api.SetTextColor(hdc, cmb._fgColor.ref )
-                api.SetBkColor(hdc, cmb._bgColor.ref)
-                return api.CreateSolidBrush(cmb._bgColor.ref)
-
-        case MyMessages.LABEL_COLOR: # Not Working
-            if cmb._drawFlag:
-                hdc = HDC(wp)
-                if cmb._drawFlag & (1 << 0): api.SetTextColor(hdc, cmb._fgColor.ref )
-                api.SetBkColor(hdc, cmb._bgColor.ref)
-                return api.CreateSolidBrush(cmb._bgColor.ref)
-
-
-        case con.WM_KEYDOWN: cmb._keyDownHandler(wp)
-        case con.WM_KEYUP: cmb._keyUpHandler(wp)
-        case con.WM_CHAR: cmb._keyPressHandler(wp)
-        case con.WM_LBUTTONDOWN: cmb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: cmb._leftMouseUpHandler(msg, wp, lp)
-        case MyMessages.MOUSE_CLICK: cmb._mouse_click_handler()
-        case con.WM_RBUTTONDOWN: cmb._mouse_click_handler(msg, wp, lp)
-        case con.WM_RBUTTONUP: cmb._mouse_click_handler(msg, wp, lp)
-        case MyMessages.RIGHT_CLICK: cmb._mouse_click_handler()
-        case con.WM_MOUSEMOVE:
-            # When mouse pointer moves from combo's rect boundary and get into edit's rect
-            # we will continue the mouse move message handling.
-            cmb._mouseMoveHandler(msg, wp, lp)
+    cmb = HwndRegistry.get(hw)
+    handler = cmbEditMsgMap.get(msg)
+    if handler:
+        ret = handler(cmb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_NCDESTROY:
+        api.RemoveWindowSubclass(hw, cmbEditWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _cmbEditColorMsg(cmb, hw, msg, wp, lp):
+    # LABEL_COLOR is also coming here, but it's not Working
+    if cmb._drawFlag:
+        hdc = HDC(wp)
+        if cmb._drawFlag & (1 << 0): api.SetTextColor(hdc, cmb._fgColor.ref )
+        api.SetBkColor(hdc, cmb._bgColor.ref)
+        return cmb._bkgBrush
+
+def _cmbEditKeyDownMsg(cmb, hw, msg, wp, lp): cmb._keyDownHandler(wp)
+def _cmbEditKeyUpMsg(cmb, hw, msg, wp, lp): cmb._keyUpHandler(wp)
+def _cmbEditCharMsg(cmb, hw, msg, wp, lp): cmb._keyPressHandler(wp)
+
+# Edit control of the combo is not a Control. So this map is not per instance.
+# When mouse pointer moves from combo's rect boundary and get into edit's rect
+# we will continue the mouse move message handling.
+cmbEditMsgMap = makeMsgMap({
+    MyMessages.EDIT_COLOR: _cmbEditColorMsg,
+    MyMessages.LABEL_COLOR: _cmbEditColorMsg,
+    con.WM_KEYDOWN: _cmbEditKeyDownMsg,
+    con.WM_KEYUP: _cmbEditKeyUpMsg,
+    con.WM_CHAR: _cmbEditCharMsg,
+    con.WM_MOUSEMOVE: ownerMouseMsg,
+}, exclude = (con.WM_SETFOCUS, con.WM_KILLFOCUS, con.WM_MOUSEWHEEL, con.WM_MOUSELEAVE))
@@ -1,11 +1,12 @@
 # Common module - Created on
-from ctypes import c_int, cast, windll, byref, sizeof, py_object
+from ctypes import c_int, cast, byref, sizeof, py_object, create_unicode_buffer, c_wchar_p, addressof
 from pyforms.src.enums import FontWeight
 import pyforms.src.apis as api
 from pyforms.src.apis import RECT, LOGFONT, POINT
 import pyforms.src.constants as con
 from enum import Enum
-import datetime
+from collections import deque, OrderedDict
+import datetime, time, traceback
 
 INT_MIN   =  -2147483647 - 1
 INT_MAX  =     2147483647
@@ -14,7 +15,7 @@ OPAQUE = 0x00000002
 menuTxtFlag = con.DT_LEFT | con.DT_SINGLELINE | con.DT_VCENTER
 
 def getMousePosOnMsg():
-    dw_value = windll.user32.GetMessagePos()
+    dw_value = api.GetMessagePos()
     x = api.LOWORD(dw_value)
     y = api.HIWORD(dw_value)
     return POINT(x, y)
@@ -22,8 +23,133 @@ def getMousePosOnMsg():
 def pointInRect(rct, pt): return api.PtInRect(byref(rct), pt)
 
 
+class FontCache:
+    """Process wide cache of font handles. Fonts with same name, size, weight, italics,
+        underline & DPI will share one handle. Handle will be deleted when the last font
+        which uses it is released."""
+    _dpi = 0
+    _fonts = {} # Key - font attributes, Value - [font handle, ref count]
+    _keys = {} # Key - font handle, Value - font attributes
+
+    @classmethod
+    def getDpi(cls, hwnd = None) -> int:
+        # We only need to ask it once, all of our windows are in same screen DC.
+        if not cls._dpi:
+            hdc = api.GetDC(hwnd)
+            cls._dpi = api.GetDeviceCaps(hdc, con.LOGPIXELSY)
+            api.ReleaseDC(hwnd, hdc)
+        return cls._dpi
+
+    @classmethod
+    def acquire(cls, font, hwnd = None) -> int:
+        """Returns a shared font handle for given font. Call release when you are done."""
+        dpi = cls.getDpi(hwnd)
+        key = (font._name, font._size, font._weight.value, font._italics, font._underLine, dpi)
+        entry = cls._fonts.get(key)
+        if entry:
+            entry[1] += 1
+            return entry[0]
+
+        lf = LOGFONT()
+        lf.lfFaceName = font._name
+        lf.lfHeight = -api.MulDiv(font._size, dpi, 72)
+        lf.lfWeight = font._weight.value
+        lf.lfItalic = font._italics
+        lf.lfUnderline = font._underLine
+        lf.lfCharSet = con.DEFAULT_CHARSET
+        lf.lfOutPrecision = con.OUT_STRING_PRECIS
+        lf.lfClipPrecision = con.CLIP_DEFAULT_PRECIS
+        lf.lfQuality = con.PROOF_QUALITY
+        lf.lfPitchAndFamily = 1
+        hfont = api.CreateFontIndirect(byref(lf))
+        if hfont:
+            cls._fonts[key] = [hfont, 1]
+            cls._keys[hfont] = key
+        return hfont
+
+    @classmethod
+    def release(cls, hfont):
+        """Release a font handle. It will be deleted if nobody else is using it."""
+        key = cls._keys.get(hfont)
+        if key is None: return # Not from our cache.
+        entry = cls._fonts[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del cls._fonts[key]
+            del cls._keys[hfont]
+            TextMetrics.forgetFont(hfont) # Handle value can come back for another font.
+            api.DeleteObject(hfont)
+
+    @classmethod
+    def addRef(cls, hfont) -> bool:
+        """Take one more reference on a cached handle. Returns False if the handle is not from our cache."""
+        key = cls._keys.get(hfont)
+        if key is None: return False
+        cls._fonts[key][1] += 1
+        return True
+
+    @classmethod
+    def count(cls) -> int:
+        """Returns the number of live font handles in the cache"""
+        return len(cls._fonts)
+#-----------------End of FontCache Class----------------------------
+
+
+class TextMetrics:
+    """Process wide text size cache. Key is (font handle, text) and least recently used
+        sizes are dropped after 'maxSize' entries. Text is measured on one shared memory DC,
+        so there is no GetDC, SelectObject & ReleaseDC for each measurement."""
+    maxSize = 2048
+    _cache = OrderedDict() # Key - (font handle, text), Value - (width, height)
+    _hdc = None
+    _oldFont = None # DC's own font. Used when font handle is None.
+    _font = None # Currently selected font in our DC. None means DC's own font.
+    _size = None
+    _hits = 0
+    _misses = 0
+
+    @classmethod
+    def measure(cls, hfont, text: str) -> tuple:
+        """Returns the (width, height) of the text in given font."""
+        key = (hfont, text)
+        cache = cls._cache
+        size = cache.get(key)
+        if size is not None:
+            cache.move_to_end(key)
+            cls._hits += 1
+            return size
+
+        cls._misses += 1
+        if cls._hdc is None:
+            cls._hdc = api.CreateCompatibleDC(None)
+            cls._size = api.SIZE()
+        if hfont != cls._font:
+            old = api.SelectObject(cls._hdc, hfont or cls._oldFont)
+            if cls._oldFont is None: cls._oldFont = old
+            cls._font = hfont
+        api.GetTextExtentPoint32(cls._hdc, text, len(text), byref(cls._size))
+        size = (cls._size.cx, cls._size.cy)
+        cache[key] = size
+        if len(cache) > cls.maxSize: cache.popitem(last = False)
+        return size
+
+    @classmethod
+    def forgetFont(cls, hfont):
+        """Drop the sizes of a font. FontCache calls this before deleting the font."""
+        for key in [key for key in cls._cache if key[0] == hfont]: del cls._cache[key]
+        if cls._hdc and cls._font == hfont:
+            api.SelectObject(cls._hdc, cls._oldFont) # A selected font can't be deleted.
+            cls._font = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Returns the cached size count, hits & misses"""
+        return {"sizes": len(cls._cache), "hits": cls._hits, "misses": cls._misses}
+#-----------------End of TextMetrics Class----------------------------
+
+
 class Font:
-    __slots__ = ("_name", "_size", "_weight", "_italics", "_underLine", "_hwnd")
+    __slots__ = ("_name", "_size", "_weight", "_italics", "_underLine", "_hwnd", "_ownsHandle")
 
     def __init__(   self, name: str = "Tahoma",
                     size: int = 11,
@@ -36,22 +162,22 @@ class Font:
         self._italics = italics
         self._underLine = underLine
         self._hwnd = 0
+        self._ownsHandle = False # False for a handle given from outside. We must not release it.
 
-    def createHandle(self, hwnd):
-        dcHwnd = api.GetDC(hwnd)
-        iHeight = -api.MulDiv(self._size, api.GetDeviceCaps(dcHwnd, con.LOGPIXELSY), 72)
-        api.ReleaseDC(hwnd, dcHwnd)
+    def __del__(self):
+        if self._ownsHandle and FontCache: FontCache.release(self._hwnd)
 
-        lf = LOGFONT()
-        lf.lfFaceName = self._name
-        lf.lfHeight = iHeight
-        lf.lfWeight = self._weight.value
-        lf.lfCharSet = con.DEFAULT_CHARSET
-        lf.lfOutPrecision = con.OUT_STRING_PRECIS
-        lf.lfClipPrecision = con.CLIP_DEFAULT_PRECIS
-        lf.lfQuality = con.PROOF_QUALITY
-        lf.lfPitchAndFamily = 1
-        self._hwnd = api.CreateFontIndirect(byref(lf))
+    def createHandle(self, hwnd):
+        """Get a font handle from the font cache"""
+        self.deleteHandle()
+        self._hwnd = FontCache.acquire(self, hwnd)
+        self._ownsHandle = bool(self._hwnd)
+
+    def deleteHandle(self):
+        """Release the font handle. It will be deleted if no other font is using it"""
+        if self._ownsHandle: FontCache.release(self._hwnd)
+        self._hwnd = 0
+        self._ownsHandle = False
 
 
     @property
@@ -93,9 +219,52 @@ class Font:
     def handle(self): return self._hwnd
 
     @handle.setter
-    def handle(self, value: bool): self._hwnd = value
+    def handle(self, value: int):
+        # Give back our old handle & take a reference on the new one, if it is from the cache.
+        if value == self._hwnd: return
+        self.deleteHandle()
+        self._hwnd = value
+        self._ownsHandle = FontCache.addRef(value) if value else False
 #-----------------End of Font Class----------------------------
 
+class WideBuffer:
+    """A reusable wide char buffer. It grows when a bigger string comes.
+        Use it when we need to pass lots of strings to Windows, so that we
+        don't need to allocate a new buffer for each string."""
+    __slots__ = ("_buff", "_size", "_ptr")
+
+    def __init__(self, size: int = 64) -> None:
+        self._size = 0
+        self._grow(size)
+
+    def fill(self, txt: str) -> c_wchar_p:
+        """Copy the text into this buffer and returns a pointer to it."""
+        if len(txt) >= self._size: self._grow(len(txt) + 1)
+        try:
+            self._buff.value = txt
+        except ValueError: # Surrogate pairs need two wchars.
+            self._grow((len(txt) * 2) + 1)
+            self._buff.value = txt
+        return self._ptr
+
+    def _grow(self, size: int):
+        newSize = max(self._size, 16)
+        while newSize < size: newSize *= 2
+        self._size = newSize
+        self._buff = create_unicode_buffer(newSize)
+        self._ptr = cast(self._buff, c_wchar_p)
+
+    @property
+    def size(self): return self._size
+
+    @property
+    def pointer(self): return self._ptr
+
+    @property
+    def address(self): return addressof(self._buff)
+#-----------------End of WideBuffer Class----------------------------
+
+
 class Timing:
     def __init__(self, msg: str) -> None:
         self.message = msg
@@ -112,6 +281,74 @@ class Timing:
             print(f"{self.message} : {self.dur.microseconds} us")
 
 
+class IdleQueue:
+    """Idle time work of the message loop. When the message queue is empty, loop raises the
+        onIdle events and then runs the idle tasks, 'sliceTime' seconds at a time. Tasks take
+        turns, one step each. A step is a call of the function (it returns True if it has more
+        work) or one item of the generator."""
+    sliceTime = 0.01
+    _tasks = deque() # Items are (form, step function)
+    _forms = [] # Forms with an onIdle handler
+    _idleDue = False # A message is dispatched after last idle time.
+
+    @classmethod
+    def hasWork(cls) -> bool:
+        return cls._idleDue or bool(cls._tasks)
+
+    @classmethod
+    def messageDone(cls):
+        if cls._forms: cls._idleDue = True
+
+    @classmethod
+    def addTask(cls, form, task):
+        if hasattr(task, "__next__"): # A generator
+            def step(gen = task):
+                for _ in gen: return True
+                return False
+        else:
+            step = task
+        cls._tasks.append((form, step))
+
+    @classmethod
+    def setHandler(cls, form, hasHandler: bool):
+        if hasHandler:
+            if form not in cls._forms: cls._forms.append(form)
+        elif form in cls._forms:
+            cls._forms.remove(form)
+
+    @classmethod
+    def removeForm(cls, form):
+        cls.setHandler(form, False)
+        tasks = [item for item in cls._tasks if item[0] is not form]
+        cls._tasks.clear()
+        cls._tasks.extend(tasks)
+
+    @classmethod
+    def runSlice(cls):
+        deadline = time.perf_counter() + cls.sliceTime
+        if cls._idleDue:
+            cls._idleDue = False
+            for form in list(cls._forms):
+                try:
+                    form._raiseIdle()
+                except Exception:
+                    traceback.print_exc() # Other forms & the tasks still run.
+        tasks = cls._tasks
+        while tasks and time.perf_counter() < deadline:
+            item = tasks[0]
+            try:
+                more = item[1]()
+            except Exception:
+                traceback.print_exc() # Same as an error in a window procedure. Loop goes on.
+                more = False
+            if tasks and tasks[0] is item: # Task might be removed in the step.
+                if more:
+                    tasks.rotate(-1)
+                else:
+                    tasks.popleft()
+#-----------------End of IdleQueue Class----------------------------
+
+
 class Area:
     __slots__ = ("width", "height")
     def __init__(self, w, h) -> None:
@@ -143,7 +380,9 @@ class MyMessages:
     BUDDY_RESET = 9013
     MENU_ADDED = 9014
     NOTIFY_GPBOX = 9015
+    DRAW_ITEM = 9016
     THREAD_MSG = con.WM_USER + 5
+    INVOKE_MSG = con.WM_USER + 6
 
 
 
@@ -319,6 +319,11 @@ BST_PUSHED = 0x0004
 BST_FOCUS = 0x0008
 # -endregion Button Styles
 
+# -region Bitmap Constants
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+# -endregion Bitmap Constants
+
 # -region Pen Style Constants
 PS_SOLID = 0
 PS_DASH = 1
@@ -548,6 +553,32 @@ SWP_DEFERERASE = 0x2000
 SWP_ASYNCWINDOWPOS = 0x4000
 # -endregion SetWindowPos
 
+# -region Message Loop Constants
+PM_NOREMOVE = 0x0000
+PM_REMOVE = 0x0001
+QS_ALLINPUT = 0x04FF
+MWMO_INPUTAVAILABLE = 0x0004
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
+WAIT_TIMEOUT = 258
+MAXIMUM_WAIT_OBJECTS = 64
+USER_TIMER_MINIMUM = 0x0000000A
+CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+TIMER_ALL_ACCESS = 0x001F0003
+FD_READ = 0x01
+FD_WRITE = 0x02
+FD_OOB = 0x04
+FD_ACCEPT = 0x08
+FD_CONNECT = 0x10
+FD_CLOSE = 0x20
+# -endregion Message Loop
+
+# -region WM_SIZE Constants
+SIZE_RESTORED = 0
+SIZE_MINIMIZED = 1
+SIZE_MAXIMIZED = 2
+# -endregion WM_SIZE
+
 # -region Font Constants
 OUT_DEFAULT_PRECIS = 0
 OUT_STRING_PRECIS = 1
@@ -765,6 +796,10 @@ ODS_NOACCEL = 0x0100
 ODS_NOFOCUSRECT = 0x0200
 
 ODT_MENU = 1
+ODT_LISTBOX = 2
+
+COLOR_HIGHLIGHT = 13
+COLOR_HIGHLIGHTTEXT = 14
 
 # -endregion
 
@@ -945,6 +980,8 @@ TVIF_IMAGE = 0x0002
 TVIF_PARAM = 0x0004
 TVIF_STATE = 0x0008
 TVIF_SELECTEDIMAGE = 0x0020
+TVIF_CHILDREN = 0x0040
+I_CHILDRENCALLBACK = -1
 
 TVIS_SELECTED = 0x0002
 TVIS_CUT = 0x0004
@@ -975,6 +1012,19 @@ TVM_SETBKCOLOR = (TV_FIRST + 29)
 TVM_SETTEXTCOLOR = (TV_FIRST + 30)
 TVM_SETLINECOLOR = (TV_FIRST + 40)
 TVM_INSERTITEMW = (TV_FIRST + 50)
+TVM_EXPAND = (TV_FIRST + 2)
+TVM_SETITEMW = (TV_FIRST + 63)
+
+TVE_COLLAPSE = 0x0001
+TVE_EXPAND = 0x0002
+TVE_TOGGLE = 0x0003
+TVE_COLLAPSERESET = 0x8000
+
+TVN_FIRST = (UINT_MAX-400)
+TVN_GETDISPINFOW = (TVN_FIRST-52)
+TVN_ITEMEXPANDINGW = (TVN_FIRST-54)
+TVN_ITEMEXPANDEDW = (TVN_FIRST-55)
+TVN_DELETEITEMW = (TVN_FIRST-58)
 
 
 
@@ -2,15 +2,16 @@
 
 
 from ctypes.wintypes import UINT, HWND
-from ctypes import create_unicode_buffer, byref, sizeof, cast
+from ctypes import create_unicode_buffer, byref, sizeof, cast, addressof
 from pyforms.src.enums import ControlType
 from pyforms.src.commons import Font, MyMessages
 from pyforms.src.apis import MapWindowPoints, LPPOINT, INITCOMMONCONTROLSEX, DWORD
 import pyforms.src.apis as api
 import pyforms.src.constants as con
-from pyforms.src.events import EventArgs, MouseEventArgs, KeyEventArgs, KeyPressEventArgs
-from pyforms.src.colors import Color, COLOR_BLACK
+from pyforms.src.events import EventArgs, EventArgsPool, MouseEventArgs, KeyEventArgs, KeyPressEventArgs
+from pyforms.src.colors import Color, GdiPool, COLOR_BLACK
 import datetime
+import weakref
 # from horology import Timing
 
 
@@ -56,6 +57,56 @@ class InitComCtls:
             res = api.InitCommonControlsEx(byref(self.icc_ex))
 
 
+class HwndRegistry:
+    """Maps window handles to their Form/Control objects. Window procedures get their
+        object from here. Objects are weakly referenced, so a control which is gone
+        will drop out of the registry. Forms are kept alive until their window is destroyed.
+        Procs must call HwndRegistry.remove when they get the last destroy message."""
+    _refs = {} # Key - HWND, Value - weakref to the object
+    _pinned = {} # Key - HWND, Value - object. Top level windows, nobody else holds them.
+    _counts = {"added": 0, "removed": 0, "collected": 0}
+
+    @classmethod
+    def add(cls, hwnd, obj, keepAlive: bool = False):
+        """Register an object for given window handle"""
+        cls._refs[hwnd] = weakref.ref(obj, lambda ref, hwnd = hwnd: cls._collected(hwnd, ref))
+        if keepAlive: cls._pinned[hwnd] = obj
+        cls._counts["added"] += 1
+
+    @classmethod
+    def get(cls, hwnd):
+        """Returns the object of given window handle. Raises KeyError if there is none."""
+        return cls._refs[hwnd]()
+
+    @classmethod
+    def find(cls, hwnd, default = None):
+        """Returns the object of given window handle or default"""
+        ref = cls._refs.get(hwnd)
+        return ref() if ref else default
+
+    @classmethod
+    def remove(cls, hwnd):
+        """Forget the given window handle"""
+        if cls._refs.pop(hwnd, None) is not None: cls._counts["removed"] += 1
+        cls._pinned.pop(hwnd, None)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Returns the registered handle count (total & per class) and added/removed/collected counts"""
+        types = {}
+        for ref in cls._refs.values():
+            name = type(ref()).__name__
+            types[name] = types.get(name, 0) + 1
+        return {"handles": len(cls._refs), "types": types, **cls._counts}
+
+    @classmethod
+    def _collected(cls, hwnd, ref):
+        # Object is gone without a destroy message. Handle might be registered again.
+        if cls._refs.get(hwnd) is ref:
+            del cls._refs[hwnd]
+            cls._counts["collected"] += 1
+#-----------------End of HwndRegistry Class----------------------------
+
 
 class Control:
     """
@@ -68,11 +119,11 @@ class Control:
     __slots__ = ("tvar", "name", "_hwnd", "_text", "_width", "_height", "_style", "_exStyle", "_hInst", "_visible",
                  "_clsName", "_cid", "_xpos", "_ypos", "_parent", "_isCreated", "_isTextable", "_lBtnDown",
                  "_rBtnDown", "_isMouseEntered", "_ctlType", "_font", "_fgColor", "_bgColor", "_drawFlag",
-                 "_hasBrush", "_bkgBrush", "_contextMenu", "_keyMod", "_disable",
+                 "_hasBrush", "_bkgBrush", "_contextMenu", "_keyMod", "_disable", "_msgMap", "_eaPool",
                   "_onMouseEnter", "onMouseDown", "onMouseUp", "onRightMouseDown", "onRightMouseUp",
-                  "onRightClick", "_onMouseLeave", "onDoubleClick", "onMouseWheel", "onMouseMove",
-                  "onMouseHover", "onKeyDown", "onKeyUp", "onKeyPress", "onPaint", "onGotFocus",
-                  "onLostFocus", "onClick")
+                  "onRightClick", "_onMouseLeave", "onDoubleClick", "onMouseWheel", "_onMouseMove",
+                  "_onMouseHover", "onKeyDown", "onKeyUp", "onKeyPress", "onPaint", "onGotFocus",
+                  "onLostFocus", "onClick", "_scId", "__weakref__")
 
     def __init__(self) -> None:
         self.name = ""
@@ -103,21 +154,26 @@ class Control:
         self._contextMenu = None
         self._keyMod = 0
         self._disable = False
+        self._scId = 0 # Id of our subclass proc. _setSubclass sets it.
+        # No mouse handlers yet. So mouse tracking messages are not in this map.
+        # It's shared with other instances until we change it.
+        self._msgMap = self._getQuietTable()
+        self._eaPool = None
 
 
         # Events
-        self.onMouseEnter = None
+        self._onMouseEnter = None
         self.onMouseDown = None
         self.onMouseUp = None
         self.onClick = None
         self.onRightMouseDown = None
         self.onRightMouseUp = None
         self.onRightClick = None
-        self.onMouseLeave = None
+        self._onMouseLeave = None
         self.onDoubleClick = None
         self.onMouseWheel = None
-        self.onMouseMove = None
-        self.onMouseHover = None
+        self._onMouseMove = None
+        self._onMouseHover = None
         self.onKeyDown = None
         self.onKeyUp = None
         self.onKeyPress = None
@@ -138,7 +194,7 @@ class Control:
         self._width = width
         self._height = height
         if self._isCreated:
-            api.SetWindowPos(self._hwnd, None, self._xpos, self._ypos, self._width, self._height, con.SWP_NOZORDER)
+            self._setWindowPos(self._hwnd, self._xpos, self._ypos, self._width, self._height, con.SWP_NOZORDER)
     #----------------------------------------------
 
     def setPosition(self, xpos : int, ypos : int):
@@ -146,7 +202,7 @@ class Control:
         self._xpos = xpos
         self._ypos = ypos
         if self._isCreated:
-            api.SetWindowPos(self._hwnd, None, self._xpos, self._ypos, self._width, self._height, con.SWP_NOZORDER)
+            self._setWindowPos(self._hwnd, self._xpos, self._ypos, self._width, self._height, con.SWP_NOZORDER)
 
     def focus(self):
         if self._isCreated: api.SetFocus(self._hwnd)
@@ -194,12 +250,85 @@ class Control:
         api.SendMessage(self._hwnd, con.WM_SETFONT, self._font._hwnd, True)
 
 
+    # Layout uses this to move & resize the control in one go.
+    def _setBounds(self, x, y, width, height):
+        self._xpos = x
+        self._ypos = y
+        self._width = width
+        self._height = height
+        if self._isCreated:
+            self._setWindowPos(self._hwnd, x, y, width, height, con.SWP_NOZORDER)
+
+    # If parent form is in a batchLayout block, change will be applied at the end of it.
+    def _setWindowPos(self, hwnd, x, y, width, height, flags):
+        batch = self._parent._layoutBatch if self._parent else None
+        if batch:
+            batch.add(hwnd, x, y, width, height, flags)
+        else:
+            api.SetWindowPos(hwnd, None, x, y, width, height, flags)
+
     # Setting subclass for this control.
     def _setSubclass(self, subClsFunc):
         """Replacing the 'WndProc' function for this control."""
-        api.SetWindowSubclass(self._hwnd, subClsFunc, Control._subclass_id, 0)
+        self._scId = Control._subclass_id
+        api.SetWindowSubclass(self._hwnd, subClsFunc, self._scId, 0)
         Control._subclass_id += 1
 
+    def _addStringsBulk(self, texts, addMsg, storageMsg, subClsFunc):
+        """Add lots of strings to a list box or combo box.
+            Storage for all the strings is allocated once & one buffer is used for all of them.
+            For a big load, our subclass proc is detached. Otherwise each add message
+            comes back to python just to go to DefSubclassProc.
+            'subClsFunc' must be the proc given to _setSubclass. SetWindowSubclass puts it back
+            on top of the chain. That's the same place, since we don't add another subclass to
+            a list box or combo box after ours. (Combo's edit subclass is on another window.)"""
+        if not texts: return
+        hwnd = self._hwnd
+        send = api.SendMessage
+        chars = sum(map(len, texts)) + len(texts)
+        send(hwnd, storageMsg, len(texts), chars * 2) # In bytes
+        buff = create_unicode_buffer(max(map(len, texts)) * 2 + 1) # Room for surrogate pairs.
+        addr = addressof(buff)
+        detach = len(texts) > 64
+        if detach: api.RemoveWindowSubclass(hwnd, subClsFunc, self._scId)
+        try:
+            for txt in texts:
+                buff.value = txt
+                send(hwnd, addMsg, 0, addr)
+        finally:
+            if detach: api.SetWindowSubclass(hwnd, subClsFunc, self._scId, 0)
+
+    def _getQuietTable(self):
+        # Class's message table without the mouse tracking messages.
+        table = _quietTables.get(type(self))
+        if table is None:
+            table = {msg: func for msg, func in self._msgTable.items() if msg not in _mouseMsgs}
+            _quietTables[type(self)] = table
+        return table
+
+    def _setMsgHandler(self, msg, handler):
+        """Add or remove (if handler is None) a message handler for this instance only."""
+        if self._msgMap is self._msgTable or self._msgMap is _quietTables.get(type(self)):
+            self._msgMap = dict(self._msgMap)
+        if handler:
+            self._msgMap[msg] = handler
+        else:
+            self._msgMap.pop(msg, None)
+
+    def _updateMouseRoute(self):
+        # Mouse move, leave & hover messages go to our handlers only if there is
+        # a handler for any of the mouse move/enter/leave/hover events.
+        # NOTE: The window/subclass proc is still called for each of them. Without
+        # handlers, we only skip the handler, TrackMouseEvent & EventArgs work after the lookup.
+        wanted = bool(self._onMouseMove or self._onMouseEnter or self._onMouseLeave or self._onMouseHover)
+        if not wanted: self._isMouseEntered = False
+        if self._msgMap is self._msgTable or self._msgMap is _quietTables.get(type(self)):
+            self._msgMap = self._msgTable if wanted else self._getQuietTable()
+        else:
+            for msg in _mouseMsgs:
+                handler = self._msgTable.get(msg)
+                if handler: self._setMsgHandler(msg, handler if wanted else None)
+
     # Internal function to get the text from control
     def _getCtrlText(self):
         """Return the text from this control."""
@@ -227,6 +356,16 @@ class Control:
         api.GetWindowText(hwnd, buffer, tLen)
         return buffer.value
 
+    # Background brushes are coming from GdiPool. So we must give back the old one.
+    def _resetBkgBrush(self):
+        if self._bkgBrush: GdiPool.release(self._bkgBrush)
+        self._bkgBrush = self._bgColor.getBrush()
+
+    def _releaseBkgBrush(self):
+        if self._bkgBrush:
+            GdiPool.release(self._bkgBrush)
+            self._bkgBrush = None
+
     # Internal function to invalidate controls if needed
     def _manageRedraw(self):
         """If this control is created, send a command to redraw it"""
@@ -371,7 +510,7 @@ class Control:
         """Set the control's height"""
         self._height = value
         if self._isCreated:
-            api.SetWindowPos(self._hwnd, None, self._xpos, self._ypos, self._width, self._height, con.SWP_NOMOVE)
+            self._setWindowPos(self._hwnd, self._xpos, self._ypos, self._width, self._height, con.SWP_NOMOVE)
     #--------------------------------------------HEIGHT
 
     @property
@@ -403,7 +542,7 @@ class Control:
             self._bgColor = value
 
         if self._drawFlag & 2 != 2: self._drawFlag += 2 # _drawFlag --> 0=no_color, 1=fore_color, 2=back_color
-        if self._isCreated and self._hasBrush: self._bkgBrush = self._bgColor.createHBrush()
+        if self._isCreated and (self._hasBrush or self._bkgBrush): self._resetBkgBrush()
         self._manageRedraw()
     #--------------------------------------------BACKCOLOR
 
@@ -428,16 +567,50 @@ class Control:
         return self._onMouseEnter
 
     @onMouseEnter.setter
-    def onMouseEnter(self, value): self._onMouseEnter = value
+    def onMouseEnter(self, value):
+        self._onMouseEnter = value
+        self._updateMouseRoute()
     #--------------------------------------------[10]---------
 
     @property
     def onMouseLeave(self): return self._onMouseLeave
 
     @onMouseLeave.setter
-    def onMouseLeave(self, value): self._onMouseLeave = value
+    def onMouseLeave(self, value):
+        self._onMouseLeave = value
+        self._updateMouseRoute()
+    #--------------------------------------------[11]---------
+
+    @property
+    def onMouseMove(self): return self._onMouseMove
+
+    @onMouseMove.setter
+    def onMouseMove(self, value):
+        self._onMouseMove = value
+        self._updateMouseRoute()
+    #--------------------------------------------[12]---------
+
+    @property
+    def onMouseHover(self): return self._onMouseHover
+
+    @onMouseHover.setter
+    def onMouseHover(self, value):
+        self._onMouseHover = value
+        self._updateMouseRoute()
     #--------------------------------------------[11]---------
 
+    @property
+    def reuseEventArgs(self):
+        """Returns True if mouse & key event args are reused"""
+        return self._eaPool is not None
+
+    @reuseEventArgs.setter
+    def reuseEventArgs(self, value: bool):
+        """Set True to reuse mouse & key event args between events.
+            Don't keep a reference to event args after your handler returns."""
+        self._eaPool = EventArgsPool() if value else None
+    #--------------------------------------------[13]---------
+
     @property
     def right(self):
         """Get the right point of control's rect"""
@@ -479,40 +652,71 @@ class Control:
 
 
     # -region Event handlers
+    # If reuseEventArgs is on, event args are coming from the pool. They go back after the handler.
+    def _raiseMouseEvent(self, handler, msg, wpm, lpm):
+        pool = self._eaPool
+        if pool:
+            ea = pool.acquire(MouseEventArgs)
+            ea._set(msg, wpm, lpm)
+            try: handler(self, ea)
+            finally: pool.release(ea)
+        else:
+            handler(self, MouseEventArgs(msg, wpm, lpm))
+
+    def _raiseKeyEvent(self, handler, isDown, wpm):
+        pool = self._eaPool
+        if pool:
+            ea = pool.acquire(KeyEventArgs)
+            ea._set(self, isDown, wpm)
+            try: handler(self, ea)
+            finally: pool.release(ea)
+        else:
+            handler(self, KeyEventArgs(self, isDown, wpm))
+
+    def _raiseKeyPress(self, handler, wpm):
+        pool = self._eaPool
+        if pool:
+            ea = pool.acquire(KeyPressEventArgs)
+            ea._set(wpm)
+            try: handler(self, ea)
+            finally: pool.release(ea)
+        else:
+            handler(self, KeyPressEventArgs(wpm))
+
     def _leftMouseDownHandler(self, msg, wpm, lpm):
         if self.onMouseDown:
-            self.onMouseDown(self, MouseEventArgs(msg, wpm, lpm))
+            self._raiseMouseEvent(self.onMouseDown, msg, wpm, lpm)
             return 0
 
 
     def _leftMouseUpHandler(self, msg, wpm, lpm):
-        if self.onMouseUp: self.onMouseUp(self, MouseEventArgs(msg, wpm, lpm))
+        if self.onMouseUp: self._raiseMouseEvent(self.onMouseUp, msg, wpm, lpm)
         if self.onClick: self.onClick(self, EventArgs())
 
 
     def _rightMouseDownHandler(self, msg, wpm, lpm):
         # if self._contextMenu:
         #     self._contextMenu.showContextMenu(self._hwnd, lpm)
-        if self.onRightMouseDown: self.onRightMouseDown(self, MouseEventArgs(msg, wpm, lpm))
+        if self.onRightMouseDown: self._raiseMouseEvent(self.onRightMouseDown, msg, wpm, lpm)
         return 0
 
 
     def _rightMouseUpHandler(self, msg, wpm, lpm):
         # print("control right down")
         # if self._contextMenu: self._contextMenu.showContextMenu(self._hwnd, lpm)
-        if self.onRightMouseUp: self.onRightMouseUp(self, MouseEventArgs(msg, wpm, lpm))
+        if self.onRightMouseUp: self._raiseMouseEvent(self.onRightMouseUp, msg, wpm, lpm)
         if self.onRightClick: self.onRightClick(self, EventArgs())
 
 
 
     def _mouseWheenHandler(self, msg, wpm, lpm):
-        if self.onMouseWheel: self.onMouseWheel(self, MouseEventArgs(msg, wpm, lpm))
+        if self.onMouseWheel: self._raiseMouseEvent(self.onMouseWheel, msg, wpm, lpm)
 
 
 
     def _mouseMoveHandler(self, msg, wpm, lpm):
         if self._isMouseEntered:
-            if self.onMouseMove: self.onMouseMove(self, MouseEventArgs(msg, wpm, lpm))
+            if self._onMouseMove: self._raiseMouseEvent(self._onMouseMove, msg, wpm, lpm)
         if not self._isMouseEntered:
             self._isMouseEntered = True
             if self._onMouseEnter: self._onMouseEnter(self, EventArgs())
@@ -526,15 +730,15 @@ class Control:
 
 
     def _keyDownHandler(self, wpm):
-        if self.onKeyDown: self.onKeyDown(self, KeyEventArgs(self, True, wpm))
+        if self.onKeyDown: self._raiseKeyEvent(self.onKeyDown, True, wpm)
         return 0
 
     def _keyUpHandler(self, wpm):
-        if self.onKeyUp: self.onKeyUp(self, KeyEventArgs(self, False, wpm))
+        if self.onKeyUp: self._raiseKeyEvent(self.onKeyUp, False, wpm)
         return 0
 
     def _keyPressHandler(self, wp):
-        if self.onKeyPress: self.onKeyPress(self, KeyPressEventArgs(wp))
+        if self.onKeyPress: self._raiseKeyPress(self.onKeyPress, wp)
         return 0
 
     def _gotFocusHandler(self):
@@ -554,6 +758,55 @@ class Control:
 
 
 
+# -region Message dispatch
+# Window procedures look up the message in control's _msgMap & call the handler.
+# Handlers receive (control, hwnd, message, wParam, lParam). If a handler returns
+# None, message will go to the default proc. Otherwise, it's the return value.
+# Messages which are not in the map go straight to the default proc.
+def _setFocusMsg(ctl, hw, msg, wp, lp): ctl._gotFocusHandler()
+def _killFocusMsg(ctl, hw, msg, wp, lp): ctl._lostFocusHandler()
+def _lButtonDownMsg(ctl, hw, msg, wp, lp): ctl._leftMouseDownHandler(msg, wp, lp)
+def _lButtonUpMsg(ctl, hw, msg, wp, lp): ctl._leftMouseUpHandler(msg, wp, lp)
+def _rButtonDownMsg(ctl, hw, msg, wp, lp): ctl._rightMouseDownHandler(msg, wp, lp)
+def _rButtonUpMsg(ctl, hw, msg, wp, lp): ctl._rightMouseUpHandler(msg, wp, lp)
+def _mouseWheelMsg(ctl, hw, msg, wp, lp): ctl._mouseWheenHandler(msg, wp, lp)
+def _mouseMoveMsg(ctl, hw, msg, wp, lp): ctl._mouseMoveHandler(msg, wp, lp)
+def _mouseLeaveMsg(ctl, hw, msg, wp, lp): ctl._mouseLeaveHandler()
+def _contextMenuMsg(ctl, hw, msg, wp, lp): ctl._wmContextMenuHandler(lp)
+
+def ownerMouseMsg(ctl, hw, msg, wp, lp):
+    # For child windows of a control (like the edit in a combo). Mouse tracking
+    # messages are handled only if owner control's map wants them.
+    handler = ctl._msgMap.get(msg)
+    if handler: return handler(ctl, hw, msg, wp, lp)
+
+# Messages handled by almost every control.
+ctlMsgMap = {
+    con.WM_SETFOCUS: _setFocusMsg,
+    con.WM_KILLFOCUS: _killFocusMsg,
+    con.WM_LBUTTONDOWN: _lButtonDownMsg,
+    con.WM_LBUTTONUP: _lButtonUpMsg,
+    con.WM_RBUTTONDOWN: _rButtonDownMsg,
+    con.WM_RBUTTONUP: _rButtonUpMsg,
+    con.WM_MOUSEWHEEL: _mouseWheelMsg,
+    con.WM_MOUSEMOVE: _mouseMoveMsg,
+    con.WM_MOUSELEAVE: _mouseLeaveMsg,
+}
+
+def makeMsgMap(extra: dict = None, exclude = ()) -> dict:
+    """Returns a new message table. Common control handlers + extra handlers, minus the excluded messages."""
+    table = {msg: func for msg, func in ctlMsgMap.items() if msg not in exclude}
+    if extra: table.update(extra)
+    return table
+
+# Mouse tracking messages. They are in a control's map only if it has mouse handlers.
+_mouseMsgs = (con.WM_MOUSEMOVE, con.WM_MOUSELEAVE, con.WM_MOUSEHOVER)
+_quietTables = {} # Key - class, Value - message table of that class without _mouseMsgs
+
+Control._msgTable = ctlMsgMap
+# -endregion Message dispatch
+
+
 # A handy connection function for connecting functions to events.
 def connect(obj: Control, event: str):
     def wrapper(func):
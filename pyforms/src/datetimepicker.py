@@ -1,8 +1,8 @@
 # datetimepicker module - Created on 10-Dec-2022 17:45:20
 
 from ctypes.wintypes import HWND, UINT
-from ctypes import WINFUNCTYPE, addressof, create_unicode_buffer, cast, create_string_buffer
-from pyforms.src.control import Control
+from ctypes import addressof, create_unicode_buffer, cast, create_string_buffer
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType, DateFormat
@@ -12,7 +12,6 @@ import pyforms.src.apis as api
 from pyforms.src.colors import Color
 from datetime import datetime
 
-dtpDict = {}
 dtpStyle = con.WS_CHILD | con.WS_VISIBLE
 OBJ_BRUSH = 0x00000002
 
@@ -77,7 +76,7 @@ class DateTimePicker(Control):
         self._setStyles()
         self._createControl()
         if self._hwnd:
-            dtpDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(dtpWndProc)
             self._setFontInternal()
             #
@@ -127,7 +126,7 @@ class DateTimePicker(Control):
         if self._shotDateNames: self._style |= con.MCS_SHORTDAYSOFWEEK
         if self._rightAlign: self._style |= con.DTS_RIGHTALIGN
         if self._showUpdown: self._style ^= con.DTS_UPDOWN
-        self._bkgBrush = self._bgColor.createHBrush()
+        self._resetBkgBrush()
 
     # -endregion Private funcs
 
@@ -268,54 +267,51 @@ class DateTimePicker(Control):
 @SUBCLASSPROC
 def dtpWndProc(hw, msg, wp, lp, scID, refData):
     # printWinMsg(msg)
-    dtp = dtpDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, dtpWndProc, scID)
-            del dtpDict[hw]
-
-        case MyMessages.CTRL_NOTIFY:
-            nm = cast(lp, LPNMHDR).contents
-            match nm.code:
-                case con.DTN_USERSTRINGW:
-                     # if dtp.on_text_changed:
-                     dts = cast(lp, api.LPNMDATETIMESTRINGW).contents
-                     dea = DateTimeEventArgs(dts.pszUserString, dts.st)
-                    #  print(dts.st.wYear)
-                     return 0
-
-                case con.DTN_DROPDOWN:
-                    if dtp.onCalendarOpened:
-                        dtp.onCalendarOpened(dtp, EventArgs())
-                        return 0
-
-                case con.DTN_CLOSEUP:
-                    if dtp.onCalendarClosed:
-                        dtp.onCalendarClosed(dtp, EventArgs())
-                        return 0
-
-                case con.DTN_DATETIMECHANGE:
-                    # For unknown reason, this notification occurs two times back to back.
-                    # So, we need to use a boolean flag to suppress one notification.
-                    if dtp._eventHandled:
-                        dtp._eventHandled = False
-                    else:
-                        # print("273")
-                        dtp._eventHandled = True
-                        dic = cast(lp, LPNMDATETIMECHANGE).contents
-                        dtp._value = dtp._makeDateTime(dic.st)
-                        if dtp.onValueChanged:
-                            dtp.onValueChanged(dtp, EventArgs())
-                            return 0
-
-        case con.WM_SETFOCUS: dtp._gotFocusHandler()
-        case con.WM_KILLFOCUS: dtp._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: dtp._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: dtp._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: dtp._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: dtp._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: dtp._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: dtp._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: dtp._mouseLeaveHandler()
+    dtp = HwndRegistry.get(hw)
+    handler = dtp._msgMap.get(msg)
+    if handler:
+        ret = handler(dtp, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, dtpWndProc, scID)
+        dtp._releaseBkgBrush()
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _dtpNotifyMsg(dtp, hw, msg, wp, lp):
+    nm = cast(lp, LPNMHDR).contents
+    match nm.code:
+        case con.DTN_USERSTRINGW:
+             # if dtp.on_text_changed:
+             dts = cast(lp, api.LPNMDATETIMESTRINGW).contents
+             dea = DateTimeEventArgs(dts.pszUserString, dts.st)
+            #  print(dts.st.wYear)
+             return 0
+
+        case con.DTN_DROPDOWN:
+            if dtp.onCalendarOpened:
+                dtp.onCalendarOpened(dtp, EventArgs())
+                return 0
+
+        case con.DTN_CLOSEUP:
+            if dtp.onCalendarClosed:
+                dtp.onCalendarClosed(dtp, EventArgs())
+                return 0
+
+        case con.DTN_DATETIMECHANGE:
+            # For unknown reason, this notification occurs two times back to back.
+            # So, we need to use a boolean flag to suppress one notification.
+            if dtp._eventHandled:
+                dtp._eventHandled = False
+            else:
+                # print("273")
+                dtp._eventHandled = True
+                dic = cast(lp, LPNMDATETIMECHANGE).contents
+                dtp._value = dtp._makeDateTime(dic.st)
+                if dtp.onValueChanged:
+                    dtp.onValueChanged(dtp, EventArgs())
+                    return 0
+
+DateTimePicker._msgTable = makeMsgMap({MyMessages.CTRL_NOTIFY: _dtpNotifyMsg})
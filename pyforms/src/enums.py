@@ -1,5 +1,5 @@
 # Created on 09-Nov-2022 12:15:29
-from enum import Enum
+from enum import Enum, Flag
 
 class FormPosition(Enum):
     CENTER = 0
@@ -398,3 +398,24 @@ class Keys(Enum):
     SHIFT_MODIFIER = 65_536
     CTRL_MODIFIER = 131_072
     ALT_MODIFIER = 262_144
+
+class Anchor(Flag): # For Layout. Edges of the container which a control keeps it's distance to.
+    NONE = 0
+    LEFT = 1
+    TOP = 2
+    RIGHT = 4
+    BOTTOM = 8
+    TOP_LEFT = 3
+    ALL = 15
+
+class Dock(Enum): # For Layout
+    NONE = 0
+    TOP = 1
+    BOTTOM = 2
+    LEFT = 3
+    RIGHT = 4
+    FILL = 5
+
+class FilterMode(Enum): # For ComboBox.filterItems
+    PREFIX = 0
+    SUBSTRING = 1
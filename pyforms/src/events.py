@@ -11,68 +11,124 @@ from pyforms.src.enums import MouseButtonState, MouseButton, Keys, SizedPosition
 mouseMsgList = [con.WM_MOUSEWHEEL, con.WM_MOUSEMOVE, con.WM_MOUSEHOVER, con.WM_NCHITTEST,
                 con.WM_LBUTTONDOWN, con.WM_LBUTTONUP, con.WM_RBUTTONDOWN, con.WM_RBUTTONUP]
 class EventArgs:
+    __slots__ = ("handled", "data", "testvar")
     def __init__(self) -> None:
         self.handled = False
         self.data = None
         self.testvar = 100
 
 
+class EventArgsPool:
+    """Keeps used event args of a control for reusing them in next events.
+        An object is given back to the pool when the handler returns."""
+    __slots__ = ("_free", )
+    def __init__(self) -> None:
+        self._free = {} # Key - EventArgs class, Value - list of free objects
+
+    def acquire(self, cls):
+        free = self._free.get(cls)
+        return free.pop() if free else cls.__new__(cls)
+
+    def release(self, ea):
+        self._free.setdefault(type(ea), []).append(ea)
+
+
+# Mouse & key event args only keep the raw message data.
+# Properties are decoding them when a handler asks for it.
+_leftBtnMsgs = (con.WM_LBUTTONDOWN, con.WM_LBUTTONUP)
+_rightBtnMsgs = (con.WM_RBUTTONDOWN, con.WM_RBUTTONUP)
+
 class MouseEventArgs(EventArgs):
+    __slots__ = ("_msg", "_wp", "_lp")
     def __init__(self, msg, wp, lp) -> None:
-        super().__init__()
-        _fwKeys = getKeyState(wp)
-        self.delta = getWheelDelta(wp)
-        match _fwKeys:
-            case 5: self.shiftKey = MouseButtonState.PRESSED
-            case 9: self.ctrlKey = MouseButtonState.PRESSED
-            case 17: self.mouseButton = MouseButton.MIDDLE
-            case 33: self.mouseButton = MouseButton.XBUTTON1
-
-        if msg in mouseMsgList: # This list is declared upside of this file.
-            self.xpos = int(api.LOWORD(lp))
-            self.ypos = int(api.HIWORD(lp))
-
-        match msg:
-            case con.WM_LBUTTONDOWN, con.WM_LBUTTONUP:self.mouseButton = MouseButton.LEFT
-            case con.WM_RBUTTONDOWN, con.WM_RBUTTONUP: self.mouseButton = MouseButton.RIGHT
+        self._set(msg, wp, lp)
+
+    def _set(self, msg, wp, lp):
+        self.handled = False
+        self.data = None
+        self._msg = msg
+        self._wp = wp
+        self._lp = lp
+
+    @property
+    def xpos(self) -> int: return int(api.LOWORD(self._lp))
+
+    @property
+    def ypos(self) -> int: return int(api.HIWORD(self._lp))
+
+    @property
+    def delta(self) -> int: return getWheelDelta(self._wp)
+
+    @property
+    def shiftKey(self) -> MouseButtonState:
+        return MouseButtonState.PRESSED if getKeyState(self._wp) == 5 else MouseButtonState.RELEASED
+
+    @property
+    def ctrlKey(self) -> MouseButtonState:
+        return MouseButtonState.PRESSED if getKeyState(self._wp) == 9 else MouseButtonState.RELEASED
+
+    @property
+    def mouseButton(self) -> MouseButton:
+        if self._msg in _leftBtnMsgs: return MouseButton.LEFT
+        if self._msg in _rightBtnMsgs: return MouseButton.RIGHT
+        match getKeyState(self._wp):
+            case 17: return MouseButton.MIDDLE
+            case 33: return MouseButton.XBUTTON1
+        return MouseButton.NONE
 #--------------------------------End of MouseEventArgs
 
+_modifiers = {Keys.SHIFT.value: (1, Keys.SHIFT_MODIFIER),
+              Keys.CTRL.value: (2, Keys.CTRL_MODIFIER),
+              Keys.ALT.value: (4, Keys.ALT_MODIFIER)}
+
 class KeyEventArgs(EventArgs):
+    __slots__ = ("_wp", "_keyMod")
     def __init__(self, ctl, isDown, wp) -> None:
-        super().__init__()
-        self.keyCode = Keys(wp)
-        self.keyValue = self.keyCode.value
-        self.shiftPressed = False
-        self.ctrlPressed = False
-        self.altPressed = False
+        self._set(ctl, isDown, wp)
+
+    def _set(self, ctl, isDown, wp):
+        self.handled = False
+        self.data = None
+        self._wp = wp
+        # Modifier state of the control must be updated on every key event.
+        mod = _modifiers.get(wp)
+        if mod: ctl._keyMod += mod[0] if isDown else -mod[0]
+        self._keyMod = ctl._keyMod
 
-        match self.keyCode:
-            case Keys.SHIFT:
-                # self.shiftPressed = isDown
-                self.modifier = Keys.SHIFT_MODIFIER
-                ctl._keyMod += 1 if isDown else -1
+    @property
+    def keyCode(self) -> Keys: return Keys(self._wp)
+
+    @property
+    def keyValue(self) -> int: return self._wp
 
-            case Keys.CTRL:
-                # self.ctrlPressed = isDown
-                self.modifier = Keys.CTRL_MODIFIER
-                ctl._keyMod += 2 if isDown else -2
-            case Keys.ALT:
-                # self.altPressed = isDown
-                self.modifier = Keys.ALT_MODIFIER
-                ctl._keyMod += 4 if isDown else -4
+    @property
+    def modifier(self) -> Keys:
+        mod = _modifiers.get(self._wp)
+        return mod[1] if mod else Keys.NONE
 
-        self.shiftPressed = bool(ctl._keyMod & 1)
-        self.ctrlPressed = bool(ctl._keyMod & 2)
-        self.altPressed = bool(ctl._keyMod & 4)
+    @property
+    def shiftPressed(self) -> bool: return bool(self._keyMod & 1)
 
+    @property
+    def ctrlPressed(self) -> bool: return bool(self._keyMod & 2)
 
+    @property
+    def altPressed(self) -> bool: return bool(self._keyMod & 4)
 
 #------------------------End of KeyEventArgs-----------
 
 class KeyPressEventArgs(EventArgs):
+    __slots__ = ("_wp", )
     def __init__(self, wp) -> None:
-        super().__init__()
-        self.keyChar = chr(wp)
+        self._set(wp)
+
+    def _set(self, wp):
+        self.handled = False
+        self.data = None
+        self._wp = wp
+
+    @property
+    def keyChar(self) -> str: return chr(self._wp)
 
 #--------------------End of KeyPressEventArgs------------
 
@@ -1,21 +1,26 @@
 # Created on 08-Nov-2022 00:05:26
 
-from ctypes import cast, byref, sizeof, POINTER, py_object, create_unicode_buffer, WINFUNCTYPE
+from ctypes import cast, byref, sizeof, POINTER, py_object, create_unicode_buffer
 from ctypes.wintypes import LPCWSTR, HBRUSH
 import pyforms.src.constants as con
 import pyforms.src.apis as api
 from pyforms.src.apis import WNDPROC, RECT, WNDCLASSEX, LPNMHDR, LRESULT, LPMEASUREITEMSTRUCT, GetDC, MessageBox
 import pyforms.src.apis as api
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry
 from pyforms.src.enums import FormPosition, FormStyle, FormState, FormDrawMode, MessageButtons, MessageIcons, ControlType
-from pyforms.src.commons import Font, MyMessages, getMouseXpoint, getMouseYpoint, MyMessages, menuTxtFlag, getMousePoints
-from pyforms.src.events import EventArgs, MouseEventArgs, SizeEventArgs
-from pyforms.src.colors import _createGradientBrush, RgbColor, Color, COLOR_BLACK
-from pyforms.src.menubar import MenuType
+from pyforms.src.commons import Font, MyMessages, getMouseXpoint, getMouseYpoint, MyMessages, menuTxtFlag, getMousePoints, Timing, IdleQueue
+from pyforms.src.events import EventArgs, SizeEventArgs
+from pyforms.src.colors import getGradientBrush, RgbColor, Color, COLOR_BLACK
+from pyforms.src.menubar import MenuType, MenuRegistry, MF_POPUP
+from pyforms.src.layout import Layout
+import pyforms.src.asyncloop as asyncloop
+from pyforms.src.timers import Timer, TimerWheel
 # from . import messagebox
 import pyforms.src.winmsgs
-from horology import Timing
 import os
+import threading
+from collections import deque
+from concurrent.futures import Future
 
 class StaticData: # A singleton object which used to hold essential data for a form to start
     hInstance = 0
@@ -27,18 +32,38 @@ class StaticData: # A singleton object which used to hold essential data for a f
     currForm = None
 
 
-formDict = {} # This dictionary contains all the form class. We can get them in wndProcMain function
 pp_counter = 1 # IMPORTANT: This variable is used in `print_pont` function.
 
+def _runMessageLoop():
+    # GetMessage waits for the next message. But if there is idle work or a high resolution
+    # timer, we peek. When the queue is empty, due timers are fired & a slice of idle work is
+    # done. If there is no idle work, we wait for the timer or a message.
+    tMsg = api.MSG()
+    while True:
+        if IdleQueue.hasWork() or TimerWheel.hiResArmed:
+            if not api.PeekMessage(byref(tMsg), None, 0, 0, con.PM_REMOVE):
+                if TimerWheel.hiResArmed: TimerWheel.fireDue()
+                if IdleQueue.hasWork():
+                    IdleQueue.runSlice()
+                elif TimerWheel.hiResArmed:
+                    TimerWheel.waitHiRes()
+                continue
+            if tMsg.message == con.WM_QUIT: break
+        elif api.GetMessage(byref(tMsg), None, 0, 0) <= 0:
+            break
+        api.TranslateMessage(byref(tMsg))
+        api.DispatchMessage(byref(tMsg))
+        IdleQueue.messageDone()
+
 def printPoint2(frm, mea):
     global pp_counter
     print(f"[{pp_counter}] X : {mea.xpos}, Y : {mea.ypos}")
     pp_counter += 1
 
 # @lru_cache(maxsize=50)
-# def get_form(hwnd): return formDict.get(hwnd, StaticData.currForm)
+# def get_form(hwnd): return HwndRegistry.find(hwnd, StaticData.currForm)
 
-# def get_form1(hwnd): return formDict.get(hwnd, StaticData.currForm)
+# def get_form1(hwnd): return HwndRegistry.find(hwnd, StaticData.currForm)
 
 # primeMsgs = [con.WM_GETMINMAXINFO, con.WM_NCCREATE, con.WM_NCDESTROY, con.WM_NCCALCSIZE, con.WM_CREATE]
 
@@ -48,179 +73,179 @@ def printPoint2(frm, mea):
 @WNDPROC
 def wndProcMain(hw, message, wParam, lParam) -> LRESULT:
     # winmsgs.log_msg(message, "Form")
-    this = formDict.get(hw, StaticData.currForm)
+    # Before CreateWindowEx returns, the form is not registered yet. So we use the current form.
+    this = HwndRegistry.find(hw, StaticData.currForm)
+    handler = this._msgMap.get(message)
+    if handler:
+        ret = handler(this, hw, message, wParam, lParam)
+        if ret is not None: return ret
+
+    return api.DefWindowProc(hw, message, wParam, lParam)
+
 
-    match message:
-        case con.WM_NCDESTROY:
-            this.cleanTimers()
-            if this._isMainWindow :
-                api.PostQuitMessage(0)
-                return 1
-        case MyMessages.THREAD_MSG:
-            if this.onThreadMsg:
-                this.onThreadMsg(wParam, lParam)
+# Message handlers for wndProcMain. They receive (form, hwnd, message, wParam, lParam)
+# If a handler returns None, message will go to DefWindowProc.
+def _frmNcDestroyMsg(this, hw, msg, wp, lp):
+    this.cleanTimers()
+    this._invoker._close()
+    IdleQueue.removeForm(this)
+    for menu in this._menuItemDict.values():
+        if menu._type == MenuType.BASE_MENU: MenuRegistry.remove(menu) # Menu bar is destroyed with the window.
+    if this._menuDraw: this._menuDraw.release()
+    HwndRegistry.remove(hw)
+    if this._isMainWindow :
+        api.PostQuitMessage(0)
+        return 1
 
-        case con.WM_TIMER: this.handle_wmtimer(wParam)
+def _frmThreadMsg(this, hw, msg, wp, lp):
+    if this.onThreadMsg:
+        this.onThreadMsg(wp, lp)
 
+def _frmInvokeMsg(this, hw, msg, wp, lp): this._invoker._drain()
 
 #   -region No problem messages
-        # case con.WM_SHOWWINDOW: this._formShownHandler() # NOT NEEDED
-        case con.WM_ACTIVATEAPP: this._formActivateHandler(wParam)
-        case con.WM_KEYDOWN | con.WM_SYSKEYDOWN: this._keyDownHandler(wParam)
-        case con.WM_KEYUP | con.WM_SYSKEYUP: this._keyUpHandler(wParam)
-        case con.WM_CHAR: this._keyPressHandler(wParam)
-        case con.WM_LBUTTONDOWN: this._leftMouseDownHandler(message, wParam, lParam)
-        case con.WM_LBUTTONUP: this._leftMouseUpHandler(message, wParam, lParam)
-        case con.WM_RBUTTONDOWN: this._rightMouseDownHandler(message, wParam, lParam)
-        case con.WM_RBUTTONUP: this._rightMouseUpHandler(message, wParam, lParam)
-        case con.WM_MOUSEWHEEL: this._mouseWheenHandler(message, wParam, lParam)
-        case con.WM_MOUSEMOVE: this._formMouseMoveHandler(hw, message, wParam, lParam)
-        case con.WM_MOUSELEAVE: this._formMouseLeaveHandler()
-        case con.WM_MOUSEHOVER: this._formMouseHoverHandler(message, wParam, lParam)
-        case con.WM_SIZING:
-            return this._formSizingHandler(message, wParam, lParam)
-        case con.WM_SIZE:
-            return this._formSizedHandler(message, wParam, lParam)
-        case con.WM_MOVING: return this._formMovingHandler(lParam)
-        case con.WM_MOVE: return this._formMovedHandler(lParam)
-        case con.WM_ERASEBKGND:
-            if this._drawMode != FormDrawMode.NORMAL:
-                this._formEraseBkgHandler(hw, wParam)
-                return 1
-
-        case con.WM_SYSCOMMAND: this._frmSysCommandHandler(wParam, lParam)
-        case con.WM_CLOSE: this._formClosingHandler()
-        case con.WM_DESTROY: this._formClosedHandler()
+def _frmActivateAppMsg(this, hw, msg, wp, lp): this._formActivateHandler(wp)
+def _frmKeyDownMsg(this, hw, msg, wp, lp): this._keyDownHandler(wp)
+def _frmKeyUpMsg(this, hw, msg, wp, lp): this._keyUpHandler(wp)
+def _frmCharMsg(this, hw, msg, wp, lp): this._keyPressHandler(wp)
+def _frmLButtonDownMsg(this, hw, msg, wp, lp): this._leftMouseDownHandler(msg, wp, lp)
+def _frmLButtonUpMsg(this, hw, msg, wp, lp): this._leftMouseUpHandler(msg, wp, lp)
+def _frmRButtonDownMsg(this, hw, msg, wp, lp): this._rightMouseDownHandler(msg, wp, lp)
+def _frmRButtonUpMsg(this, hw, msg, wp, lp): this._rightMouseUpHandler(msg, wp, lp)
+def _frmMouseWheelMsg(this, hw, msg, wp, lp): this._mouseWheenHandler(msg, wp, lp)
+def _frmMouseMoveMsg(this, hw, msg, wp, lp): this._formMouseMoveHandler(hw, msg, wp, lp)
+def _frmMouseLeaveMsg(this, hw, msg, wp, lp): this._formMouseLeaveHandler()
+def _frmMouseHoverMsg(this, hw, msg, wp, lp): this._formMouseHoverHandler(msg, wp, lp)
+def _frmSizingMsg(this, hw, msg, wp, lp): return this._formSizingHandler(msg, wp, lp)
+def _frmSizeMsg(this, hw, msg, wp, lp): return this._formSizedHandler(msg, wp, lp)
+def _frmMovingMsg(this, hw, msg, wp, lp): return this._formMovingHandler(lp)
+def _frmMoveMsg(this, hw, msg, wp, lp): return this._formMovedHandler(lp)
+
+def _frmEraseBkgMsg(this, hw, msg, wp, lp):
+    if this._drawMode != FormDrawMode.NORMAL:
+        this._formEraseBkgHandler(hw, wp)
+        return 1
+
+def _frmSysCommandMsg(this, hw, msg, wp, lp): this._frmSysCommandHandler(wp, lp)
+def _frmCloseMsg(this, hw, msg, wp, lp): this._formClosingHandler()
+def _frmDestroyMsg(this, hw, msg, wp, lp): this._formClosedHandler()
 #   -endregion No problem messages
 
 # -region Diverted messages
-        case con.WM_CTLCOLOREDIT:
-            return api.SendMessage(lParam, MyMessages.EDIT_COLOR, wParam, lParam)
-
-        case con.WM_CTLCOLORSTATIC:
-            return api.SendMessage(lParam, MyMessages.LABEL_COLOR, wParam, lParam)
-
-        case con.WM_CTLCOLORLISTBOX:
-            from_combo = this._comboDict.get(lParam, lParam)
-            # print("setting text color")
-            # if from_combo:
-            return api.SendMessage(from_combo, MyMessages.LIST_COLOR, wParam, lParam)
-            # else:
-                # return api.SendMessage(lParam, MyMessages.LIST_COLOR, wParam, lParam)
-
-        case con.WM_COMMAND:
-            # print(f"wm command : {api.HIWORD(wParam) = }, {api.LOWORD(wParam) = }, {lParam = }")
-            match lParam:
-                case 0:
-                    if api.HIWORD(wParam) == 0:
-                        return this._menuClickHandler(api.LOWORD(wParam))
-                    elif api.HIWORD(wParam) == 1:
-                        pass # accelerator key commands
-
-                case _:
-                    # ctlHwnd = HWND(lParam)
-                    return api.SendMessage(lParam, MyMessages.CTL_COMMAND, wParam, lParam)
-
-        case con.WM_HSCROLL:
-            return api.SendMessage(lParam, MyMessages.HORI_SCROLL, wParam, lParam)
-
-        case con.WM_VSCROLL:
-            return api.SendMessage(lParam, MyMessages.VERT_SCROLL, wParam, lParam)
-
-        case con.WM_NOTIFY:
-            nm = cast(lParam, LPNMHDR).contents
-            return  api.SendMessage(nm.hwndFrom, MyMessages.CTRL_NOTIFY, wParam, lParam)
-
+def _frmCtlColorEditMsg(this, hw, msg, wp, lp):
+    return api.SendMessage(lp, MyMessages.EDIT_COLOR, wp, lp)
+
+def _frmCtlColorStaticMsg(this, hw, msg, wp, lp):
+    return api.SendMessage(lp, MyMessages.LABEL_COLOR, wp, lp)
+
+def _frmCtlColorListBoxMsg(this, hw, msg, wp, lp):
+    from_combo = this._comboDict.get(lp, lp)
+    return api.SendMessage(from_combo, MyMessages.LIST_COLOR, wp, lp)
+
+def _frmCommandMsg(this, hw, msg, wp, lp):
+    # print(f"wm command : {api.HIWORD(wp) = }, {api.LOWORD(wp) = }, {lp = }")
+    match lp:
+        case 0:
+            if api.HIWORD(wp) == 0:
+                return this._menuClickHandler(api.LOWORD(wp))
+            elif api.HIWORD(wp) == 1:
+                pass # accelerator key commands
+
+        case _:
+            # ctlHwnd = HWND(lp)
+            return api.SendMessage(lp, MyMessages.CTL_COMMAND, wp, lp)
+
+def _frmHScrollMsg(this, hw, msg, wp, lp):
+    return api.SendMessage(lp, MyMessages.HORI_SCROLL, wp, lp)
+
+def _frmVScrollMsg(this, hw, msg, wp, lp):
+    return api.SendMessage(lp, MyMessages.VERT_SCROLL, wp, lp)
+
+def _frmNotifyMsg(this, hw, msg, wp, lp):
+    nm = cast(lp, LPNMHDR).contents
+    return  api.SendMessage(nm.hwndFrom, MyMessages.CTRL_NOTIFY, wp, lp)
 # -endregion
 
-        # case MyMessages.MENU_EVENT_SET:
-        #     menu = cast(lParam, py_object).value
-        #     this._menuEventDict[menu._id] = menu
-
 # -region Menu Section
-        case con.WM_MEASUREITEM:
-            pmi = cast(lParam, LPMEASUREITEMSTRUCT).contents
-            mi = cast(pmi.itemData, py_object).value
-            if mi._type == MenuType.BASE_MENU:
-                hdc = GetDC(hw)
-                size = api.SIZE()
-                api.GetTextExtentPoint32(hdc, mi._wTxt, len(mi._text), byref(size))
-                api.ReleaseDC(hw, hdc)
-                pmi.itemWidth = size.cx #+ 10
-                pmi.itemHeight = size.cy
-            else:
-
-                pmi.itemWidth = 100 #size.cx #+ 10
-                pmi.itemHeight = 25
-            return True
-
-        case con.WM_DRAWITEM:
-            dis = cast(lParam, api.LPDRAWITEMSTRUCT).contents
-            mi = cast(dis.itemData, py_object).value
-            txtClrRef = mi._fgColor.ref
-
-            if dis.itemState == 320 or dis.itemState == 257:
-                if mi._isEnabled:
-                    rc = api.RECT(dis.rcItem.left + 4, dis.rcItem.top + 2, dis.rcItem.right, dis.rcItem.bottom - 2)
-                    api.FillRect(dis.hDC, byref(rc), this._menuHotBgBrush)
-                    api.FrameRect(dis.hDC, byref(rc), this._menuFrameBrush)
-                    txtClrRef = 0x00000000
-                else:
-                    api.FillRect(dis.hDC, byref(rc), this._menuGrayBrush)
-                    txtClrRef = this._menuGrayCref
-            else:
-                api.FillRect(dis.hDC, byref(dis.rcItem), this._menuDefBgBrush)
-                if not mi._isEnabled: txtClrRef = this._menuGrayCref
-
-            api.SetBkMode(dis.hDC, con.TRANSPARENT)
-            if mi._type == MenuType.BASE_MENU:
-                dis.rcItem.left += 10
-            else:
-                dis.rcItem.left += 25
-            api.SelectObject(dis.hDC, this._menuFont.handle)
-            api.SetTextColor(dis.hDC, txtClrRef)
-            api.DrawText(dis.hDC, mi._wideText, -1, byref(dis.rcItem), menuTxtFlag)
-            return 0
-
-        case MyMessages.MENU_ADDED:
-            # When user adds a menu item to another menu item, the parent menu will inform us.
-            this._menuItemDict[wParam] = cast(lParam, py_object).value
-            return 0
-
-
-
-        # case con.WM_ENTERMENULOOP:
-        #     print("case con.WM_ENTERMENULOOP ", wParam)
-        # case con.WM_EXITMENULOOP:
-        #     print("case con.WM_EXITMENULOOP:")
-
-        case con.WM_MENUSELECT:
-            pmenu = this._getMenuFromHmenu(lParam)
-            mid = api.LOWORD(wParam) # Could be an id of a child menu or index of a child menu
-            hwwpm = api.HIWORD(wParam)
-            if pmenu:
-                menu = None
-                match hwwpm:
-                    case 33152: # A normal child menu. We can use mid ad menu id.
-                        menu = this._menuItemDict.get(mid, 0)
-                    case 33168: # A popup child menu. We can use mid as index.
-                        menu = pmenu.getChildFromIndex(mid)
-                if menu and menu.onFocus: menu.onFocus(menu, EventArgs())
-
-        case con.WM_INITMENUPOPUP:
-            menu = this._getMenuFromHmenu(wParam)
-            if menu and menu.onPopup:
-                menu.onPopup(menu, EventArgs())
-
-        case con.WM_UNINITMENUPOPUP:
-            menu = this._getMenuFromHmenu(wParam)
-            if menu and menu.onCloseup:
-                menu.onCloseup(menu, EventArgs())
+def _frmMeasureItemMsg(this, hw, msg, wp, lp):
+    pmi = cast(lp, LPMEASUREITEMSTRUCT).contents
+    if pmi.CtlType != con.ODT_MENU: return True # Owner drawn controls set their item height later.
+    mi = cast(pmi.itemData, py_object).value
+    pmi.itemWidth, pmi.itemHeight = mi._measure(this._menuDraw.font._hwnd)
+    return True
+
+def _frmDrawItemMsg(this, hw, msg, wp, lp):
+    dis = cast(lp, api.LPDRAWITEMSTRUCT).contents
+    if dis.CtlType != con.ODT_MENU: return api.SendMessage(dis.hwndItem, MyMessages.DRAW_ITEM, wp, lp)
+    this._menuDraw.draw(dis, cast(dis.itemData, py_object).value)
+    return 0
+
+def _frmMenuAddedMsg(this, hw, msg, wp, lp):
+    # When user adds a menu item to another menu item, the parent menu will inform us.
+    this._menuItemDict[wp] = cast(lp, py_object).value
+    return 0
+
+def _frmMenuSelectMsg(this, hw, msg, wp, lp):
+    if not lp: return # Menu is closed.
+    mid = api.LOWORD(wp) # Could be an id of a child menu or index of a child menu
+    if api.HIWORD(wp) & MF_POPUP: # A popup child menu. We can use mid as index.
+        menu = MenuRegistry.fromPos(lp, mid)
+    else: # A normal child menu. We can use mid as menu id.
+        menu = this._menuItemDict.get(mid)
+    if menu and menu.onFocus: menu.onFocus(menu, EventArgs())
+
+def _frmInitMenuPopupMsg(this, hw, msg, wp, lp):
+    menu = this._getMenuFromHmenu(wp)
+    if menu and menu.onPopup:
+        menu.onPopup(menu, EventArgs())
+
+def _frmUninitMenuPopupMsg(this, hw, msg, wp, lp):
+    menu = this._getMenuFromHmenu(wp)
+    if menu and menu.onCloseup:
+        menu.onCloseup(menu, EventArgs())
 # -endregion Menu section
 
-
-
-    return api.DefWindowProc(hw, message, wParam, lParam)
+# Messages which are not in this map will go straight to DefWindowProc.
+formMsgMap = {
+    con.WM_NCDESTROY: _frmNcDestroyMsg,
+    MyMessages.THREAD_MSG: _frmThreadMsg,
+    MyMessages.INVOKE_MSG: _frmInvokeMsg,
+    con.WM_ACTIVATEAPP: _frmActivateAppMsg,
+    con.WM_KEYDOWN: _frmKeyDownMsg,
+    con.WM_SYSKEYDOWN: _frmKeyDownMsg,
+    con.WM_KEYUP: _frmKeyUpMsg,
+    con.WM_SYSKEYUP: _frmKeyUpMsg,
+    con.WM_CHAR: _frmCharMsg,
+    con.WM_LBUTTONDOWN: _frmLButtonDownMsg,
+    con.WM_LBUTTONUP: _frmLButtonUpMsg,
+    con.WM_RBUTTONDOWN: _frmRButtonDownMsg,
+    con.WM_RBUTTONUP: _frmRButtonUpMsg,
+    con.WM_MOUSEWHEEL: _frmMouseWheelMsg,
+    con.WM_MOUSEMOVE: _frmMouseMoveMsg,
+    con.WM_MOUSELEAVE: _frmMouseLeaveMsg,
+    con.WM_MOUSEHOVER: _frmMouseHoverMsg,
+    con.WM_SIZING: _frmSizingMsg,
+    con.WM_SIZE: _frmSizeMsg,
+    con.WM_MOVING: _frmMovingMsg,
+    con.WM_MOVE: _frmMoveMsg,
+    con.WM_ERASEBKGND: _frmEraseBkgMsg,
+    con.WM_SYSCOMMAND: _frmSysCommandMsg,
+    con.WM_CLOSE: _frmCloseMsg,
+    con.WM_DESTROY: _frmDestroyMsg,
+    con.WM_CTLCOLOREDIT: _frmCtlColorEditMsg,
+    con.WM_CTLCOLORSTATIC: _frmCtlColorStaticMsg,
+    con.WM_CTLCOLORLISTBOX: _frmCtlColorListBoxMsg,
+    con.WM_COMMAND: _frmCommandMsg,
+    con.WM_HSCROLL: _frmHScrollMsg,
+    con.WM_VSCROLL: _frmVScrollMsg,
+    con.WM_NOTIFY: _frmNotifyMsg,
+    con.WM_MEASUREITEM: _frmMeasureItemMsg,
+    con.WM_DRAWITEM: _frmDrawItemMsg,
+    MyMessages.MENU_ADDED: _frmMenuAddedMsg,
+    con.WM_MENUSELECT: _frmMenuSelectMsg,
+    con.WM_INITMENUPOPUP: _frmInitMenuPopupMsg,
+    con.WM_UNINITMENUPOPUP: _frmUninitMenuPopupMsg,
+}
 
 
 #//////////////////////////////////////////////////////////////
@@ -247,33 +272,128 @@ def make_window_class(proc):
     # print("StaticData.defWinColor.ref-----  ", StaticData.defWinColor.ref)
     return wc
 
-class Timer:
-    def __init__(self, parent, tickInterval = 100, tickHandler = None) -> None:
-        self.interval = tickInterval
-        self.onTick = tickHandler
-        self._isEnabled = False
-        if parent._staticTimerID > 0:
-            parent._staticTimerID += 1
-        else:
-            parent._staticTimerID = parent._count * 1000
-
-        self._idNum = parent._staticTimerID
-        self._parent = parent
-
-    def start(self):
-        self._isEnabled = True
-        api.SetTimer(self._parent._hwnd, self._idNum, self.interval, api.TIMERPROC(0))
-
-    def stop(self):
-        api.KillTimer(self._parent._hwnd, self._idNum)
-        self._isEnabled = False
-
-    def _destructor(self):
-        if self._isEnabled:
-            api.KillTimer(self._parent._hwnd, self._idNum)
-
-
-
+class LayoutBatch:
+    """Collects the position & size changes of a form's controls and applies them
+        in one DeferWindowPos pass. Repeated changes of a control are merged.
+        Get it from Form.batchLayout and use it in a 'with' statement."""
+    __slots__ = ("_form", "_depth", "_items")
+    _moveSize = con.SWP_NOMOVE | con.SWP_NOSIZE
+
+    def __init__(self, form) -> None:
+        self._form = form
+        self._depth = 0
+        self._items = {} # Key - hwnd, Value - [x, y, width, height, flags]
+
+    def __enter__(self):
+        self._depth += 1
+        self._form._layoutBatch = self
+        return self
+
+    def __exit__(self, etp, evalue, etb):
+        self._depth -= 1
+        if self._depth == 0:
+            self._form._layoutBatch = None
+            self._commit()
+
+    def add(self, hwnd, x, y, width, height, flags):
+        item = self._items.get(hwnd)
+        if item is None:
+            self._items[hwnd] = [x, y, width, height, flags]
+            return
+        # Later values win. But a move or resize from any of the changes must be kept.
+        if not flags & con.SWP_NOMOVE: item[0], item[1] = x, y
+        if not flags & con.SWP_NOSIZE: item[2], item[3] = width, height
+        item[4] = (item[4] & flags & self._moveSize) | ((item[4] | flags) & ~self._moveSize)
+
+    def _commit(self):
+        items = self._items
+        if not items: return
+        hdwp = api.BeginDeferWindowPos(len(items))
+        for hwnd, (x, y, width, height, flags) in items.items():
+            if hdwp: hdwp = api.DeferWindowPos(hdwp, hwnd, None, x, y, width, height, flags)
+        if hdwp:
+            api.EndDeferWindowPos(hdwp)
+        else: # System failed to defer. Windows gave up the whole batch, so do it one by one.
+            for hwnd, (x, y, width, height, flags) in items.items():
+                api.SetWindowPos(hwnd, None, x, y, width, height, flags)
+        items.clear()
+#-----------------End of LayoutBatch Class----------------------------
+
+
+class Invoker:
+    """Runs the calls & property updates from worker threads on the UI thread.
+        Workers only append to a deque and post one INVOKE_MSG till the UI thread
+        wakes up. Then UI thread drains everything in one go.
+        After the form is destroyed, new calls get a cancelled Future and updates are dropped."""
+    __slots__ = ("_form", "_calls", "_updates", "_posted", "_threadId", "_closed", "_lock")
+    def __init__(self, form) -> None:
+        self._form = form
+        self._calls = deque() # Items are (Future, func, args)
+        self._updates = {} # Key - (control, property name), Value - latest value
+        self._posted = False
+        self._threadId = None
+        self._closed = False
+        self._lock = threading.Lock() # Closing can't come between a worker's check & append.
+
+    def onUiThread(self) -> bool:
+        return self._threadId == threading.get_ident()
+
+    def addCall(self, func, args) -> Future:
+        fut = Future()
+        with self._lock:
+            if self._closed:
+                fut.cancel() # Nobody will run it. A worker waiting on it gets CancelledError.
+                return fut
+            self._calls.append((fut, func, args))
+            self._wake()
+        return fut
+
+    def addUpdate(self, control, propName, value):
+        with self._lock:
+            if self._closed: return
+            self._updates[(control, propName)] = value
+            self._wake()
+
+    def _wake(self):
+        if not self._posted:
+            self._posted = True
+            if not api.PostMessage(self._form._hwnd, MyMessages.INVOKE_MSG, 0, 0):
+                # Window is gone or the queue is full. Queued calls would wait forever.
+                self._posted = False
+                self._cancelAll()
+
+    def _drain(self):
+        # Flag goes down first. A worker which comes after this will post again.
+        self._posted = False
+        calls = self._calls
+        for _ in range(len(calls)): # Only what we have now. Later ones will get their own message.
+            fut, func, args = calls.popleft()
+            if not fut.set_running_or_notify_cancel(): continue
+            try:
+                fut.set_result(func(*args))
+            except BaseException as err:
+                fut.set_exception(err)
+
+        updates = self._updates
+        while updates:
+            try:
+                (control, propName), value = updates.popitem()
+            except KeyError: # Emptied after we checked.
+                break
+            setattr(control, propName, value)
+
+    def _cancelAll(self):
+        while self._calls: self._calls.popleft()[0].cancel()
+        self._updates.clear()
+
+    def _close(self):
+        # Form is destroyed. Under the lock, so a worker either queued before this
+        # (and gets cancelled here) or sees the flag and can't queue anything.
+        with self._lock:
+            self._closed = True
+            self._cancelAll()
+            self._posted = False
+#-----------------End of Invoker Class----------------------------
 
 
 #//////////////////////////////////////////////////////////////
@@ -290,9 +410,9 @@ class Form(Control):
                     "_mainWinHwnd", "_isMainWindow", "_isMouseTracking", "_drawMode", "_isNormalDraw", "_updRect",
                     "_formID", "_comboDict", "onLoad", "onMinimized", "onMaximized", "onRestored", "onClosing",
                     "onClosed", "onActivate", "onDeActivate", "onMoving", "onMoved", "onSizing", "onSized",
-                    "onThreadMsg", "_menuGrayBrush", "_menuGrayCref", "_menuEventDict", "_menuItemDict", "_controls",
-                    "_menuDefBgBrush", "_menuHotBgBrush", "_menuFont", "_menuFrameBrush", "_mGClr1", "_mGClr2",
-                    "_mGt2b", "_timerDic", "_staticTimerID", "_dummyEA" )
+                    "onThreadMsg", "_menuDraw", "_menuEventDict", "_menuItemDict", "_controls",
+                    "_mGClr1", "_mGClr2",
+                    "_mGt2b", "_timerDic", "_dummyEA", "_layoutBatch", "_layout", "_invoker", "_onIdle" )
 
     def __init__(self, txt = "", width = 500, height = 400, auto = False) -> None:
         super().__init__()
@@ -322,16 +442,16 @@ class Form(Control):
         self._updRect = None
         self._menuEventDict = {}
         self._menuItemDict = {}
-        self._menuFrameBrush = None
-        self._menuGrayBrush = None
-        self._menuGrayCref = None
+        self._menuDraw = None # Made by the menu bar
         self._mGClr1 = None
         self._mGClr2 = None
         self._mGt2b = None
         self._controls = []
         self._timerDic = {}
-        self._staticTimerID = 0
         self._dummyEA = EventArgs()
+        self._layoutBatch = None
+        self._layout = None
+        self._invoker = Invoker(self)
         # print("form inited")
 
 
@@ -349,6 +469,7 @@ class Form(Control):
         self.onSizing = None
         self.onSized = None
         self.onThreadMsg = None
+        self._onIdle = None
 
         Form._count += 1
         if auto: self.createHandle()
@@ -371,8 +492,9 @@ class Form(Control):
                                         0, 0, self.wnd_class.hInstance, None)
 
         if self._hwnd:
-            formDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self, keepAlive = True)
             self._isCreated = True
+            self._invoker._threadId = threading.get_ident()
             self._setFontInternal()
             StaticData.currForm = None
             # print(f"{self._exStyle = }, {self._style = }")
@@ -400,6 +522,7 @@ class Form(Control):
         """Display a window. If it's the first window, then it will start the main loop"""
         with Timing("Time for creating control hwnd: "):
             self._createChildHandles() # Create child control hwnds
+        if self._layout: self._layout.perform() # Docked controls need their first placement.
         api.ShowWindow(self._hwnd, con.SW_SHOW)
         if self.formState == FormState.MINIMIZED :
             api.CloseWindow(self._hwnd)
@@ -410,10 +533,41 @@ class Form(Control):
         if not StaticData.loopStarted:
             self._isMainWindow = True
             StaticData.loopStarted = True
-            tMsg = api.MSG()
-            while api.GetMessage(byref(tMsg), None, 0, 0) > 0:
-                api.TranslateMessage(byref(tMsg))
-                api.DispatchMessage(byref(tMsg))
+            _runMessageLoop()
+
+    def invoke(self, func, *args):
+        """Call 'func' with 'args' on the UI thread and return it's result. Worker threads can use this
+            to update the controls. It waits till the UI thread finishes the call.
+            If the form is closed before the call runs, it raises concurrent.futures.CancelledError."""
+        if self._invoker.onUiThread(): return func(*args)
+        return self.beginInvoke(func, *args).result()
+
+    def beginInvoke(self, func, *args) -> Future:
+        """Queue a call of 'func' with 'args' on the UI thread and return a concurrent.futures.Future.
+            Calls are run in the same order they are queued."""
+        if not self._isCreated: raise Exception("Form handle is not created")
+        return self._invoker.addCall(func, args)
+
+    def postUpdate(self, control, propName: str, value):
+        """Set a property of a control from a worker thread. If the same property gets new values
+            before the UI thread sets it, only the last one is used. Example: frm.postUpdate(lbl, "text", "Done")"""
+        if not self._isCreated: raise Exception("Form handle is not created")
+        self._invoker.addUpdate(control, propName, value)
+
+    def addIdleTask(self, task):
+        """Add a task to run when the message queue is empty. 'task' is a function which returns
+            True if it has more work, or a generator which does a small part of the work in each step.
+            Tasks are removed when this form is closed."""
+        IdleQueue.addTask(self, task)
+
+    def runAsync(self, main = None):
+        """Display this form and run the message loop in an asyncio event loop, so coroutines can
+            update the controls directly. 'main' is an optional coroutine to start with the form.
+            Returns when this form is closed."""
+        if StaticData.loopStarted: raise Exception("Message loop is already running")
+        self._isMainWindow = True
+        StaticData.loopStarted = True
+        return asyncloop.run(self, main)
 
     def msgbox(self, msg: str, title: str = "PyForms Message",
 			btns: MessageButtons = MessageButtons.OKAY,
@@ -427,6 +581,11 @@ class Form(Control):
         self._timerDic[timer._idNum] = timer
         return timer
 
+    def batchLayout(self):
+        """Returns a context manager. Position & size changes of the controls inside the 'with'
+            block are applied together when the block ends. Usage: 'with frm.batchLayout(): ...'"""
+        return self._layoutBatch or LayoutBatch(self)
+
     # -endregion
 
     # -region Private functions
@@ -521,9 +680,8 @@ class Form(Control):
         return 0
 
     def _getMenuFromHmenu(self, menuHandle):
-        for menu in self._menuItemDict.values():
-            if menu._hmenu == menuHandle: return menu
-        return None
+        menu = MenuRegistry.fromHmenu(menuHandle)
+        return menu if menu and menu._formHwnd == self._hwnd else None
 
     def _createChildHandles(self):
         if len(self._controls) > 0:
@@ -533,11 +691,6 @@ class Form(Control):
                     #     ctl._setBackColorFromParent(self._bgColor)
                 if ctl._hwnd == None: ctl.createHandle()
 
-    def handle_wmtimer(self, wpm):
-        timer = self._timerDic.get(wpm, None)
-        if not timer is None and timer.onTick:
-            timer.onTick(self, self._dummyEA)
-
     def cleanTimers(self):
         if len(self._timerDic) > 0:
             for timer in self._timerDic.values():
@@ -570,9 +723,8 @@ class Form(Control):
                     self._isMouseEntered = True
                     ea = EventArgs()
                     self._onMouseEnter(self, ea)
-        if self.onMouseMove:
-            ea = MouseEventArgs(msg, wp, lp)
-            self.onMouseMove(self, ea)
+        if self._onMouseMove:
+            self._raiseMouseEvent(self._onMouseMove, msg, wp, lp)
         return 0
 
     def _formMouseLeaveHandler(self):
@@ -587,11 +739,15 @@ class Form(Control):
 
     def _formMouseHoverHandler(self, msg, wp, lp):
         if self._isMouseTracking: self._isMouseTracking = False
-        if self.onMouseHover:
-            ea = MouseEventArgs(msg, wp, lp)
-            self.onMouseHover(self, ea)
+        if self._onMouseHover:
+            self._raiseMouseEvent(self._onMouseHover, msg, wp, lp)
         return 0
 
+    def _updateMouseRoute(self):
+        super()._updateMouseRoute()
+        # We won't get the mouse leave message to reset this flag.
+        if self._msgMap.get(con.WM_MOUSEMOVE) is None: self._isMouseTracking = False
+
     def _trackMouseEvents(self, hw):
         tme = api.TRACKMOUSEEVENT()
         tme.cbSize = sizeof(api.TRACKMOUSEEVENT)
@@ -609,11 +765,16 @@ class Form(Control):
         return 0
 
     def _formSizedHandler(self, msg, wp, lp):
+        if self._layout and wp != con.SIZE_MINIMIZED:
+            self._layout._resized(api.LOWORD(lp), api.HIWORD(lp))
         if self.onSizing:
             ea = SizeEventArgs(msg, wp, lp)
             self.onSizing(self, ea)
         return 0
 
+    def _raiseIdle(self):
+        if self._onIdle: self._onIdle(self, self._dummyEA)
+
     def _formMovingHandler(self, lp):
         rct = cast(lp, POINTER(RECT)).contents
         self._xpos = rct.left
@@ -663,22 +824,20 @@ class Form(Control):
         if self.onClosed:
             ea = EventArgs()
             self.onClosed(self, ea)
+        self._releaseBkgBrush()
 
 
     def _formEraseBkgHandler(self, hwnd, wp):
         # print("_formEraseBkgHandler started")
         rct = api.get_client_rect(hwnd)
         if self._drawMode == FormDrawMode.COLORED:
-            hbr = api.CreateSolidBrush(self._bgColor.ref)
-            # api.FillRect(wp, byref(rct), hbr)
-            # api.DeleteObject(hbr)
+            if not self._bkgBrush: self._resetBkgBrush()
+            hbr = self._bkgBrush
         elif self._drawMode == FormDrawMode.GRADIENT:
             # with Timing("create gradient speed : "):
-            # print("612 worked")
-            # self._formGradientNew(hwnd, wp, rct)
-            hbr = _createGradientBrush( wp, rct, self._mGClr1, self._mGClr2, self._mGt2b )
-        api.FillRect(wp, byref(rct), hbr)
-        api.DeleteObject(hbr)
+            # Cached by size & colors. Repaints & resizes back to a known size won't rebuild it.
+            hbr = getGradientBrush(rct, self._mGClr1, self._mGClr2, self._mGt2b)
+        if hbr: api.FillRect(wp, byref(rct), hbr)
 
     # -endregion
 
@@ -687,6 +846,23 @@ class Form(Control):
     @property
     def formID(self): return self._formID
 
+    @property
+    def onIdle(self):
+        """Get the idle event handler. It's raised once, when message queue becomes empty."""
+        return self._onIdle
+
+    @onIdle.setter
+    def onIdle(self, value):
+        """Set the idle event handler. Signature is 'func(sender, e)'"""
+        self._onIdle = value
+        IdleQueue.setHandler(self, value is not None)
+
+    @property
+    def layout(self) -> Layout:
+        """Get the anchor & dock layout of this form. Controls added to it are placed on every resize."""
+        if self._layout is None: self._layout = Layout(self, self)
+        return self._layout
+
     @property
     def formPos(self): return self._formPos
 
@@ -741,6 +917,7 @@ class Form(Control):
     @Control.backColor.setter
     def backColor(self, value):
         self._bgColor.updateColor(value)
+        if self._bkgBrush: self._resetBkgBrush()
         self._drawMode = FormDrawMode.COLORED
         if not self._drawFlag: self._drawFlag = 1
         self._isNormalDraw = False
@@ -753,4 +930,6 @@ class Form(Control):
 
     # -endregion
 
-#-----------------------------------------------END OF FORM CLASS-----------------------------------
\ No newline at end of file
+#-----------------------------------------------END OF FORM CLASS-----------------------------------
+
+Form._msgTable = formMsgMap
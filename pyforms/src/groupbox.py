@@ -1,24 +1,24 @@
 # Created on 20-Jan-2023 07:49:20
 
 from ctypes import byref, create_unicode_buffer
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
-from pyforms.src.commons import MyMessages
+from pyforms.src.commons import MyMessages, TextMetrics
 from pyforms.src.enums import ControlType
 from pyforms.src.apis import SUBCLASSPROC
 import pyforms.src.apis as api
-from pyforms.src.colors import Color, COLOR_BLACK
+from pyforms.src.colors import Color, GdiPool, COLOR_BLACK
+from pyforms.src.layout import Layout
 # from horology import Timing
 # from .winmsgs import log_msg
 
-gbDict = {}
 gbStyle = con.WS_CHILD | con.WS_VISIBLE | con.BS_GROUPBOX | con.BS_NOTIFY | con.BS_TOP | con.WS_OVERLAPPED |con.WS_CLIPCHILDREN| con.WS_CLIPSIBLINGS
 gbExStyle = con.WS_EX_RIGHTSCROLLBAR| con.WS_EX_CONTROLPARENT
 
 class GroupBox(Control):
 
     _count = 1
-    __slots__ = ("_pen", "_tmpTxt", "_rect", "_txtWidth")
+    __slots__ = ("_pen", "_tmpTxt", "_rect", "_txtWidth", "_layout")
     def __init__(self, parent, txt: str = "", xpos: int = 10, ypos: int = 10, width: int = 300, height: int = 300, auto = False ) -> None:
         super().__init__()
         self._clsName = "Button"
@@ -38,7 +38,9 @@ class GroupBox(Control):
         self._exStyle = gbExStyle
         self._drawFlag = 0
         self._txtWidth = 0
+        self._pen = None
         self._hwnd = None
+        self._layout = None
         parent._controls.append(self)
         GroupBox._count += 1
         if auto: self.createHandle()
@@ -46,12 +48,11 @@ class GroupBox(Control):
 
     # -region Public funcs
     def createHandle(self):
-        self._bkgBrush = self._bgColor.createHBrush()
-        self._pen = self._bgColor.createHPen()
+        self._resetBrushAndPen()
         self._rect = api.RECT(0, 10, self._width, self._height - 2)
         self._createControl()
         if self._hwnd:
-            gbDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setFontInternal()
             self._getTextSize()
             self._setSubclass(gbWndProc)
@@ -61,13 +62,7 @@ class GroupBox(Control):
 
 
     def _getTextSize(self):
-        # with Timing("Time for normal hdc  : "):
-        hdc = api.GetDC(self._hwnd)
-        size = api.SIZE()
-        api.SelectObject(hdc, self._font._hwnd)
-        api.GetTextExtentPoint32(hdc, self._text, len(self._text), byref(size))
-        api.ReleaseDC(self._hwnd, hdc)
-        self._txtWidth = size.cx + 10
+        self._txtWidth = TextMetrics.measure(self._font._hwnd, self._text)[0] + 10
 
     def _draw_text(self):
         # By drawing text on our own, we can control the look of...
@@ -90,13 +85,29 @@ class GroupBox(Control):
     def _setBackColorFromParent(self, clr):
         if self._drawFlag & 2 != 2: self._drawFlag += 2
         self._bgColor = clr
-        self._bkgBrush = self._bgColor.createHBrush()
-        self._pen = self._bgColor.createHPen()
+        self._resetBrushAndPen()
+
+    def _resetBrushAndPen(self):
+        self._resetBkgBrush()
+        if self._pen: GdiPool.release(self._pen)
+        self._pen = self._bgColor.getPen()
+
+    def _setBounds(self, x, y, width, height):
+        # Controls inside us are form's children. So we need to move them too.
+        if self._layout: self._layout._captureAll()
+        super()._setBounds(x, y, width, height)
+        self._rect = api.RECT(0, 10, self._width, self._height - 2)
+        if self._layout: self._layout.perform()
 
 
     # -endregion Private funcs
 
     # -region Properties
+    @property
+    def layout(self) -> Layout:
+        """Get the anchor & dock layout of this group box. Use it for the controls placed inside it."""
+        if self._layout is None: self._layout = Layout(self, self._parent, (6, 20, 6, 6))
+        return self._layout
 
     @Control.text.setter
     def text(self, value: str):
@@ -134,37 +145,40 @@ class GroupBox(Control):
 def gbWndProc(hw, msg, wp, lp, scID, refData):
     # printWinMsg(msg)
     # log_msg(msg)
-    gb = gbDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, gbWndProc, scID)
-            del gbDict[hw]
-
-        case con.WM_SETFOCUS: gb._gotFocusHandler()
-        case con.WM_KILLFOCUS: gb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: gb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: gb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: gb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: gb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: gb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: gb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: gb._mouseLeaveHandler()
-        case con.WM_ERASEBKGND:
-            if gb._drawFlag:
-                rc = api.get_client_rect(hw)
-                api.FillRect(wp, byref(rc), gb._bkgBrush)
-                return 1
-            # NOTE: Do not return anything outside the 'if', as it will make every static control a mess.
-
-        case con.WM_PAINT:
-            # Let the control do it's painting works.
-            ret = api.DefSubclassProc(hw, msg, wp, lp)
-
-            # Now, we can draw the text over this group box.
-            gb._draw_text()
-            return ret
-
-        case con.WM_GETTEXTLENGTH: return 0
+    gb = HwndRegistry.get(hw)
+    handler = gb._msgMap.get(msg)
+    if handler:
+        ret = handler(gb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, gbWndProc, scID)
+        gb._releaseBkgBrush()
+        GdiPool.release(gb._pen)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _gbEraseBkgMsg(gb, hw, msg, wp, lp):
+    if gb._drawFlag:
+        rc = api.get_client_rect(hw)
+        api.FillRect(wp, byref(rc), gb._bkgBrush)
+        return 1
+    # NOTE: Do not return anything outside the 'if', as it will make every static control a mess.
+
+def _gbPaintMsg(gb, hw, msg, wp, lp):
+    # Let the control do it's painting works.
+    ret = api.DefSubclassProc(hw, msg, wp, lp)
+
+    # Now, we can draw the text over this group box.
+    gb._draw_text()
+    return ret
+
+def _gbGetTextLengthMsg(gb, hw, msg, wp, lp): return 0
+
+GroupBox._msgTable = makeMsgMap({
+    con.WM_ERASEBKGND: _gbEraseBkgMsg,
+    con.WM_PAINT: _gbPaintMsg,
+    con.WM_GETTEXTLENGTH: _gbGetTextLengthMsg,
+})
+
@@ -1,18 +1,17 @@
 #Header module - Created on 17-Apr-2023 18:17:00
 
 from ctypes import byref, create_unicode_buffer, cast, c_wchar_p, addressof
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages, Font
 from pyforms.src.enums import ControlType, TextAlignment, HeaderStyle
 from pyforms.src.events import EventArgs, HeaderEventArgs
 from pyforms.src.apis import SUBCLASSPROC, LPNMCUSTOMDRAW, LPRECT, LPWINDOWPOS
 import pyforms.src.apis as api
-from pyforms.src.colors import Color
+from pyforms.src.colors import Color, GdiPool
 
 from pyforms.src.winmsgs import log_msg
 
-hdrDict = {}
 hdrStyle = con.WS_VISIBLE | con.WS_CHILD | con.HDS_BUTTONS | con.HDS_HORZ #| con.WS_BORDER
 defItems = ["Item1", "Item2", "Item3"]
 
@@ -36,14 +35,18 @@ class CurveInfo:
         self.topHotColor = bgc.getShadedColor(dhAdj)
         self.botHotColor = self.topHotColor.getShadedColor(tbAdj)
 
-        self.topDefBrush = self.topDefColor.createHBrush()
-        self.botDefBrush = self.botDefColor.createHBrush()
-        self.topHotBrush = self.topHotColor.createHBrush()
-        self.botHotBrush = self.botHotColor.createHBrush()
+        self.topDefBrush = self.topDefColor.getBrush()
+        self.botDefBrush = self.botDefColor.getBrush()
+        self.topHotBrush = self.topHotColor.getBrush()
+        self.botHotBrush = self.botHotColor.getBrush()
 
         self.topRect = api.RECT()
         self.botRect = api.RECT()
 
+    def release(self):
+        for hbr in (self.topDefBrush, self.botDefBrush, self.topHotBrush, self.botHotBrush):
+            GdiPool.release(hbr)
+
 
 
 class HeaderItem:
@@ -56,14 +59,22 @@ class HeaderItem:
         self.bgColor = Color(bgc)
         self.fgColor = Color(fgc)
         self._bgcChanged = False
-        self._defBrush = self.bgColor.createHBrush()
-        self._hotBrush = self.bgColor.createHBrush(1.1)
-        self._borderBrush = self.bgColor.createHBrush(0.6)
+        self._defBrush = self.bgColor.getBrush()
+        self._hotBrush = self.bgColor.getBrush(1.1)
+        self._borderBrush = self.bgColor.getBrush(0.6)
         self._curveInfo = None
         #Events
         self.onClick = None
 
 
+    def _release(self):
+        # Give back the brushes to GdiPool
+        GdiPool.release(self._defBrush)
+        GdiPool.release(self._hotBrush)
+        GdiPool.release(self._borderBrush)
+        if self._curveInfo: self._curveInfo.release()
+
+
     def _getTwoRects(self, rc):
         # We need to get two rect from given rc.
         tBottom = (rc.bottom - rc.top ) // 2
@@ -123,7 +134,7 @@ class Header(Control):
         self._setStyles()
         self._createControl()
         if self._hwnd:
-            hdrDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(hdrWndProc)
             self._setFontInternal()
             self._insertItemsInternal()
@@ -148,8 +159,9 @@ class Header(Control):
         if self._flatHdr: self._style |= con.HDS_FLAT
         if self._hotTrack: self._style |= con.HDS_HOTTRACK
         if self._hasCB: self._style |= con.HDS_CHECKBOXES
-        self._bkgBrush = api.CreateSolidBrush(self._bgColor.ref)
-        self._hotBrush = self._bgColor.createHBrush(1.3)
+        self._resetBkgBrush()
+        if self._hotBrush: GdiPool.release(self._hotBrush)
+        self._hotBrush = self._bgColor.getBrush(1.3)
 
 
     def _checkCurveData(self):
@@ -242,7 +254,7 @@ class Header(Control):
 
 
     # Reset the back gound brush for this Header
-    def resetBrush(self): self._bkgBrush = self._bgColor.createHBrush()
+    def resetBrush(self): self._resetBkgBrush()
 
     def findHotItem(self):
         pt = api.POINT()
@@ -308,43 +320,44 @@ class Header(Control):
 @SUBCLASSPROC
 def hdrWndProc(hw, msg, wp, lp, scID, refData):
     # log_msg(msg)
-    this = hdrDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, hdrWndProc, scID)
-            del hdrDict[hw]
-
-        case con.WM_SETFOCUS: this._gotFocusHandler()
-        case con.WM_KILLFOCUS: this._lostFocusHandler()
-        # case con.WM_LBUTTONDOWN: this._leftMouseDownHandler(msg, wp, lp)
-        # case con.WM_LBUTTONUP: this._leftMouseUpHandler(msg, wp, lp)
-        # case con.WM_RBUTTONDOWN: this._rightMouseDownHandler(msg, wp, lp)
-        # case con.WM_RBUTTONUP: this._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: this._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: this._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: this._mouseLeaveHandler()
-
-        case MyMessages.CTRL_NOTIFY:
-            nmh = cast(lp, api.LPNMHDR).contents
-            match nmh.code:
-                case con.NM_CUSTOMDRAW:
-                    nmcd = cast(lp, api.LPNMCUSTOMDRAW).contents
-                    match nmcd.dwDrawStage:
-                        case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
-                        case con.CDDS_ITEMPREPAINT:
-                            # this._drawFlatHeader(nmcd)
-                            this._drawFunc(nmcd)
-                            return con.CDRF_SKIPDEFAULT
-                case con.HDN_ITEMCLICKW:
-                    hdr = cast(lp, api.LPNMHEADER).contents
-                    item = this._items[hdr.iItem]
-                    if item.onClick: item.onClick(this, EventArgs())
-                case con.HDN_ITEMDBLCLICKW:
-                    if this.onDoubleClick: this.onDoubleClick(this, EventArgs())
-                case con.HDN_TRACKW:
-                    if this.onDrag: this.onDrag(this, HeaderEventArgs(lp))
-                case con.NM_RCLICK:
-                    if this.onRightClick: this.onRightClick(this, HeaderEventArgs(lp))
+    this = HwndRegistry.get(hw)
+    handler = this._msgMap.get(msg)
+    if handler:
+        ret = handler(this, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, hdrWndProc, scID)
+        this._releaseBkgBrush()
+        if this._hotBrush: GdiPool.release(this._hotBrush)
+        for item in this._items: item._release()
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _hdrNotifyMsg(this, hw, msg, wp, lp):
+    nmh = cast(lp, api.LPNMHDR).contents
+    match nmh.code:
+        case con.NM_CUSTOMDRAW:
+            nmcd = cast(lp, api.LPNMCUSTOMDRAW).contents
+            match nmcd.dwDrawStage:
+                case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
+                case con.CDDS_ITEMPREPAINT:
+                    # this._drawFlatHeader(nmcd)
+                    this._drawFunc(nmcd)
+                    return con.CDRF_SKIPDEFAULT
+        case con.HDN_ITEMCLICKW:
+            hdr = cast(lp, api.LPNMHEADER).contents
+            item = this._items[hdr.iItem]
+            if item.onClick: item.onClick(this, EventArgs())
+        case con.HDN_ITEMDBLCLICKW:
+            if this.onDoubleClick: this.onDoubleClick(this, EventArgs())
+        case con.HDN_TRACKW:
+            if this.onDrag: this.onDrag(this, HeaderEventArgs(lp))
+        case con.NM_RCLICK:
+            if this.onRightClick: this.onRightClick(this, HeaderEventArgs(lp))
+
+# Mouse button messages are not handled here.
+Header._msgTable = makeMsgMap({MyMessages.CTRL_NOTIFY: _hdrNotifyMsg},
+                              exclude = (con.WM_LBUTTONDOWN, con.WM_LBUTTONUP, con.WM_RBUTTONDOWN, con.WM_RBUTTONUP))
+
@@ -0,0 +1,130 @@
+# Created on 17-Oct-2026 05:40:00
+# itemindex module - Search index for the item texts of a list control.
+# Prefix search uses a sorted array of the lower case texts, so it's a binary search
+# plus the matches. Substring search uses a map of three letter pieces (trigrams)
+# to the items having them. It's built on the first substring search.
+
+from bisect import bisect_left
+import itertools
+
+
+class ItemIndex:
+    """Case insensitive prefix & substring search over item texts.
+        Each text gets a sequence number from 'add'. Numbers grow in the order of adding,
+        so sorting them gives the insertion order. Search results are sorted like that."""
+    __slots__ = ("_texts", "_keys", "_keySeqs", "_grams", "_seq")
+
+    def __init__(self) -> None:
+        self._texts = {} # Key - sequence number, Value - lower case text
+        self._keys = [] # Sorted lower case texts
+        self._keySeqs = [] # Sequence numbers of _keys, in the same order
+        self._grams = None # Key - trigram, Value - set of sequence numbers
+        self._seq = itertools.count()
+
+    def __len__(self): return len(self._texts)
+
+    def add(self, text: str) -> int:
+        """Add a text and return it's sequence number"""
+        seq = next(self._seq)
+        key = text.lower()
+        self._texts[seq] = key
+        pos = bisect_left(self._keys, key)
+        # Same texts are kept in the order of their sequence numbers.
+        while pos < len(self._keys) and self._keys[pos] == key: pos += 1
+        self._keys.insert(pos, key)
+        self._keySeqs.insert(pos, seq)
+        if self._grams is not None: self._addGrams(seq, key)
+        return seq
+
+    def addMany(self, texts) -> list:
+        """Add many texts at once and return their sequence numbers.
+            Sorted array is merged once, instead of an insert for each text."""
+        seqs = []
+        new = []
+        for text in texts:
+            seq = next(self._seq)
+            key = text.lower()
+            self._texts[seq] = key
+            seqs.append(seq)
+            new.append((key, seq))
+            if self._grams is not None: self._addGrams(seq, key)
+        if new:
+            # Sorting the pairs keeps the same texts in the order of their sequence numbers.
+            pairs = list(zip(self._keys, self._keySeqs))
+            pairs.extend(new)
+            pairs.sort()
+            self._keys = [key for key, _ in pairs]
+            self._keySeqs = [seq for _, seq in pairs]
+        return seqs
+
+    def remove(self, seq: int):
+        """Remove the text of given sequence number"""
+        key = self._texts.pop(seq)
+        pos = bisect_left(self._keys, key)
+        while self._keySeqs[pos] != seq: pos += 1
+        del self._keys[pos]
+        del self._keySeqs[pos]
+        if self._grams is not None:
+            for gram in _trigrams(key):
+                seqs = self._grams[gram]
+                seqs.discard(seq)
+                if not seqs: del self._grams[gram]
+
+    def clear(self):
+        self._texts.clear()
+        self._keys.clear()
+        self._keySeqs.clear()
+        self._grams = None
+
+    def find(self, text: str) -> list:
+        """Returns the sequence numbers of the texts equal to given text"""
+        key = text.lower()
+        lo = bisect_left(self._keys, key)
+        hi = lo
+        while hi < len(self._keys) and self._keys[hi] == key: hi += 1
+        return self._keySeqs[lo:hi]
+
+    def prefix(self, text: str) -> list:
+        """Returns the sequence numbers of the texts starting with given text, sorted"""
+        key = text.lower()
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + "\U0010ffff", lo)
+        return sorted(self._keySeqs[lo:hi])
+
+    def contains(self, text: str) -> list:
+        """Returns the sequence numbers of the texts having given text, sorted.
+            Texts shorter than 3 letters are searched one by one."""
+        key = text.lower()
+        if len(key) < 3: return [seq for seq, txt in self._texts.items() if key in txt]
+        if self._grams is None: self._buildGrams()
+        postings = []
+        for gram in _trigrams(key):
+            seqs = self._grams.get(gram)
+            if not seqs: return []
+            postings.append(seqs)
+        postings.sort(key = len)
+        found = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        texts = self._texts
+        # Trigrams can be in a different order in the text. So we check each one.
+        return sorted(seq for seq in found if key in texts[seq])
+
+    def matches(self, seq: int, text: str, substring: bool) -> bool:
+        """Returns true if the text of given sequence number matches the search text"""
+        key = text.lower()
+        return key in self._texts[seq] if substring else self._texts[seq].startswith(key)
+
+    def _buildGrams(self):
+        self._grams = {}
+        for seq, key in self._texts.items(): self._addGrams(seq, key)
+
+    def _addGrams(self, seq, key):
+        grams = self._grams
+        for gram in _trigrams(key):
+            seqs = grams.get(gram)
+            if seqs is None: grams[gram] = {seq}
+            else: seqs.add(seq)
+#-----------------End of ItemIndex Class----------------------------
+
+
+def _trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
@@ -1,15 +1,14 @@
 #Label module - Created on 23-Nov-2022 17:09:20
 
 from ctypes import byref
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
-from pyforms.src.commons import MyMessages
+from pyforms.src.commons import MyMessages, TextMetrics
 from pyforms.src.enums import ControlType, TextAlignment, LabelBorder, LabelAlignment
-from pyforms.src.apis import SIZE, SUBCLASSPROC
+from pyforms.src.apis import SUBCLASSPROC
 import pyforms.src.apis as api
 from pyforms.src.colors import Color
 
-lbDict = {}
 lbStyle = con.WS_VISIBLE | con.WS_CHILD | con.WS_CLIPCHILDREN | con.WS_CLIPSIBLINGS | con.SS_NOTIFY
 
 
@@ -49,11 +48,11 @@ class Label(Control):
     def createHandle(self):
         """Create handle for this label"""
         if self._borderStyle != LabelBorder.NONE: self._adjustBorder()
-        self._bkgBrush = api.CreateSolidBrush(self._bgColor.ref)
+        self._resetBkgBrush()
         self._isAutoSizeNeeded()
         self._createControl()
         if self._hwnd:
-            lbDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(lbWndProc)
             self._setFontInternal()
             if self._autoSize: self._setAutoSize(False)
@@ -109,22 +108,17 @@ class Label(Control):
 
     # Set appropriate size for this Label
     def _setAutoSize(self, redraw):
-        hdc = api.GetDC(self._hwnd)
-        ss = SIZE()
         rct = api.RECT()
-
-        api.SelectObject(hdc, self._font._hwnd)
-        api.GetTextExtentPoint32(hdc, self._text, len(self._text), byref(ss))
-        api.ReleaseDC(self._hwnd, hdc)
-        self._width = ss.cx + 5
-        self._height = ss.cy + 5
+        width, height = TextMetrics.measure(self._font._hwnd, self._text)
+        self._width = width + 5
+        self._height = height + 5
         api.SetWindowPos(self._hwnd, None, self._xpos, self._ypos, self._width, self._height, con.SWP_NOMOVE)
         api.GetClientRect(self._hwnd, byref(rct))
         if redraw: api.InvalidateRect(self._hwnd, byref(rct), True)
 
 
     # Reser the back gound brush for this Label
-    def resetBrush(self): self._bkgBrush = self._bgColor.createHBrush()
+    def resetBrush(self): self._resetBkgBrush()
 
     # -endregion Private funcs
 
@@ -178,26 +172,23 @@ class Label(Control):
 @SUBCLASSPROC
 def lbWndProc(hw, msg, wp, lp, scID, refData):
     # printWinMsg(msg)
-    lb = lbDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, lbWndProc, scID)
-            del lbDict[hw]
-
-        case MyMessages.LABEL_COLOR:
-            if lb._drawFlag & 1: api.SetTextColor(wp, lb._fgColor.ref)
-            api.SetBkColor(wp, lb._bgColor.ref)
-            return lb._bkgBrush
-
-        case con.WM_SETFOCUS: lb._gotFocusHandler()
-        case con.WM_KILLFOCUS: lb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: lb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: lb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: lb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: lb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: lb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: lb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: lb._mouseLeaveHandler()
+    lb = HwndRegistry.get(hw)
+    handler = lb._msgMap.get(msg)
+    if handler:
+        ret = handler(lb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, lbWndProc, scID)
+        lb._releaseBkgBrush()
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _lbLabelColorMsg(lb, hw, msg, wp, lp):
+    if lb._drawFlag & 1: api.SetTextColor(wp, lb._fgColor.ref)
+    api.SetBkColor(wp, lb._bgColor.ref)
+    return lb._bkgBrush
+
+Label._msgTable = makeMsgMap({MyMessages.LABEL_COLOR: _lbLabelColorMsg})
+
@@ -0,0 +1,173 @@
+# Created on 17-Oct-2026 02:40:00
+# layout module - Anchor & dock layout for the controls of a Form or a GroupBox.
+# Layout of a form runs on every WM_SIZE. All the controls are placed in one pass
+# and the changes go to the system in one DeferWindowPos batch.
+
+import pyforms.src.apis as api
+from pyforms.src.enums import Anchor, Dock
+
+
+class LayoutItem:
+    """Layout settings of a control. Returned from Layout.add"""
+    __slots__ = ("control", "anchor", "dock", "minSize", "maxSize", "_base")
+    def __init__(self, control, anchor: Anchor, dock: Dock, minSize, maxSize) -> None:
+        self.control = control
+        self.anchor = anchor
+        self.dock = dock
+        self.minSize = minSize # (width, height) tuple or None
+        self.maxSize = maxSize
+        self._base = None # Container's rect & control's rect when we took the distances.
+
+    def _capture(self, rect):
+        ctl = self.control
+        self._base = (rect, (ctl._xpos, ctl._ypos, ctl._width, ctl._height))
+
+    def _clampWidth(self, width):
+        if self.minSize and width < self.minSize[0]: width = self.minSize[0]
+        if self.maxSize and width > self.maxSize[0]: width = self.maxSize[0]
+        return width
+
+    def _clampHeight(self, height):
+        if self.minSize and height < self.minSize[1]: height = self.minSize[1]
+        if self.maxSize and height > self.maxSize[1]: height = self.maxSize[1]
+        return height
+
+    def _anchoredRect(self, rect):
+        # Controls keep their distance to the anchored edges. If both opposite
+        # edges are anchored, control stretches. If none, it keeps it's relative position.
+        (bx, by, bw, bh), (x, y, width, height) = self._base
+        cx, cy, cw, ch = rect
+        anchor = self.anchor
+        if Anchor.LEFT in anchor and Anchor.RIGHT in anchor:
+            width = self._clampWidth(cw - (bw - width))
+            x = cx + (x - bx)
+        elif Anchor.RIGHT in anchor:
+            x = cx + cw - (bx + bw - x)
+        elif Anchor.LEFT in anchor:
+            x = cx + (x - bx)
+        else:
+            x = cx + (x - bx) + (cw - bw) // 2
+
+        if Anchor.TOP in anchor and Anchor.BOTTOM in anchor:
+            height = self._clampHeight(ch - (bh - height))
+            y = cy + (y - by)
+        elif Anchor.BOTTOM in anchor:
+            y = cy + ch - (by + bh - y)
+        elif Anchor.TOP in anchor:
+            y = cy + (y - by)
+        else:
+            y = cy + (y - by) + (ch - bh) // 2
+        return (x, y, width, height)
+
+
+class Layout:
+    """Places the controls of a Form or a GroupBox when it's size changes.
+        Get it from the 'layout' property of the form or the group box."""
+    __slots__ = ("_owner", "_form", "_items", "_lastRect", "_clientSize", "padding")
+    def __init__(self, owner, form, padding = (0, 0, 0, 0)) -> None:
+        self._owner = owner
+        self._form = form
+        self._items = []
+        self._lastRect = None # Container rect of the last layout pass.
+        self._clientSize = None # Form's client size from the last WM_SIZE
+        self.padding = padding # Left, top, right & bottom space for docked controls.
+
+    # -region Public funcs
+    def add(self, control, anchor: Anchor = Anchor.TOP_LEFT, dock: Dock = Dock.NONE, minSize = None, maxSize = None) -> LayoutItem:
+        """Add a control to this layout. Adding it again will update the settings.
+            Control's current position & size are taken as it's design values."""
+        item = self._find(control)
+        if item:
+            item.anchor, item.dock, item.minSize, item.maxSize = anchor, dock, minSize, maxSize
+        else:
+            item = LayoutItem(control, anchor, dock, minSize, maxSize)
+            self._items.append(item)
+        if self._lastRect: item._capture(self._lastRect)
+        return item
+
+    def remove(self, control):
+        """Remove a control from this layout"""
+        item = self._find(control)
+        if item: self._items.remove(item)
+
+    def perform(self, force = False):
+        """Place all the controls. Normally this is done when the size of the container changes."""
+        rect = self._containerRect()
+        if rect == self._lastRect and not force: return
+        self._captureAll()
+        self._lastRect = rect
+        with self._form.batchLayout(): self._arrange(rect)
+    # -endregion Public funcs
+
+    # -region Private funcs
+    def _find(self, control):
+        for item in self._items:
+            if item.control is control: return item
+        return None
+
+    def _resized(self, width, height):
+        # Form calls this from WM_SIZE.
+        self._clientSize = (width, height)
+        self.perform()
+
+    def _captureAll(self):
+        # Distances are taken once, against the rect which the controls were placed for.
+        rect = None
+        for item in self._items:
+            if item._base is None:
+                if rect is None: rect = self._lastRect or self._containerRect()
+                item._capture(rect)
+
+    def _containerRect(self):
+        owner = self._owner
+        if owner is self._form:
+            if self._clientSize:
+                width, height = self._clientSize
+            elif owner._isCreated:
+                rc = api.get_client_rect(owner._hwnd)
+                width, height = rc.right, rc.bottom
+            else:
+                width, height = owner._width, owner._height
+            return (0, 0, width, height)
+        return (owner._xpos, owner._ypos, owner._width, owner._height)
+
+    def _arrange(self, rect):
+        # Docked controls take their part from the remaining space in the order they added.
+        # Fill docked ones get what is left after that. Others are anchored.
+        pl, pt, pr, pb = self.padding
+        left, top = rect[0] + pl, rect[1] + pt
+        right, bottom = rect[0] + rect[2] - pr, rect[1] + rect[3] - pb
+        fills = []
+        for item in self._items:
+            ctl = item.control
+            match item.dock:
+                case Dock.NONE:
+                    self._place(ctl, item._anchoredRect(rect))
+                case Dock.TOP:
+                    height = item._clampHeight(ctl._height)
+                    self._place(ctl, (left, top, right - left, height))
+                    top += height
+                case Dock.BOTTOM:
+                    height = item._clampHeight(ctl._height)
+                    bottom -= height
+                    self._place(ctl, (left, bottom, right - left, height))
+                case Dock.LEFT:
+                    width = item._clampWidth(ctl._width)
+                    self._place(ctl, (left, top, width, bottom - top))
+                    left += width
+                case Dock.RIGHT:
+                    width = item._clampWidth(ctl._width)
+                    right -= width
+                    self._place(ctl, (right, top, width, bottom - top))
+                case Dock.FILL:
+                    fills.append(item)
+
+        for item in fills:
+            width = item._clampWidth(max(right - left, 0))
+            height = item._clampHeight(max(bottom - top, 0))
+            self._place(item.control, (left, top, width, height))
+
+    def _place(self, ctl, rect):
+        # Only the controls which really changed will get a DeferWindowPos entry.
+        if rect != (ctl._xpos, ctl._ypos, ctl._width, ctl._height): ctl._setBounds(*rect)
+    # -endregion Private funcs
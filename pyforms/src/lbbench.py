@@ -0,0 +1,70 @@
+# Created on 17-Oct-2026 05:10:00
+# lbbench module - ListBox bulk loading benchmark.
+# Loads the same items with the old one by one path (a new buffer & LB_ADDSTRING
+# for each item) and with addItems. Then sets a big item count in virtual mode.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.lbbench [items] [virtual items]
+
+import sys, time, io, contextlib
+from ctypes import addressof, create_unicode_buffer
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.forms import Form
+from pyforms.src.listbox import ListBox
+
+
+def oldAddItems(lbx, items):
+    # ListBox.addItems before the bulk path.
+    lbx._items.extend(items)
+    for item in items:
+        sitem = item if isinstance(item, str) else str(item)
+        buff = create_unicode_buffer(sitem)
+        api.SendMessage(lbx._hwnd, con.LB_ADDSTRING, 0, addressof(buff))
+
+
+def timeLoad(title, lbx, func, items):
+    sim.calls.clear()
+    sim.sent.clear()
+    start = time.perf_counter()
+    func(items)
+    elapsed = time.perf_counter() - start
+    count = api.SendMessage(lbx._hwnd, con.LB_GETCOUNT, 0, 0)
+    print(f"    {title:<14}: {elapsed * 1000:.2f} ms, {count} items, {sum(sim.sent.values())} messages, "
+          f"redraw off {sim.sent[con.WM_SETREDRAW] > 0}")
+
+
+def main(count = 100_000, virtualCount = 5_000_000):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    frm = Form("ListBox bench")
+    frm.createHandle()
+    lbOld = ListBox(frm, 10, 10)
+    lbNew = ListBox(frm, 170, 10)
+    lbVirt = ListBox(frm, 330, 10)
+    lbVirt.virtualMode = True
+    lbVirt.getItem = lambda index: f"Virtual item {index}"
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+
+    items = [f"List item number {i}" for i in range(count)]
+    print(f"Loading {count} items\n")
+    timeLoad("one by one", lbOld, lambda items: oldAddItems(lbOld, items), items)
+    timeLoad("addItems", lbNew, lbNew.addItems, items)
+
+    start = time.perf_counter()
+    lbVirt.itemCount = virtualCount
+    elapsed = time.perf_counter() - start
+    print(f"\nVirtual mode")
+    print(f"    itemCount     : {elapsed * 1000:.2f} ms for {virtualCount} items")
+    print(f"    item 4999999  : {lbVirt._getItemText(virtualCount - 1)!r}")
+    frm.close()
+    sim.pump()
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:3]]
+    main(*args)
@@ -1,17 +1,17 @@
 # listbox module - Created on 11-Dec-2022 11:23:20
 
-from ctypes import addressof, create_unicode_buffer, c_int
-from pyforms.src.control import Control
+from ctypes import addressof, create_unicode_buffer, c_int, byref, cast
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
-from pyforms.src.commons import MyMessages
+from pyforms.src.commons import MyMessages, TextMetrics
 from pyforms.src.enums import ControlType
 from pyforms.src.events import EventArgs
 from pyforms.src.apis import LRESULT, SUBCLASSPROC
 import pyforms.src.apis as api
-from pyforms.src.colors import COLOR_WHITE
+from pyforms.src.colors import COLOR_WHITE, GdiPool
 
-lbxDict = {}
 lbxStyle = con.WS_CHILD | con.WS_VISIBLE | con.WS_BORDER  | con.LBS_NOTIFY | con.LBS_HASSTRINGS
+virtualTxtFlag = con.DT_LEFT | con.DT_SINGLELINE | con.DT_VCENTER | con.DT_NOPREFIX
 
 
 class ListBox(Control):
@@ -19,7 +19,8 @@ class ListBox(Control):
     """ListBox control """
     _count = 1
     __slots__ = ( "_hasSort", "_noSel", "_multiCol", "_keyPreview", "_useVScroll", "_useHScroll", "_multiSel", "_selIndices",
-                    "_items",  "_dummyIndex", "_selIndex", "onSelectionChanged", "onDoubleClick"  )
+                    "_items",  "_dummyIndex", "_selIndex", "onSelectionChanged", "onDoubleClick",
+                    "_virtualMode", "_itemCount", "_getItem", "_selBrush" )
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 150, height: int = 200, auto = False) -> None:
         super().__init__()
@@ -48,6 +49,10 @@ class ListBox(Control):
         self._items = []
         self._dummyIndex = -1
         self._selIndex = -1
+        self._virtualMode = False
+        self._itemCount = 0
+        self._getItem = None
+        self._selBrush = None
         # print("listbox inited")
         # Events
         self.onSelectionChanged = None
@@ -68,37 +73,32 @@ class ListBox(Control):
         self._createControl()
         if self._hwnd:
             # print("list box hwnd ", self._hwnd)
-            lbxDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._isCreated = True
             self._setSubclass(lbxWndProc)
             self._setFontInternal()
-
-            if self._items:
-                for item in self._items:
-                    buff = create_unicode_buffer(item) if type(item) == str else create_unicode_buffer(str(item))
-                    api.SendMessage(self._hwnd, con.LB_ADDSTRING, 0, addressof(buff))
-                    if self._dummyIndex > -1: api.SendMessage(self._hwnd, con.LB_SETCURSEL, self._dummyIndex, 0)
+            if self._virtualMode:
+                self._setupVirtual()
+            elif self._items:
+                self._addStrings(self._items)
+            if self._dummyIndex > -1: api.SendMessage(self._hwnd, con.LB_SETCURSEL, self._dummyIndex, 0)
 
     def addItem(self, item):
         """Add an item to list box """
+        if self._virtualMode: raise Exception("Adding item is not possible in virtual mode, set the itemCount instead")
         if self._isCreated:
             buff = create_unicode_buffer(str(item))
             api.SendMessage(self._hwnd, con.LB_ADDSTRING, 0, addressof(buff))
         self._items.append(item)
 
     def addItems(self, *items):
-        """Add an multiple items to list box """
+        """Add multiple items to list box. A list or any other iterable can be given as the only argument.
+            Storage is allocated once for all of them and list box is redrawn after the last one."""
+        if self._virtualMode: raise Exception("Adding items is not possible in virtual mode, set the itemCount instead")
+        if len(items) == 1 and not isinstance(items[0], str) and hasattr(items[0], "__iter__"): items = items[0]
+        items = list(items)
         self._items.extend(items)
-        if self._isCreated:
-            for item in items:
-                sitem = item if isinstance(item, str) else str(item)
-                buff = create_unicode_buffer(sitem)
-                api.SendMessage(self._hwnd, con.LB_ADDSTRING, 0, addressof(buff))
-        else:
-            for item in items:
-                sitem = item if isinstance(item, str) else str(item)
-                self._items.append(item)
-
+        if self._isCreated: self._addStrings(items)
 
 
     def selectAll(self):
@@ -118,6 +118,7 @@ class ListBox(Control):
 
     def insertItem(self, item, index):
         """Insert an item to list box """
+        if self._virtualMode: raise Exception("Inserting item is not possible in virtual mode, set the itemCount instead")
         if self._isCreated:
             buff = create_unicode_buffer(str(item))
             api.SendMessage(self._hwnd, con.LB_INSERTSTRING, index, addressof(buff))
@@ -142,6 +143,7 @@ class ListBox(Control):
         if self._isCreated:
             api.SendMessage(self._hwnd, con.LB_RESETCONTENT, 0, 0)
         self._items.clear()
+        self._itemCount = 0
 
 # -endregion Public functions
 
@@ -157,10 +159,58 @@ class ListBox(Control):
         if self._keyPreview: self._style |= con.LBS_WANTKEYBOARDINPUT
         if self._useHScroll: self._style |= con.WS_HSCROLL
         if self._useVScroll: self._style |= con.WS_VSCROLL
+        if self._virtualMode:
+            # No data list box keeps only the item count. It can't have strings or sorting.
+            self._style = (self._style | con.LBS_NODATA | con.LBS_OWNERDRAWFIXED) & ~(con.LBS_HASSTRINGS | con.LBS_SORT)
+
+    def _addStrings(self, items):
+        # Redraw is off till the last item. So the list box paints once, not on every add.
+        texts = [item if isinstance(item, str) else str(item) for item in items]
+        if not texts: return
+        send = api.SendMessage
+        send(self._hwnd, con.WM_SETREDRAW, False, 0)
+        try:
+            self._addStringsBulk(texts, con.LB_ADDSTRING, con.LB_INITSTORAGE, lbxWndProc)
+        finally:
+            send(self._hwnd, con.WM_SETREDRAW, True, 0)
+            api.InvalidateRect(self._hwnd, None, True)
+
+    def _setupVirtual(self):
+        # Owner drawn fixed list box got it's item height before the font. So we set it here.
+        height = TextMetrics.measure(self._font.handle, "Ay")[1] + 2
+        api.SendMessage(self._hwnd, con.LB_SETITEMHEIGHT, 0, height)
+        api.SendMessage(self._hwnd, con.LB_SETCOUNT, self._itemCount, 0)
+
+    def _itemText(self, index: int) -> str:
+        if index < 0 or index >= self._itemCount or not self._getItem: return ""
+        txt = self._getItem(index)
+        return txt if isinstance(txt, str) else str(txt)
+
+    def _drawVirtualItem(self, dis):
+        # List box asks only for the visible items. Text comes from the getItem function.
+        if dis.itemID == 0xFFFFFFFF: # Empty list box, only the focus rect.
+            if dis.itemState & con.ODS_FOCUS: api.DrawFocusRect(dis.hDC, byref(dis.rcItem))
+            return True
+        hdc = dis.hDC
+        if dis.itemState & con.ODS_SELECTED:
+            if not self._selBrush: self._selBrush = GdiPool.getBrush(api.GetSysColor(con.COLOR_HIGHLIGHT))
+            api.FillRect(hdc, byref(dis.rcItem), self._selBrush)
+            api.SetTextColor(hdc, api.GetSysColor(con.COLOR_HIGHLIGHTTEXT))
+        else:
+            if not self._bkgBrush: self._resetBkgBrush()
+            api.FillRect(hdc, byref(dis.rcItem), self._bkgBrush)
+            api.SetTextColor(hdc, self._fgColor.ref)
+        api.SetBkMode(hdc, con.TRANSPARENT)
+        rc = dis.rcItem
+        rc.left += 2
+        api.DrawText(hdc, self._itemText(dis.itemID), -1, byref(rc), virtualTxtFlag)
+        rc.left -= 2
+        if dis.itemState & con.ODS_FOCUS: api.DrawFocusRect(hdc, byref(rc))
+        return True
 
     # Internal function to get an item from listbox
-    def _getItem(self, index: int) -> str:
-        # print("161")
+    def _getItemText(self, index: int) -> str:
+        if self._virtualMode: return self._itemText(index)
         item_len = api.SendMessage(self._hwnd, con.LB_GETTEXTLEN, index, 0)
         if item_len != con.LB_ERR:
             buff = create_unicode_buffer(item_len)
@@ -179,6 +229,45 @@ class ListBox(Control):
         return self._items
     #-----------------------------------------------------------------------------1
 
+    @property
+    def virtualMode(self) -> bool:
+        """Returns true if this ListBox is in virtual mode"""
+        return self._virtualMode
+
+    @virtualMode.setter
+    def virtualMode(self, value: bool):
+        """Set true to enable virtual mode. In virtual mode, ListBox only keeps an item count
+            and asks getItem for the text of visible items. Set this before creating the handle."""
+        if self._isCreated: raise Exception("Virtual mode must be set before ListBox's handle created")
+        self._virtualMode = value
+    #-----------------------------------------------------------------------------
+
+    @property
+    def itemCount(self) -> int:
+        """Get the item count of ListBox"""
+        if self._virtualMode: return self._itemCount
+        return len(self._items)
+
+    @itemCount.setter
+    def itemCount(self, value: int):
+        """Set the item count of ListBox in virtual mode"""
+        if not self._virtualMode: raise Exception("Item count can be set only in virtual mode")
+        self._itemCount = value
+        if self._isCreated: api.SendMessage(self._hwnd, con.LB_SETCOUNT, value, 0)
+    #-----------------------------------------------------------------------------
+
+    @property
+    def getItem(self):
+        """Get the data source function of ListBox in virtual mode"""
+        return self._getItem
+
+    @getItem.setter
+    def getItem(self, value):
+        """Set the data source function of ListBox in virtual mode. Signature - func(index: int) -> str"""
+        self._getItem = value
+        if self._isCreated and self._virtualMode: api.InvalidateRect(self._hwnd, None, False)
+    #-----------------------------------------------------------------------------
+
     @property
     def hasHScroll(self)-> bool:
         """Returns true if list box has horizontal scroll enabled"""
@@ -254,7 +343,7 @@ class ListBox(Control):
         if self._isCreated and not self._multiSel:
             sel_ind = api.SendMessage(self._hwnd, con.LB_GETCURSEL, 0, 0)
             # print(f"{sel_ind = }")
-            if sel_ind >= 0: return self._getItem(sel_ind)
+            if sel_ind >= 0: return self._getItemText(sel_ind)
         return ""
 
     @selectedItem.setter
@@ -279,7 +368,7 @@ class ListBox(Control):
             if sel_count != con.LB_ERR:
                 c_array = (c_int * sel_count)() # We create an array of int type
                 api.SendMessage(self._hwnd, con.LB_GETSELITEMS, sel_count, addressof(c_array))
-                return [self._getItem(index) for index in c_array]
+                return [self._getItemText(index) for index in c_array]
         return None
 
     # #---------------------------------------------------------9
@@ -289,7 +378,7 @@ class ListBox(Control):
         """Returns the index of item under mouse pointer"""
         if self._isCreated and self._multiSel:
             indx = api.SendMessage(self._hwnd, con.LB_GETCARETINDEX, 0, 0)
-            if indx >= 0: return self._getItem(indx)
+            if indx >= 0: return self._getItemText(indx)
         return ""
 
     # -endregion Properties
@@ -299,38 +388,44 @@ class ListBox(Control):
 @SUBCLASSPROC
 def lbxWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # printWinMsg(msg)
-    lbx = lbxDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, lbxWndProc, scID)
-            del lbxDict[hw]
-
-        case MyMessages.LIST_COLOR:
-            if lbx._drawFlag:
-                api.SetBkMode(wp, 1) # Transparent mode
-                # api.SetBkColor(wp, lbx._bgColor.ref)
-                if lbx._drawFlag & 1: api.SetTextColor(wp, lbx._fgColor.ref)
-                return LRESULT(api.CreateSolidBrush(lbx._bgColor.ref))
-            else:
-                return api.GetStockObject(con.WHITE_BRUSH)
-
-        case MyMessages.CTL_COMMAND:
-            ncode = api.HIWORD(wp)
-            match ncode:
-                case con.LBN_DBLCLK:
-                    if lbx.onDoubleClick: lbx.onDoubleClick(lbx, EventArgs())
-                case con.LBN_SELCHANGE:
-
-                    if lbx.onSelectionChanged: lbx.onSelectionChanged(lbx, EventArgs())
-
-        case con.WM_SETFOCUS: lbx._gotFocusHandler()
-        case con.WM_KILLFOCUS: lbx._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: lbx._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: lbx._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: lbx._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: lbx._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: lbx._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: lbx._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: lbx._mouseLeaveHandler()
+    lbx = HwndRegistry.get(hw)
+    handler = lbx._msgMap.get(msg)
+    if handler:
+        ret = handler(lbx, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        lbx._releaseBkgBrush()
+        if lbx._selBrush: GdiPool.release(lbx._selBrush)
+        api.RemoveWindowSubclass(hw, lbxWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _lbxListColorMsg(lbx, hw, msg, wp, lp):
+    if lbx._drawFlag:
+        api.SetBkMode(wp, 1) # Transparent mode
+        # api.SetBkColor(wp, lbx._bgColor.ref)
+        if lbx._drawFlag & 1: api.SetTextColor(wp, lbx._fgColor.ref)
+        if not lbx._bkgBrush: lbx._resetBkgBrush()
+        return LRESULT(lbx._bkgBrush)
+    else:
+        return api.GetStockObject(con.WHITE_BRUSH)
+
+def _lbxCommandMsg(lbx, hw, msg, wp, lp):
+    ncode = api.HIWORD(wp)
+    match ncode:
+        case con.LBN_DBLCLK:
+            if lbx.onDoubleClick: lbx.onDoubleClick(lbx, EventArgs())
+        case con.LBN_SELCHANGE:
+
+            if lbx.onSelectionChanged: lbx.onSelectionChanged(lbx, EventArgs())
+
+def _lbxDrawItemMsg(lbx, hw, msg, wp, lp):
+    return lbx._drawVirtualItem(cast(lp, api.LPDRAWITEMSTRUCT).contents)
+
+ListBox._msgTable = makeMsgMap({
+    MyMessages.LIST_COLOR: _lbxListColorMsg,
+    MyMessages.CTL_COMMAND: _lbxCommandMsg,
+    MyMessages.DRAW_ITEM: _lbxDrawItemMsg,
+})
@@ -3,20 +3,18 @@
 import typing
 from enum import Enum
 from ctypes.wintypes import HWND, UINT
-from ctypes import WINFUNCTYPE, byref, addressof, cast, create_unicode_buffer, c_wchar_p
-from pyforms.src.control import Control
+from ctypes import byref, addressof, cast, create_unicode_buffer, c_wchar_p
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 
 import pyforms.src.constants as con
-from pyforms.src.commons import Font, MyMessages, getMousePoints
+from pyforms.src.commons import Font, MyMessages, WideBuffer, getMousePoints
 from pyforms.src.enums import ControlType, TextAlignment, ListViewStyle
 from pyforms.src.apis import LRESULT, UINT_PTR, DWORD_PTR, RECT, LPNMCUSTOMDRAW, LVCOLUMNW, WPARAM, LPARAM, SUBCLASSPROC
 import pyforms.src.apis as api
-from pyforms.src.colors import Color
+from pyforms.src.colors import Color, GdiPool
 from pyforms.src.winmsgs import log_msg
 # from horology import Timing
 
-lvDict = {}
-hdrDict = {}
 lvStyle = con.WS_CHILD | con.WS_VISIBLE | con.LVS_ALIGNLEFT| con.LVS_EDITLABELS | con.WS_BORDER
 LV_VIEW_ICON            = 0x0000
 LV_VIEW_DETAILS         = 0x0001
@@ -50,7 +48,8 @@ class ListView(Control):
 					"_hdrFont", "_colAlign", "_viewStyle", "_columns", "_items", "_colIndList", "_colIndex",
                     "_hdrHeight", "_selItemIndex", "_selSubIndex", "_imgList", "_hdrItemDict", "_hdrPts", "_mouseOnHdr",
                     "_hdrBgColor", "_hdrFgColor", "_hdrBkBrush", "_hdrOwnDraw", "_hotHdr", "_colIndex",
-                    "_hdrHotBrush", "_hdrClickable", "_selectable", "_itemIndex", "_itemDrawn", "_destroyCount", "_layCount" )
+                    "_hdrHotBrush", "_hdrClickable", "_selectable", "_itemIndex", "_itemDrawn", "_layCount",
+                    "_virtualMode", "_rowCount", "_getCell", "_txtBuff", "_lvItem" )
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 250, height: int = 200, auto = False, cols = None) -> None:
         super().__init__()
@@ -99,8 +98,12 @@ class ListView(Control):
         self._hdrHeight = 25
         self._hotHdr = -1
         self._colIndex = 0
-        self._destroyCount = 0
         self._layCount = 0
+        self._virtualMode = False
+        self._rowCount = 0
+        self._getCell = None
+        self._txtBuff = WideBuffer()
+        self._lvItem = api.LVITEMW() # We will reuse this for all items & sub items.
         self._hwnd = None
         parent._controls.append(self)
         # Events
@@ -121,7 +124,7 @@ class ListView(Control):
         if self._hwnd:
             # self._parent.lv_hwnd = self._hwnd
             self._setLVExStyles()
-            lvDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(lvWndProc)
             self._setFontInternal()
 
@@ -130,11 +133,8 @@ class ListView(Control):
                     api.SendMessage(self._hwnd, con.LVM_INSERTCOLUMNW, col.index, addressof(col.lvc))
 
             self._hdrHwnd = api.SendMessage(self._hwnd, con.LVM_GETHEADER, 0, 0)
-            # hdrDict[self._hdrHwnd] = self # Put ourself inside this dict so that we can appear in hdrWndProc
+            HwndRegistry.add(self._hdrHwnd, self) # Header's wndproc will find us with header's handle.
             if not self._hdrFont.handle: self._hdrFont.createHandle(self._hdrHwnd)# Making sure header font is ready.
-            #
-            # We are going to send the list view hwnd with this function. So, we can grab it inside
-            # header's wndproc function.
             api.SetWindowSubclass(self._hdrHwnd, hdrWndProc, ListView._count, self._hwnd)
             if self._bgColor != self._parent._bgColor:
                 api.SendMessage(self._hwnd, con.LVM_SETBKCOLOR, 0, self._bgColor.ref)
@@ -144,6 +144,8 @@ class ListView(Control):
                 api.SendMessage(self._hwnd, con.LVM_SETCOLUMNORDERARRAY, len(ord_list), addressof(ord_list))
                 self._cbIsLast = True
 
+            if self._virtualMode: self._setItemCount()
+
             # print("lv hwnd ", self._hwnd)
             # print("frm hwnd ", self._parent._hwnd)
 
@@ -184,6 +186,7 @@ class ListView(Control):
         if self._viewStyle != ListViewStyle.REPORT_VIEW: raise Exception("Adding row is possible only in ListViewStyle.REPORT_VIEW")
         if not self._isCreated: raise Exception("Adding  row is possible only after ListView's handle created")
         if not items: raise Exception("items is not iterable")
+        if self._virtualMode: raise Exception("Adding row is not possible in virtual mode, set the rowCount instead")
 
         lvi = ListViewItem(items[0])
         self._addItemInternal(lvi)
@@ -191,6 +194,41 @@ class ListView(Control):
             self._addSubItemInternal(items[i], lvi._index, i)
 
 
+    def addRows(self, rows):
+        """Add a batch of rows. Each row is a list or tuple of cell values.
+            ListView will be redrawn only once, after adding the last row."""
+        self._checkAddRows()
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        if not rows: return
+        self._beginUpdate(len(self._items) + len(rows))
+        try:
+            self._addRowsInternal(rows)
+        finally:
+            self._endUpdate()
+
+
+    def setRows(self, rows):
+        """Replace all the rows with given rows. Each row is a list or tuple of cell values.
+            ListView will be redrawn only once, after adding the last row."""
+        self._checkAddRows()
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        self._beginUpdate(len(rows), True)
+        try:
+            self._items.clear()
+            self._addRowsInternal(rows)
+        finally:
+            self._endUpdate()
+
+
+    def refreshRows(self, first: int = 0, last: int = -1):
+        """Redraw the rows from first to last. Use this in virtual mode when the data source changed.
+            If last is -1, rows upto the end will be redrawn."""
+        if self._isCreated:
+            if last < 0: last = api.SendMessage(self._hwnd, con.LVM_GETITEMCOUNT, 0, 0) - 1
+            api.SendMessage(self._hwnd, con.LVM_REDRAWITEMS, first, last)
+            api.UpdateWindow(self._hwnd)
+
+
 # -endregion Public functions
 
 
@@ -210,10 +248,11 @@ class ListView(Control):
         if self._hideSel: self._style ^= con.LVS_SHOWSELALWAYS
         if self._noHdr: self._style |= con.LVS_NOCOLUMNHEADER
         if self._multiSel: self._style ^= con.LVS_SINGLESEL
+        if self._virtualMode: self._style |= con.LVS_OWNERDATA
 
         # Set some brushes
-        self._hdrBkBrush = self._hdrBgColor.createHBrush()
-        self._hdrHotBrush = self._hdrBgColor.createHBrush(1.09)
+        self._hdrBkBrush = self._hdrBgColor.getBrush()
+        self._hdrHotBrush = self._hdrBgColor.getBrush(1.09)
 
 
     def _setLVExStyles(self):
@@ -249,6 +288,54 @@ class ListView(Control):
         return con.CDRF_DODEFAULT
 
 
+    def _checkAddRows(self):
+        if self._viewStyle != ListViewStyle.REPORT_VIEW: raise Exception("Adding rows is possible only in ListViewStyle.REPORT_VIEW")
+        if not self._isCreated: raise Exception("Adding rows is possible only after ListView's handle created")
+        if self._virtualMode: raise Exception("Adding rows is not possible in virtual mode, set the rowCount instead")
+
+
+    def _beginUpdate(self, count, deleteAll = False):
+        # Stop drawing until we finish the batch. LVM_SETITEMCOUNT will make
+        # ListView allocate the memory for all the items at once. Deleting the items
+        # frees that memory, so it must be done before setting the count.
+        api.SendMessage(self._hwnd, con.WM_SETREDRAW, False, 0)
+        if deleteAll: api.SendMessage(self._hwnd, con.LVM_DELETEALLITEMS, 0, 0)
+        api.SendMessage(self._hwnd, con.LVM_SETITEMCOUNT, count, 0)
+
+
+    def _endUpdate(self):
+        api.SendMessage(self._hwnd, con.WM_SETREDRAW, True, 0)
+        api.InvalidateRect(self._hwnd, None, True)
+
+
+    def _addRowsInternal(self, rows):
+        for row in rows:
+            if isinstance(row, str): row = (row,)
+            elif not isinstance(row, (list, tuple)): row = tuple(row)
+            if not row: continue
+            lvi = ListViewItem(row[0])
+            self._addItemInternal(lvi)
+            for i in range(1, len(row)):
+                self._addSubItemInternal(row[i], lvi._index, i)
+
+
+    def _setItemCount(self):
+        # In virtual mode, ListView only knows the row count. It will ask us for the data
+        # of each visible cell through LVN_GETDISPINFOW. So we don't need to keep any item.
+        api.SendMessage(self._hwnd, con.LVM_SETITEMCOUNT, self._rowCount,
+                            con.LVSICF_NOINVALIDATEALL | con.LVSICF_NOSCROLL)
+        api.InvalidateRect(self._hwnd, None, False)
+
+
+    def _getDispInfoHandler(self, lpm):
+        # ListView wants the text of a cell. We copy the text into our own buffer
+        # and give the pointer to ListView. It will copy the text before next request.
+        item = cast(lpm, api.LPNMLVDISPINFOW).contents.item
+        if item.mask & con.LVIF_TEXT:
+            value = self._getCell(item.iItem, item.iSubItem) if self._getCell else ""
+            item.pszText = self._txtBuff.fill(value if isinstance(value, str) else str(value))
+
+
     def _changeColOrder(self):
         # If user wants to swap the first and last columns, we can use this.
         indices = []
@@ -283,7 +370,9 @@ class ListView(Control):
 
 
     def _addItemInternal(self, item):
-        lvi = api.LVITEMW()
+        # ListView copies the text, so we can use the same LVITEMW & buffer for every item.
+        item._index = len(self._items)
+        lvi = self._lvItem
         lvi.mask = con.LVIF_TEXT | con.LVIF_PARAM | con.LVIF_STATE
         if item._imgIndex != -1: lvi.mask |= con.LVIF_IMAGE
         lvi.state = 0
@@ -291,7 +380,7 @@ class ListView(Control):
         lvi.iItem = item._index
         lvi.iSubItem = 0
         lvi.iImage = item._imgIndex
-        lvi.pszText = cast(create_unicode_buffer(item.text), c_wchar_p)
+        lvi.pszText = self._txtBuff.fill(item._text)
         lvi.cchTextMax = len(item._text) + 1
         # lvi.lParam = id(item)
         api.SendMessage(self._hwnd, con.LVM_INSERTITEMW, 0, addressof(lvi))
@@ -301,11 +390,11 @@ class ListView(Control):
     def _addSubItemInternal(self, subitem: str, item_index: int, sub_index: int, imageIndex: int = -1):
 
         sitem = subitem if isinstance(subitem, str) else str(subitem)
-        lvi = api.LVITEMW()
+        lvi = self._lvItem
         # lvi.mask = con.LVIF_TEXT | con.LVIF_STATE
         # lvi.iItem = item_index
         lvi.iSubItem = sub_index
-        lvi.pszText = cast(create_unicode_buffer(sitem), c_wchar_p)
+        lvi.pszText = self._txtBuff.fill(sitem)
         lvi.iImage = imageIndex
         api.SendMessage(self._hwnd, con.LVM_SETITEMTEXTW, item_index, addressof(lvi))
         self._items[item_index]._subitems.append(sitem) # Put the subitem in our item's bag.
@@ -479,6 +568,40 @@ class ListView(Control):
     @selectedItem.setter
     def selectedItem(self, value): self._selItem = value
 
+    @property
+    def virtualMode(self) -> bool:
+        """Returns true if this ListView is in virtual mode"""
+        return self._virtualMode
+
+    @virtualMode.setter
+    def virtualMode(self, value: bool):
+        """Set true to enable virtual mode. In virtual mode, ListView only keeps a row count
+            and asks getCell for the data of visible cells. Set this before creating the handle."""
+        if self._isCreated: raise Exception("Virtual mode must be set before ListView's handle created")
+        self._virtualMode = value
+
+    @property
+    def rowCount(self) -> int:
+        """Get the row count of ListView in virtual mode"""
+        return self._rowCount
+
+    @rowCount.setter
+    def rowCount(self, value: int):
+        """Set the row count of ListView in virtual mode"""
+        self._rowCount = value
+        if self._isCreated and self._virtualMode: self._setItemCount()
+
+    @property
+    def getCell(self):
+        """Get the data source function of ListView in virtual mode"""
+        return self._getCell
+
+    @getCell.setter
+    def getCell(self, value):
+        """Set the data source function of ListView in virtual mode. Signature - func(row: int, col: int) -> str"""
+        self._getCell = value
+        if self._isCreated and self._virtualMode: api.InvalidateRect(self._hwnd, None, False)
+
     @property
     def viewStyle(self) : return self._viewStyle
 
@@ -567,7 +690,7 @@ class ListViewItem:
         self._bgColor = bg_color
         self._fgColor = fg_color
         self._imgIndex = imageIndex
-        self._font = Font() # Start with default font Tahoma, 11 point
+        self._font = None # Font will be created only when someone asks for it.
         self._index = ListViewItem._stindex
         self._subitems = []
         ListViewItem._stindex += 1
@@ -612,7 +735,9 @@ class ListViewItem:
     def imageIndex(self, value: int): self._imgIndex = value
 
     @property
-    def font(self): return self._font
+    def font(self):
+        if self._font is None: self._font = Font() # Start with default font Tahoma, 11 point
+        return self._font
 
     @font.setter
     def font(self, value: Font): self._font = value
@@ -628,154 +753,131 @@ class ListViewItem:
 @SUBCLASSPROC
 def lvWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # log_msg(msg)
-    lv = lvDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            if lv._contextMenu: lv._contextMenu.destroyContextMenu()
-            api.RemoveWindowSubclass(hw, lvWndProc, scID)
-            lv._destroyCount += 1
-            if lv._destroyCount == 2: del lvDict[hw]
-
-        # case con.WM_MEASUREITEM:
-        #     print("msr item lv")
-
-        case con.WM_CONTEXTMENU: lv._wmContextMenuHandler(lp)
-
-        case MyMessages.CTRL_NOTIFY:
-            nmh = cast(lp, api.LPNMHDR).contents
-        #     print(nmh.code, " LV notify ", con.NM_CUSTOMDRAW )
-            match nmh.code:
-        # #         # case con.LVN_ITEMCHANGED:
-        # #         #     print("LVN_ITEMCHANGED ", con.LVN_ITEMCHANGED)
-        # #         # case 4294967195:
-        # #         #     print("actual")
-
-                case con.NM_CLICK:pass
-                    # print("nm click ", con.LVN_ITEMCHANGING)
-                    # nia = cast(lp, api.LPNMITEMACTIVATE).contents
-                    # # print(nia, " on nm click")
-                    # lv._itemIndex = nia.iItem
-                    # lv._selectable = True
-                    # api.InvalidateRect(hw, None, False)
-                    # api.SendMessage(hw, con.LVM_SETSELECTIONMARK, 0, nia.iItem)
-                case con.NM_SETFOCUS:pass
-                    # print("NM_SETFOCUS = NM_FIRST - 7")
-
-                case con.NM_CUSTOMDRAW:
-                    lvcd = cast(lp, api.LPNMLVCUSTOMDRAW).contents
-                    # print(lvcd.nmcd.dwDrawStage, con.CDDS_SUBITEM | con.CDDS_ITEMPOSTPAINT)
-                    match lvcd.nmcd.dwDrawStage:
-                        case con.CDDS_PREPAINT:
-                            return con.CDRF_NOTIFYITEMDRAW
-
-                        case con.CDDS_ITEMPREPAINT:
-                            lvcd.clrTextBk = lv._bgColor.ref
-                            lvcd.clrText = lv._fgColor.ref
-                            return con.CDRF_NEWFONT | con.CDRF_DODEFAULT
-
-
-
-                        # case ITEM_POSTPAINT :
-                        #     # print(lvcd.iSubItem)
-                        #     return con.CDRF_DODEFAULT
-                        #     print(f"{lvcd.iSubItem = }, {lvcd.dwItemType = }, {lvcd.iPartId = }, {lvcd.iStateId = }")
-                        #     lv._itemDrawn += 1
-
-                        #     if lv._selectable:
-                        #         # print(f"{lv._itemDrawn = }, {lv._itemIndex = }")
-                        #         if lv._itemDrawn == lv._itemIndex:
-                        #             lv._selectable = False
-                        #             lvcd.clrTextBk = 0x0066FF99
-                        #         else:
-                        #             lvcd.clrTextBk = lv._bgColor.ref
-                        #     else:
-                        #         lvcd.clrTextBk = lv._bgColor.ref
-                        #     if lv._itemDrawn == len(lv._items) - 1: lv._itemDrawn = -1
-                        #     return con.CDRF_NEWFONT | con.CDRF_DODEFAULT
-                    return con.CDRF_DODEFAULT
-                case pointInRect: return 0
-
-
-        case con.WM_NOTIFY:
-            nmh = cast(lp, api.LPNMHDR).contents
-            if nmh.code == con.NM_CUSTOMDRAW:
-                nmcd = cast(lp, api.LPNMCUSTOMDRAW).contents
-                # print(f"{nmcd.dwDrawStage = }, {con.CDDS_ITEMPOSTERASE = }")
-                match nmcd.dwDrawStage:
-                    case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
-                    case con.CDDS_ITEMPREPAINT:
-    #                   # We are taking the opprtunity to draw the headers from Control
-                        lv._drawHeader(nmcd)
-                        return con.CDRF_SKIPDEFAULT
-
-        case con.WM_SETFOCUS: lv._gotFocusHandler()
-        case con.WM_KILLFOCUS: lv._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: lv._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: lv._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: return lv._rightMouseDownHandler(msg, wp, lp)
+    lv = HwndRegistry.get(hw)
+    handler = lv._msgMap.get(msg)
+    if handler:
+        ret = handler(lv, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        if lv._contextMenu: lv._contextMenu.destroyContextMenu()
+        if lv._hdrBkBrush: GdiPool.release(lv._hdrBkBrush)
+        if lv._hdrHotBrush: GdiPool.release(lv._hdrHotBrush)
+        api.RemoveWindowSubclass(hw, lvWndProc, scID)
+        HwndRegistry.remove(hw)
 
-        case con.WM_RBUTTONUP: lv._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: lv._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: lv._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: lv._mouseLeaveHandler()
+    return api.DefSubclassProc(hw, msg, wp, lp)
 
-        # case con.WM_COMMAND:
-        #     print("WM_COMMAND on LV")
 
-    return api.DefSubclassProc(hw, msg, wp, lp)
+def _lvNotifyMsg(lv, hw, msg, wp, lp):
+    nmh = cast(lp, api.LPNMHDR).contents
+    match nmh.code:
+        case con.NM_CLICK:pass
+            # nia = cast(lp, api.LPNMITEMACTIVATE).contents
+            # lv._itemIndex = nia.iItem
+            # lv._selectable = True
+            # api.InvalidateRect(hw, None, False)
+            # api.SendMessage(hw, con.LVM_SETSELECTIONMARK, 0, nia.iItem)
+        case con.NM_SETFOCUS:pass
+
+        case con.LVN_GETDISPINFOW:
+            if lv._virtualMode: lv._getDispInfoHandler(lp)
+
+        case con.NM_CUSTOMDRAW:
+            lvcd = cast(lp, api.LPNMLVCUSTOMDRAW).contents
+            match lvcd.nmcd.dwDrawStage:
+                case con.CDDS_PREPAINT:
+                    return con.CDRF_NOTIFYITEMDRAW
+
+                case con.CDDS_ITEMPREPAINT:
+                    lvcd.clrTextBk = lv._bgColor.ref
+                    lvcd.clrText = lv._fgColor.ref
+                    return con.CDRF_NEWFONT | con.CDRF_DODEFAULT
+            return con.CDRF_DODEFAULT
+        case _: return 0
+
+def _lvHdrNotifyMsg(lv, hw, msg, wp, lp):
+    nmh = cast(lp, api.LPNMHDR).contents
+    if nmh.code == con.NM_CUSTOMDRAW:
+        nmcd = cast(lp, api.LPNMCUSTOMDRAW).contents
+        match nmcd.dwDrawStage:
+            case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
+            case con.CDDS_ITEMPREPAINT:
+                # We are taking the opprtunity to draw the headers from Control
+                lv._drawHeader(nmcd)
+                return con.CDRF_SKIPDEFAULT
+
+def _lvRButtonDownMsg(lv, hw, msg, wp, lp): return lv._rightMouseDownHandler(msg, wp, lp)
+def _lvContextMenuMsg(lv, hw, msg, wp, lp): lv._wmContextMenuHandler(lp)
+
+ListView._msgTable = makeMsgMap({
+    con.WM_CONTEXTMENU: _lvContextMenuMsg,
+    MyMessages.CTRL_NOTIFY: _lvNotifyMsg,
+    con.WM_NOTIFY: _lvHdrNotifyMsg,
+    con.WM_RBUTTONDOWN: _lvRButtonDownMsg,
+})
 
 #||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
 #||             Window Procedure for Header control.                   ||
 #||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||||
-@WINFUNCTYPE(LRESULT, HWND, UINT, WPARAM, LPARAM, UINT_PTR, DWORD_PTR)
+@SUBCLASSPROC
 def hdrWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # log_msg(msg)
-    lv = lvDict[refData]
-    match msg:
-        case con.WM_DESTROY:
-            res = api.RemoveWindowSubclass(hw, hdrWndProc, scID)
-            lv._destroyCount += 1
-            if lv._destroyCount == 2: del lvDict[lv._hwnd]
-
-        case con.HDM_LAYOUT:
-            if lv._changeHdrHeight:
-                phl = cast(lp, api.LPHDLAYOUT).contents
-                # res = api.DefSubclassProc(hw, msg, wp, lp)
-                pos = phl.pwpos.contents
-                prc = phl.prc.contents
-                pos.flags = con.SWP_FRAMECHANGED
-                pos.hwnd = hw
-                pos.y = 0
-                pos.x = prc.left
-                pos.cx = prc.right - prc.left
-                pos.cy = lv._hdrHeight
-                prc.top = lv._hdrHeight
-
-                return -1
-
-        case con.WM_MOUSEMOVE:
-            pt = getMousePoints(lp) # Collecting mouse points
-            hit = api.HDHITTESTINFO(pt) # Passing it to this struct
-
-            # This message will return the header item index under the mouse
-            # We can use this index when we draw the header back color.
-            lv._hotHdr = api.SendMessage(hw, con.HDM_HITTEST, 0, addressof(hit) )
-
-        # Make the hot index to -1, so that our headers are drawn with normal colors after this.
-        case con.WM_MOUSELEAVE: lv._hotHdr = -1
-
-        case con.WM_PAINT:
-            # First, let the control to do it's necessary drawings.
-            api.DefSubclassProc(hw, msg, wp, lp)
-
-            # Now, we can draw the last part of the header.
-            hrc = RECT()
-            api.SendMessage(lv._hdrHwnd, con.HDM_GETITEMRECT, len(lv._columns) - 1, addressof(hrc))
-            rc = RECT(hrc.right + 1, hrc.top, lv._width, hrc.bottom)
-            hdc = api.GetDC(hw)
-            api.FillRect(hdc, byref(rc), lv._hdrBkBrush)
-            api.ReleaseDC(hw, hdc)
-            return 0
-
+    lv = HwndRegistry.get(hw)
+    handler = lvHdrMsgMap.get(msg)
+    if handler:
+        ret = handler(lv, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        res = api.RemoveWindowSubclass(hw, hdrWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _hdrLayoutMsg(lv, hw, msg, wp, lp):
+    if lv._changeHdrHeight:
+        phl = cast(lp, api.LPHDLAYOUT).contents
+        # res = api.DefSubclassProc(hw, msg, wp, lp)
+        pos = phl.pwpos.contents
+        prc = phl.prc.contents
+        pos.flags = con.SWP_FRAMECHANGED
+        pos.hwnd = hw
+        pos.y = 0
+        pos.x = prc.left
+        pos.cx = prc.right - prc.left
+        pos.cy = lv._hdrHeight
+        prc.top = lv._hdrHeight
+
+        return -1
+
+def _hdrMouseMoveMsg(lv, hw, msg, wp, lp):
+    pt = getMousePoints(lp) # Collecting mouse points
+    hit = api.HDHITTESTINFO(pt) # Passing it to this struct
+
+    # This message will return the header item index under the mouse
+    # We can use this index when we draw the header back color.
+    lv._hotHdr = api.SendMessage(hw, con.HDM_HITTEST, 0, addressof(hit) )
+
+# Make the hot index to -1, so that our headers are drawn with normal colors after this.
+def _hdrMouseLeaveMsg(lv, hw, msg, wp, lp): lv._hotHdr = -1
+
+def _hdrPaintMsg(lv, hw, msg, wp, lp):
+    # First, let the control to do it's necessary drawings.
+    api.DefSubclassProc(hw, msg, wp, lp)
+
+    # Now, we can draw the last part of the header.
+    hrc = RECT()
+    api.SendMessage(lv._hdrHwnd, con.HDM_GETITEMRECT, len(lv._columns) - 1, addressof(hrc))
+    rc = RECT(hrc.right + 1, hrc.top, lv._width, hrc.bottom)
+    hdc = api.GetDC(hw)
+    api.FillRect(hdc, byref(rc), lv._hdrBkBrush)
+    api.ReleaseDC(hw, hdc)
+    return 0
+
+# Header of the list view is not a Control. So this map is not per instance.
+lvHdrMsgMap = {
+    con.HDM_LAYOUT: _hdrLayoutMsg,
+    con.WM_MOUSEMOVE: _hdrMouseMoveMsg,
+    con.WM_MOUSELEAVE: _hdrMouseLeaveMsg,
+    con.WM_PAINT: _hdrPaintMsg,
+}
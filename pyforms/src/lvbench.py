@@ -0,0 +1,143 @@
+# lvbench module - ListView bulk insertion benchmark.
+# Compares the old per row insertion with addRow & addRows.
+# Win32 functions are replaced with a recording stand-in for pyforms.src.apis.
+# So no window is created and the numbers only show what we do on Python side.
+# Usage: python -m pyforms.src.lvbench [rows] [cols]
+
+import sys, time, tracemalloc
+from collections import Counter
+from ctypes import Structure, addressof, cast, c_wchar_p
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+import pyforms.src.commons as commons
+import pyforms.src.listview as listview
+from pyforms.src.commons import Font
+from pyforms.src.listview import ListView, ListViewItem
+
+
+class RecordingApi:
+    """Stand-in for pyforms.src.apis. Win32 functions are counted, not called.
+        Structures are counted when created. Everything else comes from the real module."""
+    def __init__(self, realApi) -> None:
+        self.calls = Counter()
+        self.structs = Counter()
+        self._real = realApi
+
+    def __getattr__(self, name):
+        value = getattr(self._real, name)
+        if isinstance(value, type) and issubclass(value, Structure):
+            value = self._structMaker(name, value)
+        elif hasattr(value, "argtypes"): # A Win32 function
+            value = self._funcRecorder(name)
+        setattr(self, name, value) # Next time, we won't come here.
+        return value
+
+    def _structMaker(self, name, struct):
+        # A sub class, so that sizeof & POINTER still work with it.
+        counter = self.structs
+        def init(this, *args, **kwargs):
+            counter[name] += 1
+            struct.__init__(this, *args, **kwargs)
+        return type(name, (struct,), {"__init__": init})
+
+    def _funcRecorder(self, name):
+        def recorder(*args):
+            self.calls[name] += 1
+            return 0
+        return recorder
+
+    def reset(self):
+        self.calls.clear()
+        self.structs.clear()
+
+
+class BufferCounter:
+    """Counts the wide char buffers created through the wrapped function."""
+    def __init__(self, func) -> None:
+        self.count = 0
+        self._func = func
+
+    def __call__(self, *args):
+        self.count += 1
+        return self._func(*args)
+
+
+class FakeForm:
+    """ListView only needs these from it's parent."""
+    def __init__(self) -> None:
+        self._font = Font()
+        self._bgColor = None
+        self._controls = []
+
+
+def legacyAddRow(lv: ListView, *items):
+    # This is how addRow worked before. A new LVITEMW & buffer for each cell.
+    item = ListViewItem(items[0])
+    item._index = len(lv._items)
+    lvi = listview.api.LVITEMW()
+    lvi.mask = con.LVIF_TEXT | con.LVIF_PARAM | con.LVIF_STATE
+    lvi.iItem = item._index
+    lvi.iImage = item._imgIndex
+    lvi.pszText = cast(listview.create_unicode_buffer(item._text), c_wchar_p)
+    lvi.cchTextMax = len(item._text) + 1
+    listview.api.SendMessage(lv._hwnd, con.LVM_INSERTITEMW, 0, addressof(lvi))
+    lv._items.append(item)
+    for i in range(1, len(items)):
+        sitem = str(items[i])
+        slvi = listview.api.LVITEMW()
+        slvi.iSubItem = i
+        slvi.pszText = cast(listview.create_unicode_buffer(sitem), c_wchar_p)
+        listview.api.SendMessage(lv._hwnd, con.LVM_SETITEMTEXTW, item._index, addressof(slvi))
+        item._subitems.append(sitem)
+
+
+def makeListView() -> ListView:
+    lv = ListView(FakeForm())
+    lv._hwnd = 1 # Pretend that the handle is created.
+    lv._isCreated = True
+    return lv
+
+
+def runCase(title, rec, buffs, func, rows):
+    lv = makeListView()
+    rec.reset()
+    buffs.count = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(lv, rows)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls = ", ".join(f"{k}: {v}" for k, v in rec.calls.most_common())
+    print(f"{title}")
+    print(f"    time         : {elapsed * 1000:.2f} ms")
+    print(f"    api calls    : {sum(rec.calls.values())} ({calls})")
+    print(f"    LVITEMW made : {rec.structs['LVITEMW']}")
+    print(f"    buffers made : {buffs.count}")
+    print(f"    peak memory  : {peak / 1024:.1f} KB")
+
+
+def main(rowCount = 10000, colCount = 5):
+    rec = RecordingApi(api)
+    buffs = BufferCounter(listview.create_unicode_buffer)
+    listview.api = rec
+    listview.create_unicode_buffer = buffs
+    commons.create_unicode_buffer = buffs
+    rows = [[f"Row {r} Col {c}" for c in range(colCount)] for r in range(rowCount)]
+    print(f"Inserting {rowCount} rows with {colCount} columns\n")
+
+    def legacy(lv, rows):
+        for row in rows: legacyAddRow(lv, *row)
+
+    def perRow(lv, rows):
+        for row in rows: lv.addRow(*row)
+
+    runCase("Old addRow, per cell allocations", rec, buffs, legacy, rows)
+    runCase("addRow in a loop", rec, buffs, perRow, rows)
+    runCase("addRows", rec, buffs, ListView.addRows, rows)
+    runCase("setRows", rec, buffs, ListView.setRows, rows)
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:3]]
+    main(*args)
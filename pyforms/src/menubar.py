@@ -7,9 +7,9 @@ from pyforms.src.apis import CreateMenu, AppendMenu, SetMenu, SendMessage, POINT
 from pyforms.src.apis import SUBCLASSPROC, LRESULT, DefSubclassProc, CreateWindowEx, SetWindowSubclass, RemoveWindowSubclass, DestroyWindow
 from pyforms.src.apis import LOWORD, HIWORD, DrawMenuBar, InsertMenuW, LPMEASUREITEMSTRUCT, LPDRAWITEMSTRUCT, MENUITEMINFO
 from pyforms.src.apis import DrawText, InsertMenuItemW, SetBkMode, FillRect, CreateSolidBrush, ULONG_PTR, GetDC, ReleaseDC
-from pyforms.src.commons import MyMessages, getMousePoints, getMouseXpoint, getMouseYpoint, getMousePosOnMsg, menuTxtFlag
+from pyforms.src.commons import MyMessages, getMousePoints, getMouseXpoint, getMouseYpoint, getMousePosOnMsg, menuTxtFlag, TextMetrics
 from pyforms.src.control import Control
-from pyforms.src.colors import Color
+from pyforms.src.colors import Color, GdiPool
 from pyforms.src.events import EventArgs
 import pyforms.src.constants as con
 from pyforms.src.winmsgs import log_msg
@@ -81,6 +81,90 @@ class MenuData:
 	staticMenuIndex = 0
 
 
+class MenuRegistry:
+	"""Maps menu ids, popup menu handles and (parent handle, index) pairs to their MenuItems.
+		Menu messages use it instead of searching the menu tree.
+		Items are added when they are created and removed with their menu bar or context menu."""
+	_byId = {} # Key - menu id, Value - MenuItem
+	_byHmenu = {} # Key - HMENU of a popup menu, Value - MenuItem which opens it
+	_byPos = {} # Key - (parent HMENU, index), Value - MenuItem
+
+	@classmethod
+	def add(cls, mi):
+		"""Register a menu item. Call it again if the item's handle changes."""
+		cls._byId[mi._id] = mi
+		cls._byPos[(mi._parentHmenu, mi._index)] = mi
+		if mi._popup: cls._byHmenu[mi._hmenu] = mi
+
+	@classmethod
+	def remove(cls, mi):
+		"""Forget a menu item and all of it's children"""
+		for child in mi._menus.values(): cls.remove(child)
+		cls._byId.pop(mi._id, None)
+		if cls._byPos.get((mi._parentHmenu, mi._index)) is mi: del cls._byPos[(mi._parentHmenu, mi._index)]
+		if cls._byHmenu.get(mi._hmenu) is mi: del cls._byHmenu[mi._hmenu]
+
+	@classmethod
+	def fromId(cls, idNum): return cls._byId.get(idNum)
+
+	@classmethod
+	def fromHmenu(cls, hmenu): return cls._byHmenu.get(hmenu)
+
+	@classmethod
+	def fromPos(cls, parentHmenu, index): return cls._byPos.get((parentHmenu, index))
+
+	@classmethod
+	def stats(cls) -> dict:
+		"""Returns the registered item, popup menu & position counts"""
+		return {"items": len(cls._byId), "popups": len(cls._byHmenu), "positions": len(cls._byPos)}
+#-----------------End of MenuRegistry Class----------------------------
+
+
+class MenuDrawState:
+	"""Drawing resources of the owner drawn menus of a form. MenuBar makes it once,
+		so WM_DRAWITEM doesn't look up brushes or make rects for each item."""
+
+	__slots__ = ("defBgBrush", "hotBgBrush", "frameBrush", "grayBrush", "grayCref", "font", "_hotRect")
+
+	def __init__(self, font) -> None:
+		self.defBgBrush = Color(0xe9ecef).getBrush()
+		self.hotBgBrush = Color(0x90e0ef).getBrush()
+		self.frameBrush = Color(0x0077b6).getBrush()
+		self.grayBrush = Color(0xced4da).getBrush() # For a disabled menu.
+		self.grayCref = Color(0x979dac).ref
+		self.font = font
+		self._hotRect = api.RECT() # Reused for every hot item.
+
+	def draw(self, dis, mi):
+		hdc = dis.hDC
+		rcItem = dis.rcItem
+		txtClrRef = mi._fgColor.ref
+		if dis.itemState == 320 or dis.itemState == 257:
+			rc = self._hotRect
+			rc.left, rc.top, rc.right, rc.bottom = rcItem.left + 4, rcItem.top + 2, rcItem.right, rcItem.bottom - 2
+			if mi._isEnabled:
+				FillRect(hdc, byref(rc), self.hotBgBrush)
+				api.FrameRect(hdc, byref(rc), self.frameBrush)
+				txtClrRef = 0x00000000
+			else:
+				FillRect(hdc, byref(rc), self.grayBrush)
+				txtClrRef = self.grayCref
+		else:
+			FillRect(hdc, byref(rcItem), self.defBgBrush)
+			if not mi._isEnabled: txtClrRef = self.grayCref
+
+		SetBkMode(hdc, con.TRANSPARENT)
+		rcItem.left += mi._textOffset
+		api.SelectObject(hdc, self.font._hwnd)
+		api.SetTextColor(hdc, txtClrRef)
+		DrawText(hdc, mi._wideText, -1, byref(rcItem), menuTxtFlag)
+
+	def release(self):
+		for brush in (self.defBgBrush, self.hotBgBrush, self.frameBrush, self.grayBrush):
+			GdiPool.release(brush)
+#-----------------End of MenuDrawState Class----------------------------
+
+
 # Differentiate various menu types
 class MenuType(Enum):
 	BASE_MENU = 0
@@ -112,9 +196,7 @@ class MenuBar:
 		self._menuCount = 0
 		self.menus = {}
 
-		# We need this brush & color ref for drawing a disabled menu.
-		parent._menuGrayBrush = Color(0xced4da).createHBrush()
-		parent._menuGrayCref = Color(0x979dac).ref
+		if not parent._menuDraw: parent._menuDraw = MenuDrawState(parent._font)
 		# print("hmenubar ", self._hMenubar)
 		# parent._menuBar = self
 
@@ -130,10 +212,7 @@ class MenuBar:
 
 
 	def create(self):
-		self._parent._menuDefBgBrush = Color(0xe9ecef).createHBrush()
-		self._parent._menuHotBgBrush = Color(0x90e0ef).createHBrush()
-		self._parent._menuFrameBrush = Color(0x0077b6).createHBrush()
-		self._parent._menuFont = self._parent._font
+		self._parent._menuDraw.font = self._parent._font
 		if len(self.menus):
 			for menu in self.menus.values(): menu.create()
 		SetMenu(self._parent._hwnd, self._hMenubar)
@@ -150,7 +229,8 @@ class MenuItem:
 
 	__slots__ = ("_index","_font", "_wTxt", "_wideText", "_bgColor", "_fgColor", "_hmenu", "_state",
 	      			"_parentHmenu", "_id", "_level", "_text", "_type", "_menus", "_isCreated", "_isEnabled",
-					"_formHwnd", "onClick", "onPopup", "onCloseup", "onFocus", "_childCount", "_popup", "_formMenu")
+					"_formHwnd", "onClick", "onPopup", "onCloseup", "onFocus", "_childCount", "_popup", "_formMenu",
+					"_size", "_sizeFont", "_textOffset")
 
 	def __init__(self, txt: str, typ: MenuType, parentHmenu, indexNum) -> None:
 		self._popup = True if typ == MenuType.BASE_MENU or typ == MenuType.POP_UP else False
@@ -171,15 +251,22 @@ class MenuItem:
 		self.onFocus = None
 		self._childCount = 0
 		self._formMenu = False
+		self._formHwnd = None
 		self._isCreated = False
 		self._isEnabled = True
 		self._state = MenuState.ENABLED
+		self._size = None # Measured size. Kept till the text or the font changes.
+		self._sizeFont = None
+		self._textOffset = 10 if typ == MenuType.BASE_MENU else 25
 		MenuData.staticMenuID += 1
+		MenuRegistry.add(self)
 
 	def addMenu(self, txt: str):
-		if self._type == MenuType.MENU_ITEM:
+		if self._type == MenuType.MENU_ITEM and not self._popup:
+			DestroyMenu(self._hmenu)
 			self._hmenu = CreatePopupMenu()
 			self._popup = True
+			MenuRegistry.add(self) # Now it opens a popup menu.
 		mi = MenuItem(txt, MenuType.MENU_ITEM, self._hmenu, self._childCount)
 		mi._formHwnd = self._formHwnd
 		mi._formMenu = self._formMenu
@@ -225,26 +312,54 @@ class MenuItem:
 
 	def _cmenuInsertInternal(self):
 		if len(self._menus) > 0:
-			for menu in self._menus:
+			for menu in self._menus.values():
 				menu._cmenuInsertInternal()
 
 		if self._type == MenuType.CONTEXT_MENU:
-			self._insertMenuInternal(self._hMenu)
+			self._insertMenuInternal(self._parentHmenu)
 		elif self._type == MenuType.CONTEXT_SEP:
-			AppendMenu(self._hMenu, MF_SEPARATOR, 0, None)
+			AppendMenu(self._parentHmenu, MF_SEPARATOR, 0, None)
 
-	def getChildFromIndex(self, index):
-		for menu in self._menus.values():
-			# print("indexes ", menu._index)
-			if menu._index == index:
+	def _measure(self, hfont):
+		if self._size is None or hfont != self._sizeFont:
+			if self._type == MenuType.BASE_MENU:
+				# Measured with the DC's own font, like a fresh window DC.
+				self._size = TextMetrics.measure(None, self._text)
+			else:
+				width = TextMetrics.measure(hfont, self._text)[0] + self._textOffset + 10
+				self._size = (max(width, 100), 25)
+			self._sizeFont = hfont
+		return self._size
 
-				return menu
-		return None
+	def _updateText(self):
+		# Owner drawn items are measured again when their type is set.
+		mii = MENUITEMINFO()
+		mii.cbSize = sizeof(MENUITEMINFO)
+		mii.fMask = MIIM_TYPE
+		mii.fType = MF_OWNERDRAW
+		mii.dwTypeData = self._wTxt
+		mii.cch = len(self._text)
+		api.SetMenuItemInfo(self._parentHmenu, self._id, False, byref(mii))
+		if self._type == MenuType.BASE_MENU and self._formHwnd: DrawMenuBar(self._formHwnd)
+
+	def getChildFromIndex(self, index):
+		return MenuRegistry.fromPos(self._hmenu, index)
 
 
 	@property
 	def handle(self): return self._hmenu
 
+	@property
+	def text(self): return self._text
+
+	@text.setter
+	def text(self, value: str):
+		self._text = value
+		self._wideText = create_unicode_buffer(value)
+		self._wTxt = cast(self._wideText, c_wchar_p)
+		self._size = None
+		if self._isCreated: self._updateText()
+
 	@property
 	def foreColor(self) : return self._fgColor
 
@@ -384,11 +499,11 @@ class ContextMenu:
 		self._height = 25
 		self.onMenuClose = None
 		self.onMenuShown = None
-		self._defBgBrush = Color(0xe9ecef).createHBrush()
-		self._hotBgBrush = Color(0x90e0ef).createHBrush()
-		self._borderBrush = Color(0x0077b6).createHBrush()
+		self._defBgBrush = Color(0xe9ecef).getBrush()
+		self._hotBgBrush = Color(0x90e0ef).getBrush()
+		self._borderBrush = Color(0x0077b6).getBrush()
 		self._selTxtClr = Color(0x000000)
-		self._grayBrush = Color(0xced4da).createHBrush()
+		self._grayBrush = Color(0xced4da).getBrush()
 		self._grayCref = Color(0x979dac).ref
 		self._menuCount = 0
 		self._menuInserted = False
@@ -399,7 +514,7 @@ class ContextMenu:
 			indx = 0
 			for name in menuNames:
 				mtyp = MenuType.CONTEXT_SEP if name == '_' else MenuType.CONTEXT_MENU
-				mi = MenuItem(name, mtyp, parent, self._menuCount)
+				mi = MenuItem(name, mtyp, self._hMenu, self._menuCount)
 				self._menuCount += 1
 				self._menus.append(mi)
 				indx += 1
@@ -418,9 +533,8 @@ class ContextMenu:
 		TrackPopupMenu(self._hMenu, TPM_RIGHTBUTTON, xp, yp, 0, self._dummyHwnd, None)
 
 	def getMenuItem(self, idNum):
-		for menu in self._menus:
-			if menu._id == idNum: return menu
-		return None
+		mi = MenuRegistry.fromId(idNum)
+		return mi if mi and mi._parentHmenu == self._hMenu else None
 
 	def _cmenuCreateHandle(self):
 		if len(self._menus) > 0:
@@ -431,7 +545,10 @@ class ContextMenu:
 
 	def destroyContextMenu(self):
 		print("Destroying context menu")
+		for menu in self._menus: MenuRegistry.remove(menu)
 		DestroyMenu(self._hMenu)
+		for brush in (self._defBgBrush, self._hotBgBrush, self._borderBrush, self._grayBrush):
+			GdiPool.release(brush)
 
 
 
@@ -0,0 +1,184 @@
+# Created on 17-Oct-2026 04:30:00
+# menubench module - Menu message lookup benchmark.
+# Builds a menu bar with thousands of items on the headless simulator and sends
+# the menu messages which Windows sends while the user moves in a menu.
+# Then compares the registry lookups with the old linear search of the menu tree.
+# Last part opens a big owner drawn menu twice, to see the cost of measure & draw.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.menubench [menus] [items per menu]
+
+import sys, time, io, contextlib
+from ctypes import addressof
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.forms import Form
+from pyforms.src.menubar import MenuBar, MenuType, MenuRegistry, MF_POPUP
+
+MF_HILITE = 0x00000080
+MF_MOUSESELECT = 0x00008000
+
+
+def buildMenus(frm, menus, items):
+    # Every base menu has 'items' child menus. Every 10th child is a popup with 5 items.
+    mbar = MenuBar(frm)
+    for i in range(menus):
+        base = mbar.addMenu(f"Menu {i}")
+        for j in range(items):
+            mi = base.addMenu(f"Item {i}.{j}")
+            if j % 10 == 0:
+                for k in range(5): mi.addMenu(f"Sub {i}.{j}.{k}")
+    mbar.create()
+    return mbar
+
+
+def makeTrace(frm, mbar):
+    # User opens each menu and moves over all of it's items.
+    trace = []
+    for base in mbar.menus.values():
+        trace.append((con.WM_INITMENUPOPUP, base._hmenu, 0))
+        for mi in base._menus.values():
+            flags = MF_HILITE | MF_MOUSESELECT
+            if mi._popup:
+                trace.append((con.WM_MENUSELECT, (flags | MF_POPUP) << 16 | mi._index, base._hmenu))
+                trace.append((con.WM_INITMENUPOPUP, mi._hmenu, mi._index))
+                trace.append((con.WM_UNINITMENUPOPUP, mi._hmenu, 0))
+            else:
+                trace.append((con.WM_MENUSELECT, flags << 16 | mi._id, base._hmenu))
+        trace.append((con.WM_UNINITMENUPOPUP, base._hmenu, 0))
+    return trace
+
+
+def linearFromHmenu(frm, hmenu):
+    # Old Form._getMenuFromHmenu
+    for menu in frm._menuItemDict.values():
+        if menu._hmenu == hmenu: return menu
+    return None
+
+
+def linearChildFromIndex(pmenu, index):
+    # Old MenuItem.getChildFromIndex
+    for menu in pmenu._menus.values():
+        if menu._index == index: return menu
+    return None
+
+
+def linearLookups(frm, trace):
+    # What the old handlers did for each message, without the event calls.
+    found = 0
+    for msg, wp, lp in trace:
+        if msg == con.WM_MENUSELECT:
+            pmenu = linearFromHmenu(frm, lp)
+            if pmenu:
+                if (wp >> 16) & MF_POPUP:
+                    menu = linearChildFromIndex(pmenu, wp & 0xFFFF)
+                else:
+                    menu = frm._menuItemDict.get(wp & 0xFFFF)
+                found += menu is not None
+        else:
+            found += linearFromHmenu(frm, wp) is not None
+    return found
+
+
+def registryLookups(frm, trace):
+    found = 0
+    for msg, wp, lp in trace:
+        if msg == con.WM_MENUSELECT:
+            if (wp >> 16) & MF_POPUP:
+                menu = MenuRegistry.fromPos(lp, wp & 0xFFFF)
+            else:
+                menu = frm._menuItemDict.get(wp & 0xFFFF)
+            found += menu is not None
+        else:
+            found += frm._getMenuFromHmenu(wp) is not None
+    return found
+
+
+def openMenu(frm, menu, hdc):
+    # Windows measures all the items when a popup menu opens and then draws them.
+    mis = api.MEASUREITEMSTRUCT()
+    dis = api.DRAWITEMSTRUCT()
+    dis.hDC = hdc
+    mis.CtlType = dis.CtlType = con.ODT_MENU # Form sends the others to the controls.
+    items = [mi for mi in menu._menus.values() if mi._type != MenuType.SEPARATOR]
+    for mi in items:
+        mis.itemData = id(mi)
+        sim.send(frm.handle, con.WM_MEASUREITEM, 0, addressof(mis))
+    top = 0
+    for i, mi in enumerate(items):
+        dis.itemData = id(mi)
+        dis.itemState = 257 if i == 0 else 0 # First one is hot.
+        dis.rcItem.left, dis.rcItem.top, dis.rcItem.right, dis.rcItem.bottom = 0, top, mis.itemWidth, top + mis.itemHeight
+        sim.send(frm.handle, con.WM_DRAWITEM, 0, addressof(dis))
+        top += mis.itemHeight
+
+
+def timeOpen(frm, menu, hdc):
+    sim.calls.clear()
+    start = time.perf_counter()
+    openMenu(frm, menu, hdc)
+    elapsed = time.perf_counter() - start
+    calls = ", ".join(f"{k}: {v}" for k, v in sim.calls.most_common(4))
+    return f"{elapsed * 1000:.2f} ms, {sum(sim.calls.values())} api calls ({calls} ...)"
+
+
+def timeIt(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(menus = 20, items = 200):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    frm = Form("Menu bench")
+    frm.createHandle()
+    start = time.perf_counter()
+    mbar = buildMenus(frm, menus, items)
+    buildTime = time.perf_counter() - start
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+
+    counter = {"focus": 0, "popup": 0}
+    def onFocus(m, e): counter["focus"] += 1
+    def onPopup(m, e): counter["popup"] += 1
+    for mi in frm._menuItemDict.values():
+        mi.onFocus = onFocus
+        mi.onPopup = onPopup
+
+    trace = makeTrace(frm, mbar)
+    linTime, linFound = timeIt(linearLookups, frm, trace)
+    regTime, regFound = timeIt(registryLookups, frm, trace)
+    start = time.perf_counter()
+    for msg, wp, lp in trace: sim.send(frm.handle, msg, wp, lp)
+    sendTime = time.perf_counter() - start
+
+    count = len(frm._menuItemDict)
+    print(f"{menus} menus with {items} items each, {count} menu items in total")
+    print(f"{len(trace)} menu messages\n")
+    print(f"    build menus       : {buildTime * 1000:.2f} ms")
+    print(f"    linear search     : {linTime * 1000:.2f} ms ({linTime * 1e6 / len(trace):.2f} us/msg, {linFound} found)")
+    print(f"    registry          : {regTime * 1000:.2f} ms ({regTime * 1e6 / len(trace):.2f} us/msg, {regFound} found)")
+    print(f"    through form proc : {sendTime * 1000:.2f} ms ({sendTime * 1e6 / len(trace):.2f} us/msg)")
+    print(f"    events            : {counter}")
+    print(f"    registry          : {MenuRegistry.stats()}")
+
+    bigMenu = mbar.addMenu("Big menu")
+    for i in range(300): bigMenu.addMenu(f"Big menu item {i}")
+    bigMenu.create()
+    hdc = api.CreateCompatibleDC(None)
+    print(f"\nOpening a menu with {len(bigMenu._menus)} owner drawn items")
+    print(f"    first time        : {timeOpen(frm, bigMenu, hdc)}")
+    print(f"    second time       : {timeOpen(frm, bigMenu, hdc)}")
+    api.DeleteDC(hdc)
+    frm.close()
+    sim.pump()
+    print(f"    after close       : {MenuRegistry.stats()}")
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:3]]
+    main(*args)
@@ -1,13 +1,8 @@
 
 
 # messagebox module - Created on 12-Dec-2022 19:40:20
-from ctypes import windll
-from ctypes.wintypes import HWND, LPCWSTR, UINT, INT
 from enum import Enum
-
-MessageBox = windll.user32.MessageBoxW
-MessageBox.argtypes = [HWND, LPCWSTR, LPCWSTR, UINT]
-MessageBox.restype = INT
+from pyforms.src.apis import MessageBox
 
 class MessageButtons(Enum):
 	OKAY = 0x00000000
@@ -0,0 +1,117 @@
+# mousebench module - Mouse message replay benchmark.
+# Replays a recorded like stream of mouse messages (hit test, set cursor, mouse move,
+# hover & leave) through the real Form & Button window procedures.
+# Win32 functions are replaced with the recording stand-in from lvbench.
+# So no window is created and the numbers only show what we do on Python side.
+# Every message still goes through the ctypes callback of the window/subclass proc,
+# connected handlers or not. Only the work after the proc's table lookup is skipped
+# (handler, TrackMouseEvent & EventArgs). So each case is also shown without the
+# cost of an empty proc of same type, which is the trampoline & the default proc.
+# Usage: python -m pyforms.src.mousebench [passes]
+
+import sys, time
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+import pyforms.src.control as control
+import pyforms.src.forms as forms
+import pyforms.src.buttons as buttons
+from pyforms.src.control import HwndRegistry
+from pyforms.src.forms import Form, wndProcMain
+from pyforms.src.buttons import Button, btnwndproc
+from pyforms.src.lvbench import RecordingApi
+from pyforms.src.apis import WNDPROC, SUBCLASSPROC, LRESULT
+
+
+def makeTrace(passes, moves = 40):
+    # Each pass, mouse comes in, moves a bit, stops for a while and leaves.
+    # Windows sends a hit test & a set cursor message before each mouse move.
+    trace = []
+    for _ in range(passes):
+        for i in range(moves):
+            lp = (i << 16) | (i * 2)
+            trace.append((con.WM_NCHITTEST, 0, lp))
+            trace.append((con.WM_SETCURSOR, 0, lp))
+            trace.append((con.WM_MOUSEMOVE, 0, lp))
+        trace.append((con.WM_MOUSEHOVER, 0, 0))
+        trace.append((con.WM_MOUSELEAVE, 0, 0))
+    return trace
+
+
+def replay(proc, hwnd, trace, subclass, rounds = 3):
+    # Best of few rounds.
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        if subclass:
+            for msg, wp, lp in trace: proc(hwnd, msg, wp, lp, 1, 0)
+        else:
+            for msg, wp, lp in trace: proc(hwnd, msg, wp, lp)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+
+def makeEmptyProcs(rec):
+    # Procs which do nothing but calling the default proc. Their time is the floor
+    # which every control pays for the mouse messages.
+    @WNDPROC
+    def emptyWndProc(hw, msg, wp, lp) -> LRESULT: return rec.DefWindowProc(hw, msg, wp, lp)
+
+    @SUBCLASSPROC
+    def emptySubclassProc(hw, msg, wp, lp, scID, refData) -> LRESULT: return rec.DefSubclassProc(hw, msg, wp, lp)
+    return emptyWndProc, emptySubclassProc
+
+
+def runCase(title, rec, ctl, proc, trace, subclass, floor):
+    elapsed = replay(proc, ctl._hwnd, trace, subclass)
+    rec.reset()
+    replay(proc, ctl._hwnd, trace, subclass, 1) # Once more to count the api calls.
+    handled = sum(1 for msg, _, _ in trace if msg in ctl._msgMap)
+    calls = ", ".join(f"{k}: {v}" for k, v in rec.calls.most_common())
+    print(f"{title}")
+    print(f"    time          : {elapsed * 1000:.2f} ms ({elapsed * 1e9 / len(trace):.0f} ns/msg)")
+    print(f"    past the proc : {(elapsed - floor) * 1000:.2f} ms (time - empty proc)")
+    print(f"    into handlers : {handled} of {len(trace)} messages")
+    print(f"    api calls     : {sum(rec.calls.values())} ({calls})")
+
+
+def onMove(sender, e): pass
+
+
+def main(passes = 500):
+    rec = RecordingApi(api)
+    forms.api = rec
+    buttons.api = rec
+    control.api = rec
+    trace = makeTrace(passes)
+    print(f"Replaying {len(trace)} mouse messages\n")
+
+    frm = Form()
+    frm._hwnd = 1
+    HwndRegistry.add(frm._hwnd, frm, keepAlive = True)
+    btn = Button(frm)
+    btn._hwnd = 2
+    HwndRegistry.add(btn._hwnd, btn)
+
+    emptyWndProc, emptySubclassProc = makeEmptyProcs(rec)
+    for ctl, proc, empty, subclass in ((frm, wndProcMain, emptyWndProc, False), (btn, btnwndproc, emptySubclassProc, True)):
+        name = type(ctl).__name__
+        floor = replay(empty, ctl._hwnd, trace, subclass)
+        print(f"{name}, empty proc (trampoline & default proc only)")
+        print(f"    time          : {floor * 1000:.2f} ms ({floor * 1e9 / len(trace):.0f} ns/msg)")
+        runCase(f"{name}, no mouse handlers", rec, ctl, proc, trace, subclass, floor)
+
+        # Before, every mouse message was going to the handlers.
+        quiet = ctl._msgMap
+        ctl._msgMap = ctl._msgTable
+        runCase(f"{name}, no mouse handlers, always routed", rec, ctl, proc, trace, subclass, floor)
+        ctl._msgMap = quiet
+
+        ctl.onMouseMove = onMove
+        runCase(f"{name}, onMouseMove connected", rec, ctl, proc, trace, subclass, floor)
+        ctl.onMouseMove = None
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,81 @@
+# msgbench module - Per message dispatch overhead benchmark.
+# Compares the old 'match' based window procedures with the dispatch tables.
+# Old procs are rebuilt from the same tables. Same handlers in the same order,
+# but dispatched by a 'match' statement with dotted name cases, like before.
+# Handlers are replaced with a no-op, so we only measure the dispatch.
+# Usage: python -m pyforms.src.msgbench [messages]
+
+import sys, time
+import pyforms.src.constants as con
+from pyforms.src.commons import MyMessages
+from pyforms.src.forms import formMsgMap
+from pyforms.src.buttons import Button
+from pyforms.src.listview import ListView
+
+
+class MsgNames:
+    """Message values as attributes. Old procs were looking up 'con.WM_XXX' in every case."""
+    pass
+
+
+def noHandler(ctl, hw, msg, wp, lp): return None
+
+
+def makeMatchProc(table: dict):
+    # Build a proc which checks the messages one by one, like the old procs.
+    names = MsgNames()
+    lines = ["def proc(ctl, hw, msg, wp, lp):", "    match msg:"]
+    for i, msg in enumerate(table):
+        setattr(names, f"m{i}", msg)
+        lines.append(f"        case names.m{i}: return handler(ctl, hw, msg, wp, lp)")
+    lines.append("    return None")
+    scope = {"names": names, "handler": noHandler}
+    exec("\n".join(lines), scope)
+    return scope["proc"]
+
+
+def makeTableProc(table: dict):
+    # Same as the current procs. Unknown messages go straight to the default proc.
+    table = {msg: noHandler for msg in table}
+    def proc(ctl, hw, msg, wp, lp):
+        handler = table.get(msg)
+        if handler:
+            ret = handler(ctl, hw, msg, wp, lp)
+            if ret is not None: return ret
+        return None
+    return proc
+
+
+def timeProc(proc, msgs, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for msg in msgs: proc(None, 0, msg, 0, 0)
+    return (time.perf_counter() - start) * 1e9 / (rounds * len(msgs))
+
+
+# High frequency messages which nobody handles.
+unhandledMsgs = [con.WM_NCHITTEST, con.WM_SETCURSOR, con.WM_NCMOUSEMOVE, con.WM_GETTEXT]
+
+def runCase(title, table, count):
+    rounds = max(1, count // len(unhandledMsgs))
+    mouseMsgs = [con.WM_MOUSEMOVE]
+    notifyMsgs = [MyMessages.CTRL_NOTIFY] if MyMessages.CTRL_NOTIFY in table else [con.WM_NOTIFY]
+    oldProc = makeMatchProc(table)
+    newProc = makeTableProc(table)
+    print(f"{title} ({len(table)} messages in table)")
+    for name, msgs in (("unhandled", unhandledMsgs), ("mouse move", mouseMsgs), ("notify", notifyMsgs)):
+        old = timeProc(oldProc, msgs, rounds)
+        new = timeProc(newProc, msgs, rounds)
+        print(f"    {name:<11}: match {old:7.1f} ns/msg, table {new:7.1f} ns/msg")
+
+
+def main(count = 200000):
+    print(f"Dispatching about {count} messages per case\n")
+    runCase("Form", formMsgMap, count)
+    runCase("Button", Button._msgTable, count)
+    runCase("ListView", ListView._msgTable, count)
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:2]]
+    main(*args)
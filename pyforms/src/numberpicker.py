@@ -1,8 +1,8 @@
 # numberpicker module Created on 12-Dec-2022 23:04:20
 
 from ctypes.wintypes import HWND, UINT
-from ctypes import WINFUNCTYPE, byref, cast
-from pyforms.src.control import Control
+from ctypes import byref, cast
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap, ownerMouseMsg
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType, TextAlignment
@@ -12,8 +12,6 @@ from pyforms.src.apis import LRESULT, UINT_PTR, DWORD_PTR, WPARAM, LPARAM, SUBCL
 from pyforms.src.colors import Color, clamp
 # from .winmsgs import log_msg
 
-numpDict = {}
-npTbDict = {}
 numpStyle = con.WS_VISIBLE | con.WS_CHILD  | con.UDS_ALIGNRIGHT | con.UDS_ARROWKEYS | con.UDS_AUTOBUDDY | con.UDS_HOTTRACK
 # txtFlag = con.DT_SINGLELINE | con.DT_VCENTER | con.DT_CENTER | con.DT_NOPREFIX
 
@@ -26,7 +24,7 @@ class NumberPicker(Control):
     _count = 1
     __slots__ = ( "_hideCaret", "_trackMouseLeave", "_btnOnLeft", "_hasSep", "_topEdgeFlag", "_botEdgeFlag",
                     "_autoRotate", "_minRange", "_maxRange", "_value", "_step", "_deciPrecis", "_buddyRect",
-                    "_buddyStyle", "_buddyExStyle", "_buddyHwnd", "_buddyCID", "_buddySubclsID", "_linex", "_destroyCount",
+                    "_buddyStyle", "_buddyExStyle", "_buddyHwnd", "_buddyCID", "_buddySubclsID", "_linex",
                     "_buddySubclsProc", "_txtPos", "onValueChanged", "_myRect", "_udRect", "_keyPressed" )
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 70, height: int = 24, auto = False ) -> None:
@@ -64,7 +62,6 @@ class NumberPicker(Control):
         self._botEdgeFlag = con.BF_BOTTOM
         self._hideCaret = False
         self._linex = 0
-        self._destroyCount = 0
         self._hwnd = None
         parent._controls.append(self)
 
@@ -88,7 +85,7 @@ class NumberPicker(Control):
                                         self._cid,
                                         self._parent.wnd_class.hInstance, None )
         if self._hwnd:
-            numpDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(npWndProc)
             self._setFontInternal()
 
@@ -111,6 +108,7 @@ class NumberPicker(Control):
             if self._buddyHwnd:
                 self._isCreated = True
                 Control._ctl_id += 1
+                HwndRegistry.add(self._buddyHwnd, self)
                 api.SetWindowSubclass(self._buddyHwnd, buddyWndProc, self._buddySubclsID, self._hwnd)
                 api.SendMessage(self._buddyHwnd, con.WM_SETFONT, self.font.handle, 1)
                 old_buddy = api.SendMessage(self._hwnd, con.UDM_SETBUDDY, self._buddyHwnd, 0)
@@ -184,14 +182,14 @@ class NumberPicker(Control):
     def _resizeBuddy(self):
         swp_flag = con.SWP_NOACTIVATE | con.SWP_NOZORDER
         if self._btnOnLeft:
-            api.SetWindowPos(self._buddyHwnd, None,
+            self._setWindowPos(self._buddyHwnd,
                             self._xpos + self._udRect.right,
                             self._ypos,
                             self._buddyRect.right,
                             self._buddyRect.bottom, swp_flag)
             self._linex = self._buddyRect.left
         else:
-            api.SetWindowPos(self._buddyHwnd, None,
+            self._setWindowPos(self._buddyHwnd,
                             self._xpos,
                             self._ypos,
                             self._buddyRect.right - 2,
@@ -199,6 +197,23 @@ class NumberPicker(Control):
 
             self._linex = self._buddyRect.right - 3
 
+    # Up-down & buddy edit are placed side by side, just like UDM_SETBUDDY does.
+    def _setBounds(self, x, y, width, height):
+        self._xpos = x
+        self._ypos = y
+        self._width = width
+        self._height = height
+        if self._isCreated:
+            swp_flag = con.SWP_NOACTIVATE | con.SWP_NOZORDER
+            udWidth = self._udRect.right
+            buddyWidth = width - udWidth
+            udx = x if self._btnOnLeft else x + buddyWidth
+            self._setWindowPos(self._buddyHwnd, x + udWidth if self._btnOnLeft else x, y, buddyWidth, height, swp_flag)
+            self._setWindowPos(self._hwnd, udx, y, udWidth, height, swp_flag)
+            api.SetRect(byref(self._buddyRect), 0, 0, buddyWidth, height)
+            api.SetRect(byref(self._myRect), x, y, x + width, y + height)
+            self._linex = self._buddyRect.left if self._btnOnLeft else buddyWidth - 3
+
     # -endregion Private funcs
 
     # -region Properties
@@ -322,6 +337,7 @@ class NumberPicker(Control):
         """Set mouse evnte event handler"""
         self._onMouseEnter = value
         self._trackMouseLeave = True
+        self._updateMouseRoute()
     #--------------------------------------------[11]
 
 
@@ -330,6 +346,7 @@ class NumberPicker(Control):
         """Set mouse leave event handler"""
         self._onMouseLeave = value
         self._trackMouseLeave = True
+        self._updateMouseRoute()
     #--------------------------------------------[12]
     # -endregion Properties
 
@@ -340,130 +357,131 @@ class NumberPicker(Control):
 @SUBCLASSPROC
 def npWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
 
-    np = numpDict[hw]
+    np = HwndRegistry.get(hw)
     # log_msg(msg, f"Main proc {np.name}")
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, npWndProc, scID)
-            np._destroyCount += 1
-            if np._destroyCount == 2: del numpDict[hw]
-
-        case MyMessages.CTRL_NOTIFY:
-            nm = cast(lp, api.LPNMUPDOWN).contents
-            if nm.hdr.code == con.UDN_DELTAPOS:
-                np._value = float(np._getCtrlTextEx(np._buddyHwnd))
-                np._setNpkValue(nm.iDelta)
-                np._displayValue()
-                if np.onValueChanged: np.onValueChanged(np, EventArgs())
-
-        case con.WM_SETFOCUS: np._gotFocusHandler()
-        case con.WM_KILLFOCUS: np._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: np._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: np._leftMouseUpHandler(msg, wp, lp)
-        case MyMessages.MOUSE_CLICK: np._mouse_click_handler()
-        case con.WM_RBUTTONDOWN: np._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: np._rightMouseUpHandler(msg, wp, lp)
-        case MyMessages.RIGHT_CLICK: np._right_mouse_click_handler()
-        case con.WM_MOUSEWHEEL: np._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: np._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE:
-            if np._trackMouseLeave:
-                if not np._isMouseUponMe():
-                    np._isMouseEntered = False
-                    if np.on_mouse_leave: np.on_mouse_leave(np, EventArgs())
+    handler = np._msgMap.get(msg)
+    if handler:
+        ret = handler(np, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, npWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
 
+def _npNotifyMsg(np, hw, msg, wp, lp):
+    nm = cast(lp, api.LPNMUPDOWN).contents
+    if nm.hdr.code == con.UDN_DELTAPOS:
+        np._value = float(np._getCtrlTextEx(np._buddyHwnd))
+        np._setNpkValue(nm.iDelta)
+        np._displayValue()
+        if np.onValueChanged: np.onValueChanged(np, EventArgs())
+
+def _npMouseLeaveMsg(np, hw, msg, wp, lp):
+    if np._trackMouseLeave:
+        if not np._isMouseUponMe():
+            np._isMouseEntered = False
+            if np.on_mouse_leave: np.on_mouse_leave(np, EventArgs())
+
+NumberPicker._msgTable = makeMsgMap({
+    MyMessages.CTRL_NOTIFY: _npNotifyMsg,
+    con.WM_MOUSELEAVE: _npMouseLeaveMsg,
+})
 
-@WINFUNCTYPE(LRESULT, HWND, UINT, WPARAM, LPARAM, UINT_PTR, DWORD_PTR)
+
+
+@SUBCLASSPROC
 def buddyWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
 
-    np = numpDict[refData]
+    np = HwndRegistry.get(hw)
     # log_msg(msg, np.name)
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, buddyWndProc, scID)
-            np._destroyCount += 1
-            if np._destroyCount == 2: del numpDict[refData]
-
-        case MyMessages.EDIT_COLOR:
-            # Whether user selects a back color or not, we must set the back color.
-            # Otherwise, NumberPicker will be drawn in default control back color by DefWndProc
-            # hdc = HDC(wp)
-            if np._drawFlag & 1: api.SetTextColor(wp, np._fgColor.ref)
-            api.SetBkColor(wp, np._bgColor.ref)
-            return api.CreateSolidBrush(np._bgColor.ref)
-
-        case con.WM_MOUSELEAVE:
-            if np._trackMouseLeave:
-                if not np._isMouseUponMe():
-                    np._isMouseEntered = False
-                    if np.on_mouse_leave: np.on_mouse_leave(np, EventArgs())
-
-        case con.WM_MOUSEMOVE: np._mouseMoveHandler(msg, wp, lp)
-
-        case con.EM_SETSEL:
-            # Edit control in NumberPicker is not support auto selection.
-            return False
-
-        case MyMessages.CTL_COMMAND:
-            code = api.HIWORD(wp)
-            # print("wm command ", code)
-            match code:
-                case con.EN_CHANGE:pass
-                case con.EN_UPDATE:
-                    if np._hideCaret: api.HideCaret(hw)
-
-        case con.WM_KEYDOWN:
-            np._keyPressed = True
-            np._keyDownHandler(wp)
-
-        case con.WM_KEYUP: np._keyUpHandler(wp)
-        case con.WM_CHAR: np._keyPressHandler(wp)
-        case con.WM_SETFOCUS: np._gotFocusHandler()
-        case con.WM_KILLFOCUS:
-            # When user manually enter numbers, we need to check that value
-            # And displays it in as per our current value protocol.
-            if np._keyPressed:
-                np._value = float(np._getCtrlTextEx(hw))
-                np._setNpkValue(0)
-                np._keyPressed = False
-                np._displayValue()
-            np._lostFocusHandler()
-
-        case con.WM_LBUTTONDOWN:
-            # Some of the drawing job in edit control is not through the wm_paint message.
-            # If we click on it, it will start drawing without sending wm_paint.
-            # So, when a click is received in an edit control, we need an immediate redraw.
-            # Otherwise, we will lost our beautiful top edge.
-            # api.RedrawWindow(hw, None, None, con.RDW_INTERNALPAINT)
-            np._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: np._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: np._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: np._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: np._mouseWheenHandler(msg, wp, lp)
-
-        case con.WM_PAINT:
-            # Edit control needs to be painted by DefSubclassProc function.
-            # Otherwise, cursor and text will not be visible, So we need to call it.
-            api.DefSubclassProc(hw, msg, wp, lp)
-
-            # Now, Edit's painting job is done and control is ready for our drawing.
-            # So, first, we are going to draw 3 edges for this Edit control.
-            # Then we, will draw a single line to mask the control border.
-            # with Timing("paint time : "): # 60-70 micro secs average
-            hdc = api.GetDC(hw)
-            api.DrawEdge(hdc, byref(np._buddyRect), con.BDR_SUNKENOUTER, np._topEdgeFlag) # Right code
-            api.DrawEdge(hdc, byref(np._buddyRect), con.BDR_RAISEDINNER, np._botEdgeFlag )
-            fpen = api.CreatePen(con.PS_SOLID, 1, np._bgColor.ref) # We use Edit's back color.
-            api.SelectObject(hdc, fpen)
-            api.MoveToEx(hdc, np._linex, 1, None)
-            api.LineTo(hdc, np._linex, np._height - 1)
-            api.ReleaseDC(hw, hdc)
-            api.DeleteObject(fpen)
-            return 1
-        case MyMessages.BUDDY_RESET:
-            np._resizeBuddy()
+    handler = buddyMsgMap.get(msg)
+    if handler:
+        ret = handler(np, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        np._releaseBkgBrush()
+        api.RemoveWindowSubclass(hw, buddyWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
+
+
+def _buddyEditColorMsg(np, hw, msg, wp, lp):
+    # Whether user selects a back color or not, we must set the back color.
+    # Otherwise, NumberPicker will be drawn in default control back color by DefWndProc
+    # hdc = HDC(wp)
+    if np._drawFlag & 1: api.SetTextColor(wp, np._fgColor.ref)
+    api.SetBkColor(wp, np._bgColor.ref)
+    if not np._bkgBrush: np._resetBkgBrush()
+    return np._bkgBrush
+
+# Edit control in NumberPicker is not support auto selection.
+def _buddySetSelMsg(np, hw, msg, wp, lp): return False
+
+def _buddyCommandMsg(np, hw, msg, wp, lp):
+    code = api.HIWORD(wp)
+    # print("wm command ", code)
+    match code:
+        case con.EN_CHANGE:pass
+        case con.EN_UPDATE:
+            if np._hideCaret: api.HideCaret(hw)
+
+def _buddyKeyDownMsg(np, hw, msg, wp, lp):
+    np._keyPressed = True
+    np._keyDownHandler(wp)
+
+def _buddyKeyUpMsg(np, hw, msg, wp, lp): np._keyUpHandler(wp)
+def _buddyCharMsg(np, hw, msg, wp, lp): np._keyPressHandler(wp)
+
+def _buddyKillFocusMsg(np, hw, msg, wp, lp):
+    # When user manually enter numbers, we need to check that value
+    # And displays it in as per our current value protocol.
+    if np._keyPressed:
+        np._value = float(np._getCtrlTextEx(hw))
+        np._setNpkValue(0)
+        np._keyPressed = False
+        np._displayValue()
+    np._lostFocusHandler()
+
+def _buddyPaintMsg(np, hw, msg, wp, lp):
+    # Edit control needs to be painted by DefSubclassProc function.
+    # Otherwise, cursor and text will not be visible, So we need to call it.
+    api.DefSubclassProc(hw, msg, wp, lp)
+
+    # Now, Edit's painting job is done and control is ready for our drawing.
+    # So, first, we are going to draw 3 edges for this Edit control.
+    # Then we, will draw a single line to mask the control border.
+    # with Timing("paint time : "): # 60-70 micro secs average
+    hdc = api.GetDC(hw)
+    api.DrawEdge(hdc, byref(np._buddyRect), con.BDR_SUNKENOUTER, np._topEdgeFlag) # Right code
+    api.DrawEdge(hdc, byref(np._buddyRect), con.BDR_RAISEDINNER, np._botEdgeFlag )
+    fpen = api.CreatePen(con.PS_SOLID, 1, np._bgColor.ref) # We use Edit's back color.
+    api.SelectObject(hdc, fpen)
+    api.MoveToEx(hdc, np._linex, 1, None)
+    api.LineTo(hdc, np._linex, np._height - 1)
+    api.ReleaseDC(hw, hdc)
+    api.DeleteObject(fpen)
+    return 1
+
+def _buddyResetMsg(np, hw, msg, wp, lp): np._resizeBuddy()
+
+# Buddy edit is not a Control. So this map is not per instance.
+# Some of the drawing job in edit control is not through the wm_paint message.
+# If we click on it, it will start drawing without sending wm_paint.
+# So, when a click is received in an edit control, we need an immediate redraw.
+# Otherwise, we will lost our beautiful top edge.
+buddyMsgMap = makeMsgMap({
+    MyMessages.EDIT_COLOR: _buddyEditColorMsg,
+    con.WM_MOUSEMOVE: ownerMouseMsg,
+    con.WM_MOUSELEAVE: ownerMouseMsg,
+    con.EM_SETSEL: _buddySetSelMsg,
+    MyMessages.CTL_COMMAND: _buddyCommandMsg,
+    con.WM_KEYDOWN: _buddyKeyDownMsg,
+    con.WM_KEYUP: _buddyKeyUpMsg,
+    con.WM_CHAR: _buddyCharMsg,
+    con.WM_KILLFOCUS: _buddyKillFocusMsg,
+    con.WM_PAINT: _buddyPaintMsg,
+    MyMessages.BUDDY_RESET: _buddyResetMsg,
+})
@@ -0,0 +1,71 @@
+# Created on 17-Oct-2026 07:30:00
+# pgbbench module - ProgressBar reporting benchmark.
+# Worker threads report progress many thousand times. Old way sets the value for each
+# report through Form.invoke, so the UI thread sets the position & repaints every time.
+# Then the same job with ProgressBar.report, which applies only the latest value in a frame.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.pgbbench [reports per worker] [workers]
+
+import sys, time, io, contextlib, threading
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.forms import Form
+from pyforms.src.progressbar import ProgressBar
+
+
+def runJob(frm, pgb, report, count, workers):
+    # Workers share the job. Each one reports the total done so far.
+    done = [0]
+    lock = threading.Lock()
+    def work():
+        for _ in range(count):
+            sum(range(300)) # The real work
+            with lock:
+                done[0] += 1
+                value = done[0] * 100 // (count * workers)
+            report(value)
+
+    threads = [threading.Thread(target = work) for _ in range(workers)]
+    sim.sent.clear()
+    sim.calls.clear()
+    start = time.perf_counter()
+    for th in threads: th.start()
+    while any(th.is_alive() for th in threads): # UI thread runs the message loop.
+        sim.advance(1)
+        sim.pump()
+    end = time.perf_counter() + 0.1 # Last frame
+    while time.perf_counter() < end:
+        sim.advance(1)
+        sim.pump()
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    return elapsed, sim.sent[con.PBM_SETPOS], sim.calls["GetDC"], pgb.value
+
+
+def main(count = 20_000, workers = 4):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    frm = Form("ProgressBar bench")
+    frm.createHandle()
+    pgbOld = ProgressBar(frm, 10, 10, perc = True)
+    pgbNew = ProgressBar(frm, 10, 50, perc = True)
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+    print(f"{workers} workers, {count} reports each\n")
+
+    def oldReport(value):
+        frm.invoke(setattr, pgbOld, "value", value)
+    for title, pgb, report in (("invoke", pgbOld, oldReport), ("report", pgbNew, pgbNew.report)):
+        elapsed, sets, paints, value = runJob(frm, pgb, report, count, workers)
+        print(f"    {title} : {elapsed * 1000:.1f} ms, {sets} position changes, {paints} percentage draws, final value {value}")
+    frm.close()
+    sim.pump()
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:3]]
+    main(*args)
@@ -1,16 +1,15 @@
 # Created on 21-Jan-2023 00:41:20
 
-from ctypes import byref, create_unicode_buffer
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
-from pyforms.src.commons import MyMessages
+from pyforms.src.commons import MyMessages, TextMetrics
 from pyforms.src.enums import ControlType, ProgressBarStyle, ProgressBarState
 from pyforms.src.apis import SUBCLASSPROC
 import pyforms.src.apis as api
 from pyforms.src.colors import Color
+import time
 # from .winmsgs import log_msg
 
-pgbDict = {}
 pgbStyle = con.WS_CHILD | con.WS_VISIBLE | con.PBS_SMOOTH | con.WS_OVERLAPPED
 pgbExStyle = 0# con.WS_EX_CLIENTEDGE
 
@@ -18,7 +17,8 @@ class ProgressBar(Control):
 
     _count = 1
     __slots__ = ( "_barStyle", "_vertical", "_minValue", "_maxValue", "_step", "_value",
-                 "_percentage", "_state", "_speed", "_deciPrec", "_strPrec")
+                 "_percentage", "_state", "_speed", "_deciPrec", "_strPrec", "_percKey", "_percGeo",
+                 "_reportValue", "_reportPending", "_lastFrame", "_frameTimer", "reportInterval")
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10,
                  width: int = 180, height: int = 25, perc = False, auto = False ) -> None:
@@ -48,6 +48,13 @@ class ProgressBar(Control):
         self._percentage = perc
         self._strPrec = ""
         self._deciPrec = 0
+        self._percKey = None # Value, range, precision & size of the last percentage text.
+        self._percGeo = None # Text & position of the last percentage text.
+        self._reportValue = 0
+        self._reportPending = False
+        self._lastFrame = 0.0
+        self._frameTimer = None
+        self.reportInterval = 16 # Milli seconds between two updates from 'report'.
         self._hwnd = None
         parent._controls.append(self)
         ProgressBar._count += 1
@@ -62,7 +69,7 @@ class ProgressBar(Control):
         if self._vertical: self._style |= con.PBS_VERTICAL
         self._createControl()
         if self._hwnd:
-            pgbDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(pgbWndProc)
             self._setFontInternal()
             if self._minValue != 0 or self._maxValue != 100:
@@ -89,25 +96,63 @@ class ProgressBar(Control):
             # api.SendMessage(self._hwnd, con.PBM_SETMARQUEE, 0, 0)
 
 
+    def report(self, value: int):
+        """Set the value from any thread. Updates are combined and only the latest value is
+            applied on the UI thread, at most once in every 'reportInterval' milli seconds."""
+        self._reportValue = value
+        if self._reportPending: return # UI thread will pick this value.
+        if not self._isCreated:
+            self._value = value
+            return
+        self._reportPending = True
+        form = self._parent
+        if form._invoker.onUiThread():
+            self._applyReport()
+        else:
+            try:
+                form.beginInvoke(self._applyReport)
+            except Exception: # Form is closed.
+                self._reportPending = False
+
+
     # -endregion Public funcs
 
     # -region Private funcs
 
+    def _applyReport(self):
+        wait = self._lastFrame + self.reportInterval / 1000 - time.perf_counter()
+        if wait > 0: # Too soon. Timer will bring us back in the next frame.
+            if self._frameTimer is None: self._frameTimer = self._parent.addTimer(tickHandler = self._frameTick)
+            self._frameTimer.interval = max(int(wait * 1000), 1)
+            self._frameTimer.start()
+            return
+        self._reportPending = False # Goes down first. A report after this posts again.
+        self._lastFrame = time.perf_counter()
+        value = self._reportValue
+        if value != self._value: self.value = value
+
+    def _frameTick(self, sender, e):
+        self._frameTimer.stop()
+        self._applyReport()
+
     # Draw percentage text on progress bar
+    # Text & position are kept till the value, range, precision, font or size changes.
     def _drawPercentage(self):
-        ss = api.SIZE()
-        perc = (self._value / self._maxValue) * 100
-        if self._deciPrec == 0:
-            formattedPerc = int(perc)
-        else:
-            formatStr = "{:.%df}" % self._deciPrec
-            formattedPerc = formatStr.format(perc)
-        txt = create_unicode_buffer(f"{formattedPerc}%")
+        key = (self._value, self._maxValue, self._deciPrec, self._font._hwnd, self._width, self._height)
+        if key != self._percKey:
+            perc = (self._value / self._maxValue) * 100
+            if self._deciPrec == 0:
+                formattedPerc = int(perc)
+            else:
+                formatStr = "{:.%df}" % self._deciPrec
+                formattedPerc = formatStr.format(perc)
+            txt = f"{formattedPerc}%"
+            width, height = TextMetrics.measure(self._font._hwnd, txt)
+            self._percGeo = (txt, (self._width - width) // 2, (self._height - height) // 2)
+            self._percKey = key
+        txt, x, y = self._percGeo
         hdc = api.GetDC(self._hwnd)
         api.SelectObject(hdc, self._font._hwnd)
-        api.GetTextExtentPoint32(hdc, txt, len(txt), byref(ss))
-        x = (self._width - ss.cx) // 2
-        y = (self._height - ss.cy) // 2
         api.SetBkMode(hdc, con.TRANSPARENT)
         api.SetTextColor(hdc, self._fgColor.ref)
         api.TextOut(hdc, x, y, txt, len(txt) )
@@ -213,26 +258,23 @@ class ProgressBar(Control):
 @SUBCLASSPROC
 def pgbWndProc(hw, msg, wp, lp, scID, refData):
     # log_msg(msg)
-    pgb = pgbDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, pgbWndProc, scID)
-            del pgbDict[hw]
-
-        case con.WM_SETFOCUS: pgb._gotFocusHandler()
-        case con.WM_KILLFOCUS: pgb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: pgb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: pgb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: pgb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: pgb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: pgb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: pgb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: pgb._mouseLeaveHandler()
-        case con.WM_PAINT:
-            ret = api.DefSubclassProc(hw, msg, wp, lp)
-            if pgb._percentage and pgb._barStyle != ProgressBarStyle.MARQUEE_STYLE:
-                pgb._drawPercentage()
-            return ret
+    pgb = HwndRegistry.get(hw)
+    handler = pgb._msgMap.get(msg)
+    if handler:
+        ret = handler(pgb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, pgbWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _pgbPaintMsg(pgb, hw, msg, wp, lp):
+    ret = api.DefSubclassProc(hw, msg, wp, lp)
+    if pgb._percentage and pgb._barStyle != ProgressBarStyle.MARQUEE_STYLE:
+        pgb._drawPercentage()
+    return ret
+
+ProgressBar._msgTable = makeMsgMap({con.WM_PAINT: _pgbPaintMsg})
+
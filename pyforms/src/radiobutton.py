@@ -1,7 +1,7 @@
 # RadioButton module - Created on 09-Dec-2022 16:03:20
 
 from ctypes import byref, cast, addressof
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType
 from pyforms.src.apis import LRESULT, LPNMCUSTOMDRAW, SUBCLASSPROC
@@ -10,7 +10,6 @@ from pyforms.src.colors import Color
 import pyforms.src.constants as con
 from pyforms.src.events import EventArgs
 
-rbDict = {}
 rbStyle = con.WS_CHILD | con.WS_VISIBLE | con.WS_TABSTOP | con.BS_AUTORADIOBUTTON
 txtFlag = con.DT_SINGLELINE | con.DT_VCENTER | con.DT_CENTER | con.DT_NOPREFIX
 
@@ -37,7 +36,7 @@ class RadioButton(Control):
         self._exStyle = con.WS_EX_LTRREADING | con.WS_EX_LEFT
         self._txtStyle = con.DT_SINGLELINE | con.DT_VCENTER
         self._bgColor = Color(parent._bgColor)
-        self._bkgBrush = self._bgColor.createHBrush()
+        self._resetBkgBrush()
         self._checkOnClick = True
         self._rightAlign = False
         self._isChecked = False
@@ -59,7 +58,7 @@ class RadioButton(Control):
 
         self._createControl()
         if self._hwnd:
-            rbDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(rbWndProc)
             self._setFontInternal()
             ss = api.SIZE()
@@ -75,7 +74,7 @@ class RadioButton(Control):
     def backColor(self, value):
         """Set back color of radio button."""
         self._bgColor.updateColor(value)
-        self._bkgBrush = api.CreateSolidBrush(self._bgColor.ref)
+        self._resetBkgBrush()
         if not self._drawFlag & (1 << 1): self._drawFlag += 2
 
 
@@ -103,45 +102,46 @@ class RadioButton(Control):
 @SUBCLASSPROC
 def rbWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # printWinMsg(msg)
-    rb = rbDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, rbWndProc, scID)
-            del rbDict[hw]
-
-        case con.WM_SETFOCUS: rb._gotFocusHandler()
-        case con.WM_KILLFOCUS: rb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: rb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: rb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: rb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: rb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: rb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: rb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: rb._mouseLeaveHandler()
-
-        case MyMessages.LABEL_COLOR:
-            # if rb._drawFlag & 1: api.SetTextColor(wp, rb._fgColor.ref)
-            if rb._drawFlag & 2: api.SetBkColor(wp, rb._bgColor.ref)
-            return rb._bkgBrush
-
-        case MyMessages.CTRL_NOTIFY:
-            nmc = cast(lp, LPNMCUSTOMDRAW).contents
-            match nmc.dwDrawStage:
-                case con.CDDS_PREERASE: return con.CDRF_NOTIFYPOSTERASE
-                case con.CDDS_PREPAINT:
-                    rct = nmc.rc
-                    if not rb._rightAlign:
-                        rct.left += 17 # Adjusting rect,otherwise text will be drawn upon the check area
-                    else: rct.right -= 17
-
-                    api.SetTextColor(nmc.hdc, rb._fgColor.ref)
-                    api.SetBkMode(nmc.hdc, 1)
-                    api.DrawText(nmc.hdc, rb._text, len(rb._text), byref(rct), rb._txtStyle )
-                    return con.CDRF_SKIPDEFAULT
-
-        case MyMessages.CTL_COMMAND:
-            # print(f"Radio {rb.text = }, {rb._isChecked = }")
-            if rb.onCheckedChanged: rb.onCheckedChanged(rb, EventArgs() )
+    rb = HwndRegistry.get(hw)
+    handler = rb._msgMap.get(msg)
+    if handler:
+        ret = handler(rb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, rbWndProc, scID)
+        rb._releaseBkgBrush()
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _rbLabelColorMsg(rb, hw, msg, wp, lp):
+    # if rb._drawFlag & 1: api.SetTextColor(wp, rb._fgColor.ref)
+    if rb._drawFlag & 2: api.SetBkColor(wp, rb._bgColor.ref)
+    return rb._bkgBrush
+
+def _rbNotifyMsg(rb, hw, msg, wp, lp):
+    nmc = cast(lp, LPNMCUSTOMDRAW).contents
+    match nmc.dwDrawStage:
+        case con.CDDS_PREERASE: return con.CDRF_NOTIFYPOSTERASE
+        case con.CDDS_PREPAINT:
+            rct = nmc.rc
+            if not rb._rightAlign:
+                rct.left += 17 # Adjusting rect,otherwise text will be drawn upon the check area
+            else: rct.right -= 17
+
+            api.SetTextColor(nmc.hdc, rb._fgColor.ref)
+            api.SetBkMode(nmc.hdc, 1)
+            api.DrawText(nmc.hdc, rb._text, len(rb._text), byref(rct), rb._txtStyle )
+            return con.CDRF_SKIPDEFAULT
+
+def _rbCommandMsg(rb, hw, msg, wp, lp):
+    # print(f"Radio {rb.text = }, {rb._isChecked = }")
+    if rb.onCheckedChanged: rb.onCheckedChanged(rb, EventArgs() )
+
+RadioButton._msgTable = makeMsgMap({
+    MyMessages.LABEL_COLOR: _rbLabelColorMsg,
+    MyMessages.CTRL_NOTIFY: _rbNotifyMsg,
+    MyMessages.CTL_COMMAND: _rbCommandMsg,
+})
+
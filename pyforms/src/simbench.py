@@ -0,0 +1,69 @@
+# simbench module - Form life cycle benchmark on the headless simulator.
+# Each round creates a form with some controls, displays it, sends few messages
+# to every control and closes the form. Then it checks what is left behind.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.simbench [rounds]
+
+import sys, time, io, contextlib
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.control import HwndRegistry
+from pyforms.src.colors import GdiPool
+from pyforms.src.forms import Form
+from pyforms.src.buttons import Button
+from pyforms.src.textbox import TextBox
+from pyforms.src.label import Label
+from pyforms.src.listbox import ListBox
+from pyforms.src.combobox import ComboBox
+from pyforms.src.listview import ListView
+from pyforms.src.numberpicker import NumberPicker
+from pyforms.src.trackbar import TrackBar
+from pyforms.src.checkbox import CheckBox
+
+
+def makeControls(frm):
+    return [Button(frm), TextBox(frm), Label(frm, "Label"), ListBox(frm), ComboBox(frm),
+            ListView(frm), NumberPicker(frm), TrackBar(frm), CheckBox(frm, "Check")]
+
+# Messages which every control gets a lot.
+msgTrace = [con.WM_NCHITTEST, con.WM_SETCURSOR, con.WM_MOUSEMOVE, con.WM_PAINT, con.WM_MOUSELEAVE]
+
+def runRound():
+    frm = Form("Sim bench")
+    frm.createHandle()
+    controls = makeControls(frm)
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+    for ctl in controls:
+        for msg in msgTrace: sim.send(ctl.handle, msg, 0, 0)
+    frm.close()
+    sim.pump()
+    return len(controls)
+
+
+def main(rounds = 200):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    runRound() # Class registration, font & brush caches are filled now.
+    sim.calls.clear()
+    sim.sent.clear()
+    start = time.perf_counter()
+    for _ in range(rounds): count = runRound()
+    elapsed = time.perf_counter() - start
+    calls = ", ".join(f"{k}: {v // rounds}" for k, v in sim.calls.most_common(6))
+    print(f"{rounds} rounds, a form with {count} controls in each\n")
+    print(f"    time per form  : {elapsed * 1000 / rounds:.2f} ms")
+    print(f"    api calls/form : {sum(sim.calls.values()) // rounds} ({calls} ...)")
+    print(f"    messages/form  : {sum(sim.sent.values()) // rounds}")
+    print(f"    left behind    : {sim.stats()}")
+    print(f"    registry       : {HwndRegistry.stats()}")
+    print(f"    gdi pool       : {GdiPool.stats()}")
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:2]]
+    main(*args)
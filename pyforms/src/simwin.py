@@ -0,0 +1,901 @@
+# simwin module - Headless stand-in for the Win32 dlls.
+# When there is no Win32 (or PYFORMS_BACKEND=sim), apis module takes its functions from
+# 'windll' of this module. Simulator keeps windows, subclass chains, a message queue,
+# timers, GDI objects & DCs and window texts in plain python objects. So forms & controls
+# can be created, displayed and their window procedures can run without a screen.
+# It's not a Windows emulator. Only the generic window messages and listbox/combo items
+# are handled. Controls won't send notifications to their parents on their own.
+# Usage: from pyforms.src.simwin import sim
+
+import ctypes as ct
+import datetime
+import threading
+from collections import Counter, deque
+from ctypes.wintypes import LONG
+import pyforms.src.constants as con
+
+
+class _Point(ct.Structure):
+    _fields_ = [("x", LONG), ("y", LONG)]
+
+class _Rect(ct.Structure):
+    _fields_ = [("left", LONG), ("top", LONG), ("right", LONG), ("bottom", LONG)]
+
+
+def _deref(arg, struct = None):
+    # Returns the object which arg is pointing to. arg can be a byref(), pointer or an address.
+    if arg is None: return None
+    if isinstance(arg, int): return struct.from_address(arg) if (arg and struct) else None
+    obj = getattr(arg, "_obj", None) # byref() gives us a CArgObject
+    if obj is not None: return obj
+    if isinstance(arg, ct._Pointer): return arg.contents
+    return arg
+
+def _toInt(arg):
+    # Convert WPARAM/LPARAM/handle args to int like ctypes does for real functions.
+    if arg is None: return 0
+    if isinstance(arg, int): return int(arg)
+    if isinstance(arg, ct.py_object): return id(arg.value)
+    if isinstance(arg, (ct.c_wchar_p, ct.c_char_p, ct._Pointer, ct._CFuncPtr)):
+        return ct.cast(arg, ct.c_void_p).value or 0
+    if isinstance(arg, ct._SimpleCData): return arg.value or 0
+    if isinstance(arg, (ct.Structure, ct.Union, ct.Array)): return ct.addressof(arg)
+    obj = getattr(arg, "_obj", None)
+    if obj is not None: return ct.addressof(obj)
+    if isinstance(arg, str):
+        buff = ct.create_unicode_buffer(arg)
+        _keepAlive.append(buff)
+        return ct.addressof(buff)
+    return int(arg)
+
+def _toStr(arg) -> str:
+    if not arg: return ""
+    if isinstance(arg, str): return arg
+    if isinstance(arg, int): return ct.wstring_at(arg)
+    value = getattr(arg, "value", None)
+    return value if isinstance(value, str) else ""
+
+def _writeStr(address, text: str, maxLen: int) -> int:
+    # Copy text to the buffer at address like WM_GETTEXT. Returns copied char count.
+    if not address or maxLen <= 0: return 0
+    text = text[:maxLen - 1]
+    buff = ct.create_unicode_buffer(text)
+    ct.memmove(address, buff, ct.sizeof(buff))
+    return len(text)
+
+def _makeLong(lo, hi): return (lo & 0xFFFF) | ((hi & 0xFFFF) << 16)
+
+_keepAlive = deque(maxlen = 64) # Temporary wide strings we gave an address for.
+
+
+class SimWindow:
+    """A window of the simulator"""
+    __slots__ = ("hwnd", "className", "text", "style", "exStyle", "x", "y", "width", "height",
+                 "parent", "children", "ctlID", "visible", "enabled", "font", "subclasses", "frames",
+                 "dirty", "erase", "longs", "items", "itemData", "curSel")
+
+    def __init__(self, hwnd, className, text, style, exStyle, x, y, width, height, parent, ctlID) -> None:
+        self.hwnd = hwnd
+        self.className = className
+        self.text = text
+        self.style = style
+        self.exStyle = exStyle
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.parent = parent
+        self.children = []
+        self.ctlID = ctlID
+        self.visible = bool(style & con.WS_VISIBLE)
+        self.enabled = True
+        self.font = 0
+        self.subclasses = [] # [proc, id, refData, proc address] Last one gets the message first.
+        self.frames = [] # Index of the subclass procs which are running now.
+        self.dirty = True
+        self.erase = True
+        self.longs = {}
+        self.items = [] # Listbox & combo box strings
+        self.itemData = []
+        self.curSel = -1
+
+    def __repr__(self) -> str:
+        return f"SimWindow({self.hwnd}, {self.className!r}, {self.text!r})"
+
+
+# Listbox & combo box messages share the same logic.
+# constants module may not be ready when we are imported. So this is filled at first use.
+_itemMsgs = {}
+
+def _getItemAction(msg):
+    if not _itemMsgs: _itemMsgs.update({
+        con.LB_ADDSTRING: "add", con.CB_ADDSTRING: "add",
+        con.LB_INSERTSTRING: "insert", con.CB_INSERTSTRING: "insert",
+        con.LB_DELETESTRING: "delete", con.CB_DELETESTRING: "delete",
+        con.LB_RESETCONTENT: "reset", con.CB_RESETCONTENT: "reset",
+        con.LB_GETCOUNT: "count", con.CB_GETCOUNT: "count",
+        con.LB_GETTEXT: "text", con.CB_GETLBTEXT: "text",
+        con.LB_GETTEXTLEN: "textLen", con.CB_GETLBTEXTLEN: "textLen",
+        con.LB_SETCURSEL: "setSel", con.CB_SETCURSEL: "setSel",
+        con.LB_GETCURSEL: "getSel", con.CB_GETCURSEL: "getSel",
+        con.LB_FINDSTRING: "find", con.CB_FINDSTRING: "find",
+        con.LB_FINDSTRINGEXACT: "findExact", con.CB_FINDSTRINGEXACT: "findExact",
+        con.LB_SETITEMDATA: "setData", con.CB_SETITEMDATA: "setData",
+        con.LB_GETITEMDATA: "getData", con.CB_GETITEMDATA: "getData",
+        con.LB_INITSTORAGE: "initStorage", con.CB_INITSTORAGE: "initStorage",
+        con.LB_SETCOUNT: "setCount",
+    })
+    return _itemMsgs.get(msg)
+
+_itemClasses = ("listbox", "combobox", "combolbox")
+_stockBase = 0x7F000000
+_gdiKinds = {"brush": 1, "pen": 1, "font": 1, "bitmap": 1} # Objects which SelectObject cares about
+
+
+class Simulator:
+    """Pure python Win32 stand-in. Functions are methods with the Win32 export names.
+        Simulator.calls counts the api calls & Simulator.sent counts the messages."""
+
+    def __init__(self) -> None:
+        self.classes = {} # Key - lower case class name, Value - window procedure
+        self.calls = Counter()
+        self.sent = Counter()
+        self.screenSize = (1920, 1080)
+        self._ownerThread = threading.get_ident()
+        self.reset()
+
+    # -region Public functions
+    def reset(self):
+        """Forget all windows, GDI objects, timers & queued messages. Registered classes are kept."""
+        self.windows = {} # Key - HWND, Value - SimWindow
+        self.gdiObjects = {} # Key - handle, Value - kind ("brush", "pen", "font", "bitmap", "menu"...)
+        self.dcs = {} # Key - HDC, Value - HWND (0 for memory DCs)
+        self.queue = deque() # Items are (hwnd, message, wParam, lParam)
+        self.timers = {} # Key - (hwnd, timer id), Value - [interval, due time, TIMERPROC address]
+        self._timerProcs = {} # Key - TIMERPROC address, Value - TIMERPROC
+        self.clock = 0 # Milli seconds. Only advance() changes it.
+        self.focus = 0
+        self.cursorPos = (0, 0)
+        self.calls.clear()
+        self.sent.clear()
+        self._fontHeights = {} # Key - font handle, Value - pixel height
+        self._selected = {} # Key - (HDC, kind), Value - handle
+        self._dcState = {} # Key - (HDC, name), Value - int (colors, modes)
+        self._bits = {} # Key - DIB section handle, Value - pixel buffer
+        self._deferred = {} # Key - HDWP, Value - list of SetWindowPos args
+        self._nextHandle = 0x10000
+
+    def window(self, hwnd) -> SimWindow:
+        """Returns the SimWindow of given handle or None"""
+        return self.windows.get(hwnd)
+
+    def send(self, hwnd, msg, wp = 0, lp = 0) -> int:
+        """Send a message to the window (through its subclass chain)"""
+        win = self.windows.get(hwnd)
+        return self._send(win, msg, wp, lp) if win else 0
+
+    def pump(self, limit = 0) -> int:
+        """Dispatch the queued messages (& pending paints) till the queue is empty or a WM_QUIT.
+            Returns the dispatched message count."""
+        count = 0
+        while not limit or count < limit:
+            item = self._nextMessage()
+            if item is None or item[1] == con.WM_QUIT: break
+            self._dispatch(*item)
+            count += 1
+        return count
+
+    def advance(self, ms: int):
+        """Move the simulated clock and post WM_TIMER for the due timers"""
+        self.clock += ms
+        for (hwnd, tid), timer in self.timers.items():
+            if timer[1] <= self.clock:
+                self.queue.append((hwnd, con.WM_TIMER, tid, timer[2]))
+                timer[1] = self.clock + timer[0]
+
+    def setCursorPos(self, x: int, y: int): self.cursorPos = (x, y)
+
+    def stats(self) -> dict:
+        """Returns the live window, GDI object & DC counts and the api call count"""
+        return {"windows": len(self.windows), "gdiObjects": dict(Counter(self.gdiObjects.values())),
+                "dcs": len(self.dcs), "queued": len(self.queue), "timers": len(self.timers),
+                "apiCalls": sum(self.calls.values()), "messages": sum(self.sent.values())}
+    # -endregion Public functions
+
+    # -region Private functions
+    def _newHandle(self, kind = None):
+        self._nextHandle += 4
+        if kind: self.gdiObjects[self._nextHandle] = kind
+        return self._nextHandle
+
+    def _send(self, win, msg, wp, lp):
+        self.sent[msg] += 1
+        if win.subclasses: return self._callSubclass(win, len(win.subclasses) - 1, msg, wp, lp)
+        return self._callBase(win, msg, wp, lp)
+
+    def _callSubclass(self, win, index, msg, wp, lp):
+        proc, scID, refData, _ = win.subclasses[index]
+        win.frames.append(index)
+        try:
+            return proc(win.hwnd, msg, wp, lp, scID, refData)
+        finally:
+            win.frames.pop()
+
+    def _callBase(self, win, msg, wp, lp):
+        # Common control messages are sharing the same numbers. So check the class first.
+        cls = win.className.lower()
+        proc = self.classes.get(cls)
+        if proc: return proc(win.hwnd, msg, wp, lp)
+        if cls in _itemClasses:
+            action = _getItemAction(msg)
+            if action: return self._itemProc(win, action, wp, lp)
+            if msg == con.CB_GETCOMBOBOXINFO: return self._comboInfo(win, lp)
+        elif cls == "syslistview32":
+            if msg == con.LVM_GETHEADER and win.children: return win.children[0].hwnd
+        elif cls == "sysdatetimepick32":
+            if msg == con.DTM_GETSYSTEMTIME:
+                self._dateInfo(lp)
+                return 0 # GDT_VALID
+        elif cls == "msctls_trackbar32":
+            if msg == con.TBM_GETCHANNELRECT or msg == con.TBM_GETTHUMBRECT:
+                return self._trackRect(win, msg, lp)
+        elif cls == "msctls_progress32":
+            if msg == con.PBM_SETPOS or msg == con.PBM_STEPIT:
+                win.dirty = True
+                self.UpdateWindow(win.hwnd) # Real control repaints at once.
+        elif cls == "sysmonthcal32":
+            if msg == con.MCM_GETCURSEL:
+                self._dateInfo(lp)
+                return 1
+        return self._defProc(win, msg, wp, lp)
+
+    def _defProc(self, win, msg, wp, lp):
+        match msg:
+            case con.WM_NCCREATE: return 1
+            case con.WM_SETTEXT:
+                win.text = ct.wstring_at(lp) if lp else ""
+                return 1
+            case con.WM_GETTEXT: return _writeStr(lp, win.text, wp)
+            case con.WM_GETTEXTLENGTH: return len(win.text)
+            case con.WM_SETFONT:
+                win.font = wp
+                if lp: win.dirty = True
+            case con.WM_GETFONT: return win.font
+            case con.WM_CLOSE: self.DestroyWindow(win.hwnd)
+            case con.WM_PAINT: win.dirty = False
+            case con.WM_ERASEBKGND: return 1
+            case con.WM_NCHITTEST: return 1 # HTCLIENT
+        return 0
+
+    def _itemProc(self, win, action, wp, lp):
+        items = win.items
+        match action:
+            case "add" | "insert":
+                text = ct.wstring_at(lp) if lp else ""
+                if action == "add" and win.style & (con.LBS_SORT if win.className.lower() == "listbox" else con.CBS_SORT):
+                    index = len(items)
+                    for i, item in enumerate(items):
+                        if item.lower() > text.lower():
+                            index = i
+                            break
+                else:
+                    index = len(items) if (action == "add" or wp < 0 or wp > len(items)) else wp
+                items.insert(index, text)
+                win.itemData.insert(index, 0)
+                return index
+            case "delete":
+                if not 0 <= wp < len(items): return -1
+                del items[wp]
+                del win.itemData[wp]
+                if win.curSel >= len(items): win.curSel = -1
+                return len(items)
+            case "reset":
+                items.clear()
+                win.itemData.clear()
+                win.curSel = -1
+            case "count": return len(items)
+            case "text": return _writeStr(lp, items[wp], len(items[wp]) + 1) if 0 <= wp < len(items) else -1
+            case "textLen": return len(items[wp]) if 0 <= wp < len(items) else -1
+            case "setSel":
+                win.curSel = wp if 0 <= wp < len(items) else -1
+                return win.curSel
+            case "getSel": return win.curSel
+            case "find" | "findExact":
+                text = (ct.wstring_at(lp) if lp else "").lower()
+                start = wp + 1 if 0 <= wp < len(items) else 0
+                for i in list(range(start, len(items))) + list(range(0, start)):
+                    item = items[i].lower()
+                    if item == text or (action == "find" and item.startswith(text)): return i
+                return -1
+            case "setData":
+                if not 0 <= wp < len(items): return -1
+                win.itemData[wp] = lp
+                return 1
+            case "getData": return win.itemData[wp] if 0 <= wp < len(items) else -1
+            case "initStorage": return len(items) + wp # Room for this many items.
+            case "setCount":
+                # Only the no data list boxes take this. They keep a count, we keep empty strings.
+                if not win.style & con.LBS_NODATA: return -1
+                win.items = [""] * wp
+                win.itemData = [0] * wp
+                win.curSel = -1
+        return 0
+
+    def _trackRect(self, win, msg, lp):
+        # Rects of a default trackbar. Like the real one, channel rect of a vertical trackbar is not rotated.
+        rc = _Rect.from_address(lp)
+        vert = win.style & con.TBS_VERT
+        length = win.height if vert else win.width
+        if msg == con.TBM_GETCHANNELRECT:
+            rc.left, rc.top, rc.right, rc.bottom = 8, 8, length - 8, 12
+        elif vert:
+            rc.left, rc.top, rc.right, rc.bottom = 2, 3, 22, 14
+        else:
+            rc.left, rc.top, rc.right, rc.bottom = 3, 2, 14, 22
+        return 0
+
+    def _comboInfo(self, win, lp):
+        import pyforms.src.apis as api # apis is ready when a message comes.
+        info = api.COMBOBOXINFO.from_address(lp)
+        info.hwndCombo = win.hwnd
+        for child in win.children:
+            if child.className == "Edit": info.hwndItem = child.hwnd
+            elif child.className == "ComboLBox": info.hwndList = child.hwnd
+        return 1
+
+    def _dateInfo(self, lp):
+        import pyforms.src.apis as api
+        st = api.SYSTEMTIME.from_address(lp)
+        now = datetime.datetime.now()
+        st.wYear, st.wMonth, st.wDay, st.wDayOfWeek = now.year, now.month, now.day, now.isoweekday() % 7
+        st.wHour, st.wMinute, st.wSecond, st.wMilliseconds = now.hour, now.minute, now.second, now.microsecond // 1000
+
+    def _nextMessage(self):
+        if self.queue: return self.queue.popleft()
+        for win in self.windows.values():
+            if win.dirty and win.visible:
+                win.dirty = False # Like BeginPaint, so a lazy paint handler won't loop forever.
+                return (win.hwnd, con.WM_PAINT, 0, 0)
+        return None
+
+    def _origin(self, hwnd):
+        # Screen point of client area's top left.
+        x = y = 0
+        win = self.windows.get(hwnd)
+        while win:
+            x += win.x
+            y += win.y
+            win = self.windows.get(win.parent)
+        return x, y
+
+    def _destroy(self, win):
+        # Parent gets WM_DESTROY first, but WM_NCDESTROY comes after the children are gone.
+        self._send(win, con.WM_DESTROY, 0, 0)
+        for child in list(win.children): self._destroy(child)
+        self._send(win, con.WM_NCDESTROY, 0, 0)
+        win.subclasses.clear()
+        parent = self.windows.get(win.parent)
+        if parent and win in parent.children: parent.children.remove(win)
+        self.windows.pop(win.hwnd, None)
+        for key in [key for key in self.timers if key[0] == win.hwnd]: del self.timers[key]
+        if self.focus == win.hwnd: self.focus = 0
+
+    def _dispatch(self, hwnd, msg, wp, lp):
+        # Like DispatchMessage, WM_TIMER with a TIMERPROC goes to that function.
+        if msg == con.WM_TIMER and lp in self._timerProcs:
+            return self._timerProcs[lp](hwnd, msg, wp, self.clock)
+        return self.send(hwnd, msg, wp, lp)
+
+    def _setPos(self, win, x, y, width, height, move, size):
+        moved = move and (x, y) != (win.x, win.y)
+        sized = size and (width, height) != (win.width, win.height)
+        if moved: win.x, win.y = x, y
+        if sized: win.width, win.height = width, height
+        if moved: self._send(win, con.WM_MOVE, 0, _makeLong(x, y))
+        if sized:
+            win.dirty = win.erase = True
+            self._send(win, con.WM_SIZE, 0, _makeLong(width, height))
+        return 1
+    # -endregion Private functions
+
+    # -region USER32 Functions
+    def RegisterClassExW(self, pwc):
+        wc = _deref(pwc)
+        self.classes[_toStr(wc.lpszClassName).lower()] = wc.lpfnWndProc
+        return len(self.classes) + 0xC000
+
+    def GetClassInfoExW(self, hinst, name, pwc): return int(_toStr(name).lower() in self.classes)
+
+    def CreateWindowExW(self, exStyle, className, text, style, x, y, width, height, parent, menu, hinst, param):
+        parent = _toInt(parent)
+        if parent and parent not in self.windows: return 0
+        hwnd = self._newHandle()
+        win = SimWindow(hwnd, _toStr(className), _toStr(text), _toInt(style), _toInt(exStyle),
+                        _toInt(x), _toInt(y), _toInt(width), _toInt(height), parent, _toInt(menu))
+        self.windows[hwnd] = win
+        if parent: self.windows[parent].children.append(win)
+        if not self._send(win, con.WM_NCCREATE, 0, 0) or self._send(win, con.WM_CREATE, 0, 0) == -1:
+            self._destroy(win)
+            return 0
+
+        # Common controls which make their own child windows.
+        cls = win.className.lower()
+        if cls == "combobox":
+            if win.style & 3 != 3: self.CreateWindowExW(0, "Edit", win.text, con.WS_VISIBLE, 0, 0, width, height, hwnd, 1001, 0, None)
+            self.CreateWindowExW(0, "ComboLBox", "", 0, 0, height, width, 100, hwnd, 1000, 0, None)
+        elif cls == "syslistview32":
+            self.CreateWindowExW(0, "SysHeader32", "", con.WS_VISIBLE, 0, 0, width, 25, hwnd, 0, 0, None)
+        return hwnd
+
+    def DestroyWindow(self, hwnd):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        self._destroy(win)
+        return 1
+
+    def DefWindowProcW(self, hwnd, msg, wp, lp):
+        win = self.windows.get(_toInt(hwnd))
+        return self._defProc(win, msg, _toInt(wp), _toInt(lp)) if win else 0
+
+    def SendMessageW(self, hwnd, msg, wp, lp):
+        win = self.windows.get(_toInt(hwnd))
+        return self._send(win, msg, _toInt(wp), _toInt(lp)) if win else 0
+
+    def SendNotifyMessageW(self, hwnd, msg, wp, lp):
+        # Other threads can't call a wndproc directly. Their message goes to the queue.
+        if threading.get_ident() == self._ownerThread: return self.SendMessageW(hwnd, msg, wp, lp) or 1
+        return self.PostMessageW(hwnd, msg, wp, lp)
+
+    def PostMessageW(self, hwnd, msg, wp, lp):
+        hwnd = _toInt(hwnd)
+        if hwnd and hwnd not in self.windows: return 0 # Like the real one, for a destroyed window.
+        self.queue.append((hwnd, msg, _toInt(wp), _toInt(lp)))
+        return 1
+
+    def PostQuitMessage(self, code):
+        self.queue.append((0, con.WM_QUIT, _toInt(code), 0))
+
+    def GetMessageW(self, pmsg, hwnd, fmin, fmax):
+        # Nothing left to do means the end of the loop. A real one would wait here.
+        item = self._nextMessage()
+        if item is None: return 0
+        msg = _deref(pmsg)
+        msg.hwnd, msg.message, msg.wParam, msg.lParam = item
+        return 0 if item[1] == con.WM_QUIT else 1
+
+    def PeekMessageW(self, pmsg, hwnd, fmin, fmax, remove):
+        if not self.queue: return 0
+        item = self.queue.popleft() if remove & 1 else self.queue[0]
+        msg = _deref(pmsg)
+        msg.hwnd, msg.message, msg.wParam, msg.lParam = item
+        return 1
+
+    def TranslateMessage(self, pmsg): return 0
+
+    def DispatchMessageW(self, pmsg):
+        msg = _deref(pmsg)
+        return self._dispatch(_toInt(msg.hwnd), msg.message, _toInt(msg.wParam), _toInt(msg.lParam))
+
+    def ShowWindow(self, hwnd, cmd):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        wasVisible = win.visible
+        win.visible = cmd != con.SW_HIDE
+        if win.visible != wasVisible:
+            if win.visible: win.dirty = win.erase = True
+            self._send(win, con.WM_SHOWWINDOW, int(win.visible), 0)
+        return int(wasVisible)
+
+    def CloseWindow(self, hwnd): return int(_toInt(hwnd) in self.windows)
+
+    def UpdateWindow(self, hwnd):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        if win.dirty and win.visible: self._send(win, con.WM_PAINT, 0, 0)
+        return 1
+
+    def InvalidateRect(self, hwnd, prc, erase):
+        hwnd = _toInt(hwnd)
+        for win in ([self.windows[hwnd]] if hwnd in self.windows else self.windows.values()):
+            win.dirty = True
+            if erase: win.erase = True
+        return 1
+
+    def RedrawWindow(self, hwnd, prc, hrgn, flags): return self.InvalidateRect(hwnd, prc, flags & 4) # RDW_ERASE
+
+    def GetUpdateRect(self, hwnd, prc, erase):
+        win = self.windows.get(_toInt(hwnd))
+        return int(bool(win and win.dirty))
+
+    def BeginPaint(self, hwnd, pps):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        hdc = self.GetDC(hwnd)
+        ps = _deref(pps)
+        ps.hdc = hdc
+        ps.rcPaint.left, ps.rcPaint.top, ps.rcPaint.right, ps.rcPaint.bottom = 0, 0, win.width, win.height
+        ps.fErase = int(win.erase)
+        if win.erase:
+            win.erase = False
+            ps.fErase = int(not self._send(win, con.WM_ERASEBKGND, hdc, 0))
+        win.dirty = False
+        return hdc
+
+    def EndPaint(self, hwnd, pps):
+        self.dcs.pop(_deref(pps).hdc, None)
+        return 1
+
+    def GetDC(self, hwnd):
+        hdc = self._newHandle()
+        self.dcs[hdc] = _toInt(hwnd)
+        return hdc
+
+    def GetDCEx(self, hwnd, hrgn, flags): return self.GetDC(hwnd)
+
+    def ReleaseDC(self, hwnd, hdc): return int(self.dcs.pop(_toInt(hdc), None) is not None)
+
+    def WindowFromDC(self, hdc): return self.dcs.get(_toInt(hdc), 0)
+
+    def SetWindowTextW(self, hwnd, text):
+        win = self.windows.get(_toInt(hwnd))
+        return self._send(win, con.WM_SETTEXT, 0, _toInt(_toStr(text))) if win else 0
+
+    def GetWindowTextLengthW(self, hwnd):
+        win = self.windows.get(_toInt(hwnd))
+        return self._send(win, con.WM_GETTEXTLENGTH, 0, 0) if win else 0
+
+    def GetWindowTextW(self, hwnd, buff, maxCount):
+        win = self.windows.get(_toInt(hwnd))
+        return self._send(win, con.WM_GETTEXT, _toInt(maxCount), _toInt(buff)) if win else 0
+
+    def MoveWindow(self, hwnd, x, y, width, height, repaint):
+        win = self.windows.get(_toInt(hwnd))
+        return self._setPos(win, x, y, width, height, True, True) if win else 0
+
+    def SetWindowPos(self, hwnd, after, x, y, width, height, flags):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        if flags & con.SWP_SHOWWINDOW: self.ShowWindow(hwnd, con.SW_SHOW)
+        if flags & con.SWP_HIDEWINDOW: self.ShowWindow(hwnd, con.SW_HIDE)
+        return self._setPos(win, x, y, width, height, not flags & con.SWP_NOMOVE, not flags & con.SWP_NOSIZE)
+
+    def BeginDeferWindowPos(self, count):
+        hdwp = self._newHandle()
+        self._deferred[hdwp] = []
+        return hdwp
+
+    def DeferWindowPos(self, hdwp, hwnd, after, x, y, width, height, flags):
+        items = self._deferred.get(_toInt(hdwp))
+        if items is None or _toInt(hwnd) not in self.windows: return 0
+        items.append((hwnd, after, x, y, width, height, flags))
+        return hdwp
+
+    def EndDeferWindowPos(self, hdwp):
+        items = self._deferred.pop(_toInt(hdwp), None)
+        if items is None: return 0
+        for item in items: self.SetWindowPos(*item)
+        return 1
+
+    def GetClientRect(self, hwnd, prc):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        rc = _deref(prc, _Rect)
+        rc.left, rc.top, rc.right, rc.bottom = 0, 0, win.width, win.height
+        return 1
+
+    def GetWindowRect(self, hwnd, prc):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        x, y = self._origin(win.hwnd)
+        rc = _deref(prc, _Rect)
+        rc.left, rc.top, rc.right, rc.bottom = x, y, x + win.width, y + win.height
+        return 1
+
+    def MapWindowPoints(self, hwndFrom, hwndTo, ppts, count):
+        fx, fy = self._origin(_toInt(hwndFrom))
+        tx, ty = self._origin(_toInt(hwndTo))
+        dx, dy = fx - tx, fy - ty
+        pts = (_Point * count).from_address(_toInt(ppts))
+        for pt in pts:
+            pt.x += dx
+            pt.y += dy
+        return _makeLong(dx, dy)
+
+    def ScreenToClient(self, hwnd, ppt):
+        x, y = self._origin(_toInt(hwnd))
+        pt = _deref(ppt, _Point)
+        pt.x -= x
+        pt.y -= y
+        return 1
+
+    def ClientToScreen(self, hwnd, ppt):
+        x, y = self._origin(_toInt(hwnd))
+        pt = _deref(ppt, _Point)
+        pt.x += x
+        pt.y += y
+        return 1
+
+    def GetCursorPos(self, ppt):
+        pt = _deref(ppt, _Point)
+        pt.x, pt.y = self.cursorPos
+        return 1
+
+    def GetMessagePos(self): return _makeLong(*self.cursorPos)
+
+    def PtInRect(self, prc, pt):
+        rc = _deref(prc, _Rect)
+        return int(rc.left <= pt.x < rc.right and rc.top <= pt.y < rc.bottom)
+
+    def SetRect(self, prc, left, top, right, bottom):
+        rc = _deref(prc, _Rect)
+        rc.left, rc.top, rc.right, rc.bottom = left, top, right, bottom
+        return 1
+
+    def InflateRect(self, prc, dx, dy):
+        rc = _deref(prc, _Rect)
+        rc.left, rc.top, rc.right, rc.bottom = rc.left - dx, rc.top - dy, rc.right + dx, rc.bottom + dy
+        return 1
+
+    def GetSystemMetrics(self, index):
+        if index in (0, 1): return self.screenSize[index]
+        return 0
+
+    def SetFocus(self, hwnd):
+        hwnd = _toInt(hwnd)
+        old = self.focus
+        if old == hwnd or hwnd not in self.windows: return old
+        if old in self.windows: self._send(self.windows[old], con.WM_KILLFOCUS, hwnd, 0)
+        self.focus = hwnd
+        self._send(self.windows[hwnd], con.WM_SETFOCUS, old, 0)
+        return old
+
+    def SetForegroundWindow(self, hwnd): return 1
+
+    def EnableWindow(self, hwnd, enable):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        wasDisabled = not win.enabled
+        win.enabled = bool(enable)
+        if win.enabled == wasDisabled: self._send(win, con.WM_ENABLE, int(win.enabled), 0)
+        return int(wasDisabled)
+
+    def GetWindowLongPtrW(self, hwnd, index):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        match index:
+            case con.GWL_STYLE: return win.style
+            case con.GWL_EXSTYLE: return win.exStyle
+            case con.GWL_ID: return win.ctlID
+        return win.longs.get(index, 0)
+
+    def SetWindowLongPtrW(self, hwnd, index, value):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        old = self.GetWindowLongPtrW(hwnd, index)
+        value = _toInt(value)
+        match index:
+            case con.GWL_STYLE: win.style = value
+            case con.GWL_EXSTYLE: win.exStyle = value
+            case con.GWL_ID: win.ctlID = value
+            case _: win.longs[index] = value
+        return old
+
+    GetWindowLongW = GetWindowLongPtrW
+    SetWindowLongW = SetWindowLongPtrW
+
+    def TrackMouseEvent(self, ptme): return 1
+
+    def SetTimer(self, hwnd, tid, interval, proc):
+        hwnd, tid, procAddr = _toInt(hwnd), _toInt(tid), _toInt(proc)
+        if not hwnd and (hwnd, tid) not in self.timers: tid = self._newHandle() # Thread timers get a new id.
+        if procAddr: self._timerProcs[procAddr] = proc
+        self.timers[(hwnd, tid)] = [interval, self.clock + interval, procAddr]
+        return tid
+
+    def KillTimer(self, hwnd, tid): return int(self.timers.pop((_toInt(hwnd), _toInt(tid)), None) is not None)
+
+    def LoadCursorW(self, hinst, name): return _stockBase + 0x100
+    def LoadImageW(self, hinst, name, kind, cx, cy, flags): return _stockBase + 0x200
+
+    def DrawTextW(self, hdc, text, count, prc, flags):
+        text = _toStr(text)
+        if count >= 0: text = text[:count]
+        width, height = self._textExtent(hdc, text)
+        if flags & con.DT_CALCRECT:
+            rc = _deref(prc, _Rect)
+            rc.right = rc.left + width
+            rc.bottom = rc.top + height
+        return height
+
+    def FillRect(self, hdc, prc, hbr): return 1
+    def FrameRect(self, hdc, prc, hbr): return 1
+    def DrawEdge(self, hdc, prc, edge, flags): return 1
+    def DrawFocusRect(self, hdc, prc): return 1
+    def GetSysColor(self, index): return 0x00D77800 if index == con.COLOR_HIGHLIGHT else 0x00FFFFFF
+    def DrawFrameControl(self, hdc, prc, kind, state): return 1
+    def HideCaret(self, hwnd): return 1
+    def MessageBoxW(self, hwnd, text, caption, flags): return 1 # IDOK
+
+    def CreateMenu(self): return self._newHandle("menu")
+    def CreatePopupMenu(self): return self._newHandle("menu")
+    def DestroyMenu(self, hmenu): return int(self.gdiObjects.pop(_toInt(hmenu), None) is not None)
+    def AppendMenuW(self, hmenu, flags, itemID, item): return 1
+    def InsertMenuW(self, hmenu, pos, flags, itemID, item): return 1
+    def InsertMenuItemW(self, hmenu, item, byPos, pmii): return 1
+    def SetMenuItemInfoW(self, hmenu, item, byPos, pmii): return 1
+    def SetMenu(self, hwnd, hmenu): return 1
+    def SetMenuInfo(self, hmenu, pmi): return 1
+    def EnableMenuItem(self, hmenu, item, flags): return 0
+    def DrawMenuBar(self, hwnd): return 1
+    # -endregion USER32 Functions
+
+    # -region GDI32 Functions
+    def _textExtent(self, hdc, text):
+        height = self._fontHeights.get(self._selected.get((_toInt(hdc), "font")), 16)
+        return len(text) * max(1, (height * 7 + 8) // 16), height
+
+    def CreateSolidBrush(self, cref): return self._newHandle("brush")
+    def CreatePatternBrush(self, hbmp): return self._newHandle("brush")
+    def CreatePen(self, style, width, cref): return self._newHandle("pen")
+    def CreatePenIndirect(self, plp): return self._newHandle("pen")
+    def CreateCompatibleBitmap(self, hdc, width, height): return self._newHandle("bitmap")
+
+    def CreateFontIndirectW(self, plf):
+        hfont = self._newHandle("font")
+        self._fontHeights[hfont] = abs(_deref(plf).lfHeight) or 16
+        return hfont
+
+    def CreateDIBSection(self, hdc, pbmi, usage, ppBits, hsection, offset):
+        bmi = _deref(pbmi)
+        size = abs(bmi.biWidth * bmi.biHeight) * max(1, bmi.biBitCount // 8)
+        hbmp = self._newHandle("bitmap")
+        self._bits[hbmp] = buff = ct.create_string_buffer(size)
+        bits = _deref(ppBits)
+        if bits is not None: bits.value = ct.addressof(buff)
+        return hbmp
+
+    def DeleteObject(self, hobj):
+        hobj = _toInt(hobj)
+        if hobj >= _stockBase: return 1
+        self._bits.pop(hobj, None)
+        self._fontHeights.pop(hobj, None)
+        return int(self.gdiObjects.pop(hobj, None) is not None)
+
+    def GetStockObject(self, index): return _stockBase + index
+
+    def CreateCompatibleDC(self, hdc):
+        hdc = self._newHandle()
+        self.dcs[hdc] = 0
+        return hdc
+
+    def DeleteDC(self, hdc): return int(self.dcs.pop(_toInt(hdc), None) is not None)
+
+    def SelectObject(self, hdc, hobj):
+        hobj = _toInt(hobj)
+        kind = self.gdiObjects.get(hobj)
+        if kind not in _gdiKinds: return _stockBase
+        key = (_toInt(hdc), kind)
+        old = self._selected.get(key, _stockBase)
+        self._selected[key] = hobj
+        return old
+
+    def GetCurrentObject(self, hdc, kind):
+        names = {1: "pen", 2: "brush", 6: "font", 7: "bitmap"} # OBJ_XXX values
+        return self._selected.get((_toInt(hdc), names.get(kind)), _stockBase)
+
+    def _swapState(self, hdc, name, value, default):
+        key = (_toInt(hdc), name)
+        old = self._dcState.get(key, default)
+        self._dcState[key] = _toInt(value)
+        return old
+
+    def SetTextColor(self, hdc, cref): return self._swapState(hdc, "textColor", cref, 0)
+    def SetBkColor(self, hdc, cref): return self._swapState(hdc, "bkColor", cref, 0xFFFFFF)
+    def SetDCBrushColor(self, hdc, cref): return self._swapState(hdc, "brushColor", cref, 0xFFFFFF)
+    def SetBkMode(self, hdc, mode): return self._swapState(hdc, "bkMode", mode, 2)
+    def SetTextAlign(self, hdc, align): return self._swapState(hdc, "textAlign", align, 0)
+    def GetTextAlign(self, hdc): return self._dcState.get((_toInt(hdc), "textAlign"), 0)
+
+    def GetDeviceCaps(self, hdc, index): return 96 if index in (88, 90) else 0 # LOGPIXELSX & Y
+
+    def GetTextExtentPoint32W(self, hdc, text, count, psize):
+        size = _deref(psize)
+        size.cx, size.cy = self._textExtent(hdc, _toStr(text)[:count])
+        return 1
+
+    def TextOutW(self, hdc, x, y, text, count): return 1
+    def Rectangle(self, hdc, left, top, right, bottom): return 1
+    def RoundRect(self, hdc, left, top, right, bottom, width, height): return 1
+    def MoveToEx(self, hdc, x, y, ppt): return 1
+    def LineTo(self, hdc, x, y): return 1
+    def PolyPolyline(self, hdc, apt, asz, csz): return 1
+    def FillPath(self, hdc): return 1
+    # -endregion GDI32 Functions
+
+    # -region Other dll functions
+    def GetModuleHandleW(self, name): return 0x400000
+    def MulDiv(self, number, numerator, denominator):
+        return int(round(number * numerator / denominator)) if denominator else -1
+    def GetLastError(self): return 0
+
+    def InitCommonControlsEx(self, picc): return 1
+
+    def SetWindowSubclass(self, hwnd, proc, scID, refData):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        address, scID, refData = _toInt(proc), _toInt(scID), _toInt(refData)
+        for entry in win.subclasses:
+            if entry[3] == address and entry[1] == scID:
+                entry[2] = refData
+                return 1
+        win.subclasses.append([proc, scID, refData, address])
+        return 1
+
+    def RemoveWindowSubclass(self, hwnd, proc, scID):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        address, scID = _toInt(proc), _toInt(scID)
+        for i, entry in enumerate(win.subclasses):
+            if entry[3] == address and entry[1] == scID:
+                del win.subclasses[i]
+                return 1
+        return 0
+
+    def DefSubclassProc(self, hwnd, msg, wp, lp):
+        win = self.windows.get(_toInt(hwnd))
+        if not win: return 0
+        wp, lp = _toInt(wp), _toInt(lp)
+        index = min(win.frames[-1], len(win.subclasses)) - 1 if win.frames else -1
+        if index >= 0: return self._callSubclass(win, index, msg, wp, lp)
+        return self._callBase(win, msg, wp, lp)
+
+    def SetWindowTheme(self, hwnd, appName, idList): return 0
+    def SetWindowThemeAttribute(self, hwnd, kind, attrib, size): return 0
+    def OpenThemeData(self, hwnd, classList): return 0
+    def CloseThemeData(self, htheme): return 0
+    def GetThemeColor(self, htheme, part, state, prop, pcref): return 1 # E_FAIL
+    # -endregion Other dll functions
+#-----------------End of Simulator Class----------------------------
+
+
+class SimFunction:
+    """Takes the place of a dll function. argtypes & restype are accepted but not used."""
+    __slots__ = ("name", "argtypes", "restype", "_impl", "_calls")
+    def __init__(self, name, impl, calls) -> None:
+        self.name = name
+        self.argtypes = None
+        self.restype = None
+        self._impl = impl
+        self._calls = calls
+
+    def __call__(self, *args):
+        self._calls[self.name] += 1
+        return self._impl(*args) if self._impl else 0
+
+
+class SimDll:
+    """A dll of the simulator. Functions which are not simulated will return 0."""
+    def __init__(self, sim: Simulator) -> None:
+        self._sim = sim
+
+    def __getattr__(self, name):
+        if name.startswith("__"): raise AttributeError(name)
+        func = SimFunction(name, getattr(self._sim, name, None), self._sim.calls)
+        setattr(self, name, func)
+        return func
+
+
+class SimWindll:
+    """Same as ctypes.windll, but every dll is coming from the simulator"""
+    def __init__(self, sim: Simulator) -> None:
+        self._sim = sim
+
+    def __getattr__(self, name):
+        if name.startswith("__"): raise AttributeError(name)
+        dll = SimDll(self._sim)
+        setattr(self, name, dll)
+        return dll
+
+
+sim = Simulator()
+windll = SimWindll(sim)
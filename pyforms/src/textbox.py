@@ -1,6 +1,6 @@
 # textbox module - Created on 22-Nov-2022 00:54:20
 
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType, TextCase, TextType, TextAlignment
 from pyforms.src.apis import SUBCLASSPROC
@@ -11,7 +11,6 @@ from pyforms.src.events import EventArgs
 from ctypes import create_unicode_buffer, addressof
 # from . import winmsgs
 
-tbDict = {}
 tbStyle = con.WS_CHILD | con.WS_VISIBLE | con.ES_LEFT | con.WS_TABSTOP | con.ES_AUTOHSCROLL
 tbExStyle = con.WS_EX_LEFT | con.WS_EX_LTRREADING | con.WS_EX_CLIENTEDGE
 
@@ -19,7 +18,7 @@ tbExStyle = con.WS_EX_LEFT | con.WS_EX_LTRREADING | con.WS_EX_CLIENTEDGE
 class TextBox(Control):
 
     _count = 1
-    __slots__ = ( "_multiLine", "_hideSel", "_readOnly", "_textCase", "_textType", "_textAlign", "_cueBanner", "onTextChanged")
+    __slots__ = ( "_multiLine", "_hideSel", "_readOnly", "_textCase", "_textType", "_textAlign", "_cueBanner", "_autoComplete", "onTextChanged")
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 120, height: int = 23, txt="", auto = False, multi=False) -> None:
         super().__init__()
@@ -45,6 +44,7 @@ class TextBox(Control):
         self._textAlign = TextAlignment.LEFT
         self._text = txt
         self._cueBanner = ""
+        self._autoComplete = None # An AutoComplete sets this.
         self.onTextChanged = None
         self._hwnd = None
         parent._controls.append(self)
@@ -57,7 +57,7 @@ class TextBox(Control):
         self._setStyles()
         self._createControl()
         if self._hwnd:
-            tbDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(tbWndProc)
             self._setFontInternal()
             if len(self._cueBanner):
@@ -95,7 +95,7 @@ class TextBox(Control):
         elif self._textAlign == TextAlignment.RIGHT:
             self._style |= con.ES_RIGHT
 
-        self._bkgBrush = self._bgColor.createHBrush()
+        self._resetBkgBrush()
 
     def addLine(self, linetext):
         if self._isCreated:
@@ -163,38 +163,40 @@ class TextBox(Control):
 @SUBCLASSPROC
 def tbWndProc(hw, msg, wp, lp, scID, refData):
     # winmsgs.log_msg(msg)
-    tb = tbDict[hw]
-    match msg:
-        case con.WM_DESTROY:
-            api.DeleteObject(tb._bkgBrush)
-            api.RemoveWindowSubclass(hw, tbWndProc, scID)
-            del tbDict[hw]
-
-        # case con.WM_SETFOCUS: tb._gotFocusHandler()
-        # case con.WM_KILLFOCUS: tb._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: tb._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: tb._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: tb._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: tb._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: tb._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: tb._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: tb._mouseLeaveHandler()
-
-        case MyMessages.CTL_COMMAND:
-            ncode = api.HIWORD(wp)
-            # print(f"{ncode = }")
-            if ncode == con.EN_CHANGE:
-                if tb.onTextChanged: tb.onTextChanged(tb, EventArgs())
-
-        case MyMessages.LABEL_COLOR:
-            return tb._bkgBrush
-
-        case MyMessages.EDIT_COLOR:
-            if tb._drawFlag:
-                if tb._drawFlag & 1: api.SetTextColor(wp, tb._fgColor.ref)
-                if tb._drawFlag & 2: api.SetBkColor(wp, tb._bgColor.ref)
-
-            return tb._bkgBrush
+    tb = HwndRegistry.get(hw)
+    handler = tb._msgMap.get(msg)
+    if handler:
+        ret = handler(tb, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        tb._releaseBkgBrush()
+        if tb._autoComplete: tb._autoComplete.cancel()
+        api.RemoveWindowSubclass(hw, tbWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
+
+def _tbCommandMsg(tb, hw, msg, wp, lp):
+    ncode = api.HIWORD(wp)
+    # print(f"{ncode = }")
+    if ncode == con.EN_CHANGE:
+        if tb._autoComplete: tb._autoComplete._textChanged()
+        if tb.onTextChanged: tb.onTextChanged(tb, EventArgs())
+
+def _tbLabelColorMsg(tb, hw, msg, wp, lp): return tb._bkgBrush
+
+def _tbEditColorMsg(tb, hw, msg, wp, lp):
+    if tb._drawFlag:
+        if tb._drawFlag & 1: api.SetTextColor(wp, tb._fgColor.ref)
+        if tb._drawFlag & 2: api.SetBkColor(wp, tb._bgColor.ref)
+
+    return tb._bkgBrush
+
+# Focus messages are not handled here.
+TextBox._msgTable = makeMsgMap({
+    MyMessages.CTL_COMMAND: _tbCommandMsg,
+    MyMessages.LABEL_COLOR: _tbLabelColorMsg,
+    MyMessages.EDIT_COLOR: _tbEditColorMsg,
+}, exclude = (con.WM_SETFOCUS, con.WM_KILLFOCUS))
+
@@ -0,0 +1,184 @@
+# Created on 17-Oct-2026 03:40:00
+# timers module - Timers of the forms.
+# All the timers share one thread timer. It's set to the next due time only.
+# Periods below USER_TIMER_MINIMUM (10 ms) use a high resolution waitable timer,
+# which the message loop waits on. If a timer is behind, missed ticks are dropped.
+
+import heapq, itertools, math, time, traceback
+from ctypes import byref, c_longlong
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+
+
+class TimerWheel:
+    """Schedules all the Timers over one OS timer. Due times are kept in a heap.
+        Use 'stats' to see the tick, coalesce & drift numbers."""
+    _heap = [] # Items are (due time, sequence, timer, generation)
+    _seq = itertools.count()
+    _osTimerID = 0
+    _active = 0 # Running timer count. OS timer is killed when it's zero.
+    _hiResHandle = None # Created on first use. 0 if system doesn't support it.
+    hiResArmed = False # Message loop waits on the waitable timer when this is True.
+    _counters = {"ticks": 0, "coalesced": 0, "osTimerSets": 0, "hiResSets": 0}
+    _driftSum = 0.0
+    _driftMax = 0.0
+
+    @classmethod
+    def add(cls, timer):
+        if not timer._isEnabled: cls._active += 1
+        heapq.heappush(cls._heap, (timer._due, next(cls._seq), timer, timer._gen))
+        if cls._heap[0][2] is timer: cls._arm()
+
+    @classmethod
+    def remove(cls, timer):
+        # Heap entry stays there till it comes to the top. We only need to stop the OS timer.
+        cls._active -= 1
+        if cls._active == 0: cls._arm()
+
+    @classmethod
+    def fireDue(cls):
+        """Run the handlers of the due timers and set the OS timer for the next one."""
+        heap = cls._heap
+        now = time.perf_counter()
+        while heap and heap[0][0] <= now:
+            due, _, timer, gen = heapq.heappop(heap)
+            if gen != timer._gen: continue # Stopped or restarted after this was pushed.
+            try:
+                timer._tick(now - due)
+            except Exception:
+                traceback.print_exc() # An error in the handler should not kill the timer or the message loop.
+            now = time.perf_counter()
+            if timer._isEnabled and gen == timer._gen: cls._reschedule(timer, due, now)
+        cls._arm()
+
+    @classmethod
+    def _reschedule(cls, timer, due, now):
+        period = timer._period
+        nextDue = due + period
+        if nextDue <= now:
+            # We are behind. Skip the missed ticks, instead of firing them back to back.
+            missed = math.floor((now - nextDue) / period) + 1
+            timer._missed += missed
+            cls._counters["coalesced"] += missed
+            nextDue += missed * period
+        timer._due = nextDue
+        heapq.heappush(cls._heap, (nextDue, next(cls._seq), timer, timer._gen))
+
+    @classmethod
+    def waitHiRes(cls):
+        # Wait for the high resolution timer or a new message.
+        handle = api.HANDLE(cls._hiResHandle)
+        api.MsgWaitForMultipleObjectsEx(1, byref(handle), con.INFINITE, con.QS_ALLINPUT, con.MWMO_INPUTAVAILABLE)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Returns the active timer count, tick & coalesced tick counts, OS timer
+            settings and the average & max drift in milli seconds."""
+        ticks = cls._counters["ticks"]
+        return {"timers": cls._active, **cls._counters,
+                "avgDriftMs": round(cls._driftSum * 1000 / ticks, 3) if ticks else 0.0,
+                "maxDriftMs": round(cls._driftMax * 1000, 3)}
+
+    @classmethod
+    def _record(cls, drift):
+        cls._counters["ticks"] += 1
+        cls._driftSum += drift
+        if drift > cls._driftMax: cls._driftMax = drift
+
+    @classmethod
+    def _arm(cls):
+        heap = cls._heap
+        while heap and heap[0][3] != heap[0][2]._gen: heapq.heappop(heap) # Drop the stale ones.
+        if not heap:
+            if cls._osTimerID:
+                api.KillTimer(None, cls._osTimerID)
+                cls._osTimerID = 0
+            cls._cancelHiRes()
+            return
+
+        delay = heap[0][0] - time.perf_counter()
+        ms = max(math.ceil(delay * 1000), con.USER_TIMER_MINIMUM)
+        if delay * 1000 < con.USER_TIMER_MINIMUM and cls._setHiRes(delay):
+            # OS timer is still set. Modal loops (menus, window sizing) don't wait on our handle.
+            ms = con.USER_TIMER_MINIMUM
+        else:
+            cls._cancelHiRes()
+        cls._osTimerID = api.SetTimer(None, cls._osTimerID, ms, _timerProc)
+        cls._counters["osTimerSets"] += 1
+
+    @classmethod
+    def _setHiRes(cls, delay) -> bool:
+        if cls._hiResHandle is None:
+            cls._hiResHandle = api.CreateWaitableTimerEx(None, None, con.CREATE_WAITABLE_TIMER_HIGH_RESOLUTION,
+                                                         con.TIMER_ALL_ACCESS) or 0
+        if not cls._hiResHandle: return False
+        dueTime = c_longlong(-max(int(delay * 10_000_000), 1)) # Relative time in 100 ns units.
+        cls.hiResArmed = bool(api.SetWaitableTimer(cls._hiResHandle, byref(dueTime), 0, None, None, False))
+        if cls.hiResArmed: cls._counters["hiResSets"] += 1
+        return cls.hiResArmed
+
+    @classmethod
+    def _cancelHiRes(cls):
+        if cls.hiResArmed:
+            api.CancelWaitableTimer(cls._hiResHandle)
+            cls.hiResArmed = False
+#-----------------End of TimerWheel Class----------------------------
+
+
+@api.TIMERPROC
+def _timerProc(hwnd, msg, timerID, tickCount):
+    TimerWheel.fireDue()
+    return 0
+
+
+class Timer:
+    """A timer of a form. Create it with Form.addTimer.
+        'interval' is in milli seconds. Values below 10 ms use the high resolution timer."""
+    __slots__ = ("interval", "onTick", "_isEnabled", "_idNum", "_parent", "_due", "_period", "_gen",
+                 "_ticks", "_missed", "_driftSum", "_driftMax")
+    _count = itertools.count(1)
+
+    def __init__(self, parent, tickInterval = 100, tickHandler = None) -> None:
+        self.interval = tickInterval
+        self.onTick = tickHandler
+        self._isEnabled = False
+        self._idNum = next(Timer._count)
+        self._parent = parent
+        self._due = 0.0
+        self._period = 0.0
+        self._gen = 0 # Changes on every start & stop. So old heap entries are ignored.
+        self._ticks = 0
+        self._missed = 0
+        self._driftSum = 0.0
+        self._driftMax = 0.0
+
+    def start(self):
+        """Start the timer. First tick comes after one interval."""
+        self._gen += 1
+        self._period = max(self.interval, 1) / 1000
+        self._due = time.perf_counter() + self._period
+        TimerWheel.add(self)
+        self._isEnabled = True
+
+    def stop(self):
+        """Stop the timer"""
+        self._gen += 1
+        if self._isEnabled:
+            self._isEnabled = False
+            TimerWheel.remove(self)
+
+    def stats(self) -> dict:
+        """Returns the tick count, skipped (coalesced) tick count and the average & max drift in milli seconds."""
+        return {"ticks": self._ticks, "coalesced": self._missed,
+                "avgDriftMs": round(self._driftSum * 1000 / self._ticks, 3) if self._ticks else 0.0,
+                "maxDriftMs": round(self._driftMax * 1000, 3)}
+
+    def _tick(self, drift):
+        self._ticks += 1
+        self._driftSum += drift
+        if drift > self._driftMax: self._driftMax = drift
+        TimerWheel._record(drift)
+        if self.onTick: self.onTick(self._parent, self._parent._dummyEA)
+
+    def _destructor(self):
+        if self._isEnabled: self.stop()
@@ -1,18 +1,19 @@
 # trackbar module - Created on 21-Dec-2022 01:22:20
 
 from ctypes import byref, addressof, cast
+from ctypes.wintypes import DWORD
+from array import array
 # import ctypes as ctp
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType, TickPosition, ChannelStyle, TrackChange
 from pyforms.src.events import EventArgs
-from pyforms.src.apis import LRESULT, RECT, LPNMCUSTOMDRAW, SUBCLASSPROC
+from pyforms.src.apis import LRESULT, RECT, POINT, LPNMCUSTOMDRAW, SUBCLASSPROC
 import pyforms.src.apis as api
-from pyforms.src.colors import Color
+from pyforms.src.colors import Color, GdiPool
 from pyforms.src.winmsgs import log_msg
 
-trkDict = {}
 trkStyle = con.WS_CHILD | con.WS_VISIBLE | con.TBS_AUTOTICKS | con.WS_CLIPCHILDREN
 
 # If reversed style is applied, trackbar returns a minus value. This is because, we use minus value range...
@@ -31,7 +32,8 @@ class TrackBar(Control):
                     "_lineSIze", "_noThumb", "_tooltip", "_chanPen", "_chanStyle", "_chanRc",
                     "_thumbRc", "_drawTic", "_ticPen", "_myRect", "_ticLen", "_custDraw", "_mouseOver", "_freeMove",
                     "_thumbHalf", "_range", "_selColor", "_selBrush", "onValueChanged", "onDragging",
-                    "onDragged", "_trackChange", "_lbDown", "_ticList", "_point1", "_point2" )
+                    "onDragged", "_trackChange", "_lbDown", "_ticCoords", "_ticPoints", "_ticCounts", "_ticLines", "_ticKey",
+                    "_point1", "_point2" )
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 150, height: int = 25, auto = False) -> None:
         super().__init__()
@@ -77,7 +79,11 @@ class TrackBar(Control):
         self._range = 0
         self._trackChange = TrackChange.NONE
         self._lbDown = False
-        self._ticList = [] # List of TicData [index, pysical pos, logical pos]
+        self._ticCoords = array("l") # x, y of both ends of each tic line. _ticPoints is a POINT view of this.
+        self._ticPoints = None
+        self._ticCounts = None # Point count of each tic line. It's always 2.
+        self._ticLines = 0
+        self._ticKey = None # Size, range, frequency & tic position used for the current tic lines.
         self._point1 = 0 # Needed for x or y point of tic.
         self._point2 = 0 # Needed for x or y point of tic only when TicPosition.BOTH flag on.
         self._selColor = Color(0x99ff33)
@@ -85,6 +91,8 @@ class TrackBar(Control):
         self._ticColor = Color(0x3385ff)
         self._bgColor = Color(parent._bgColor)
         self._selBrush = None
+        self._chanPen = None
+        self._ticPen = None
         self._hasBrush = True
         self._hwnd = None
         parent._controls.append(self)
@@ -105,9 +113,9 @@ class TrackBar(Control):
         if self._custDraw: self._prepareCustDraw()
         self._createControl()
         if self._hwnd:
-            trkDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             self._setSubclass(trkWndProc)
-            if self._custDraw: self._calcTics()
+            if self._custDraw: self._collectRects() # Tic lines are calculated on the first draw.
             if self._reversed:
                 api.SendMessage(self._hwnd, con.TBM_SETRANGEMIN, 1, (self._maxRange * -1))
                 api.SendMessage(self._hwnd, con.TBM_SETRANGEMAX, 1, self._minRange)
@@ -120,7 +128,8 @@ class TrackBar(Control):
             api.SendMessage(self._hwnd, con.TBM_SETLINESIZE, 0, self._lineSIze)
 
             if self._selRange: # We need to prepare a color and a brush
-                self._selBrush = api.CreateSolidBrush(self._selColor.ref)
+                if self._selBrush: GdiPool.release(self._selBrush)
+                self._selBrush = self._selColor.getBrush()
 
 
     def calsulateSize(self):
@@ -185,7 +194,7 @@ class TrackBar(Control):
         if self._noTics: self._style |= con.TBS_NOTICKS
         if self._noThumb: self._style |= con.TBS_NOTHUMB
         if self._tooltip: self._style |= con.TBS_TOOLTIPS
-        self._bkgBrush = self._bgColor.createHBrush()
+        self._resetBkgBrush()
 
     # Fill appropriate rects
     def _collectRects(self):
@@ -203,21 +212,6 @@ class TrackBar(Control):
             tw =  self._thumbRc.right - self._thumbRc.left
         self._thumbHalf = int(tw/2)
 
-    # Draw harizontal tics in down side
-    def _drawHorizTics(self, hdc, px, py):
-        api.MoveToEx(hdc, px, py, None)
-        api.LineTo(hdc, px, py + self._ticLen)
-
-    # Draw harizontal tics in up side
-    def _drawHorizTicsUpper(self, hdc, px, py):
-        api.MoveToEx(hdc, px, py, None)
-        api.LineTo(hdc, px, py - self._ticLen)
-
-    # Draw vertical tics
-    def _drawVertTics(self, hdc, px, py):
-        api.MoveToEx(hdc, px, py, None)
-        api.LineTo(hdc, px + self._ticLen, py)
-
     # Get the rect for thumb
     def _getThumbRect(self): # Useless ?
         rc = RECT()
@@ -227,34 +221,24 @@ class TrackBar(Control):
     # Internal function for drawing tics
     def _drawTics(self, hdc):
         # This function get called inside the custom draw part.
-        api.SelectObject(hdc, self._ticPen)
-        if self._vertical:
-            match self._ticPos:
-                case TickPosition.RIGHT | TickPosition.LEFT:
-                    for p in self._ticList:
-                        self._drawVertTics(hdc, self._point1, p.phy_point)
-                case TickPosition.BOTH:
-                    for p in self._ticList:
-                        self._drawVertTics(hdc, self._point1, p.phy_point)
-                        self._drawVertTics(hdc, self._point2, p.phy_point)
-
-        else:
-            match self._ticPos:
-                case TickPosition.UP | TickPosition.DOWN:
-                    for p in self._ticList:
-                        self._drawHorizTics(hdc, p.phy_point, self._point1)
-                case TickPosition.BOTH:
-                    for p in self._ticList:
-                        self._drawHorizTics(hdc, p.phy_point, self._point1)
-                        self._drawHorizTicsUpper(hdc, p.phy_point, self._point2)
+        # Tic lines are calculated only when the size, range, frequency or tic position changes.
+        # Then all of them are drawn with one PolyPolyline call.
+        api.GetClientRect(self._hwnd, byref(self._myRect))
+        key = (self._myRect.right, self._myRect.bottom, self._minRange, self._maxRange,
+               self._frequency, self._ticPos, self._ticLen, self._vertical)
+        if key != self._ticKey:
+            self._calcTics()
+            self._ticKey = key
+        if self._ticLines:
+            api.SelectObject(hdc, self._ticPen)
+            api.PolyPolyline(hdc, self._ticPoints, self._ticCounts, self._ticLines)
 
     # Calculated the distants for drawing tics
     def _calcTics(self):
-        # Calculating logical & physical positions for tics.
+        # Calculating physical positions for tics.
         self._collectRects()
         self._calcThumbOffset()
         self._range = self._maxRange - self._minRange
-        api.SendMessage(self._hwnd, con.TBM_SETLINESIZE, 0, self._frequency)
 
         numtics = self._range // self._frequency
         if self._range % self._frequency == 0: numtics -= 1
@@ -262,16 +246,14 @@ class TrackBar(Control):
         enpos = self._chanRc.right - self._thumbHalf
         channel_len = enpos - stpos
         pfactor = channel_len / self._range
-
-        tic = self._minRange + self._frequency
-        self._ticList.append(TicData( stpos, 0))
-        for i in range(numtics):
-            # print(f"{tic * pfactor = }, {tic = }")
-            self._ticList.append(TicData(int(tic * pfactor) + stpos, tic))
-            tic += self._frequency
-
-        self._ticList.append(TicData(enpos, self._range))
-        # print("P factor ", pfactor)
+        positions = [stpos]
+        positions.extend(int(i * self._frequency * pfactor) + stpos for i in range(1, numtics + 1))
+        positions.append(enpos)
+        self._setTicPoints()
+        self._buildTicLines(positions)
+
+    # Find the x or y point of the tic lines.
+    def _setTicPoints(self):
         if self._vertical:
             match self._ticPos:
                 case TickPosition.LEFT: self._point1 = self._thumbRc.left - 5
@@ -287,6 +269,31 @@ class TrackBar(Control):
                     self._point1 = self._thumbRc.bottom + 1
                     self._point2 = self._thumbRc.top - 3
 
+    # Fill the coordinate array. Each tic is a line of two points, one more line on the other side for BOTH.
+    def _buildTicLines(self, positions):
+        sides = [] # (x or y point, length) of the lines
+        if self._vertical:
+            match self._ticPos:
+                case TickPosition.RIGHT | TickPosition.LEFT: sides = [(self._point1, self._ticLen)]
+                case TickPosition.BOTH: sides = [(self._point1, self._ticLen), (self._point2, self._ticLen)]
+        else:
+            match self._ticPos:
+                case TickPosition.UP | TickPosition.DOWN: sides = [(self._point1, self._ticLen)]
+                case TickPosition.BOTH: sides = [(self._point1, self._ticLen), (self._point2, -self._ticLen)]
+
+        coords = array("l")
+        for point, length in sides:
+            end = point + length
+            for pos in positions:
+                if self._vertical:
+                    coords.extend((point, pos, end, pos))
+                else:
+                    coords.extend((pos, point, pos, end))
+        self._ticCoords = coords
+        self._ticLines = len(coords) // 4
+        self._ticPoints = (POINT * (self._ticLines * 2)).from_buffer(coords) if coords else None
+        self._ticCounts = (DWORD * self._ticLines)(*([2] * self._ticLines)) if coords else None
+
     # Filling channel rect with selection color.
     def _fillChannelRect(self, nm, trc):
         # If showSelection property is enabled in this trackbar,
@@ -324,8 +331,15 @@ class TrackBar(Control):
 
     # Preparing for custom draw
     def _prepareCustDraw(self):
-        self._chanPen = self._chanColor.createHPen()
-        self._ticPen = api.CreatePen(con.PS_SOLID, self._ticWidth, self._ticColor.ref)
+        self._releasePens()
+        self._chanPen = self._chanColor.getPen()
+        self._ticPen = self._ticColor.getPen(width = self._ticWidth)
+
+    def _releasePens(self):
+        for hpen in (self._chanPen, self._ticPen):
+            if hpen: GdiPool.release(hpen)
+        self._chanPen = None
+        self._ticPen = None
 
     # Handling wm_notify message
     def _wmNotifyHandler(self, lp):
@@ -377,7 +391,7 @@ class TrackBar(Control):
             self._bgColor = value
 
         if self._drawFlag & 2 != 2: self._drawFlag += 2
-        if self._isCreated: self._bkgBrush = self._bgColor.createHBrush()
+        if self._isCreated: self._resetBkgBrush()
         api.SendMessage(self._hwnd, con.TBM_SETRANGEMAX, 1, self._maxRange)
         self._manageRedraw()
 
@@ -631,156 +645,148 @@ class TrackBar(Control):
 # End TrackBar
 
 
-class TicData:
-    """Only for internal use.
-    This class is a helper class to hold the
-    tic logical positions and physical positions.
-    """
-    num = 0
-    def __init__(self, phyPoint: int, logPoint: int) -> None:
-        self.index = TicData.num
-        self.phy_point = phyPoint
-        self.log_point = logPoint
-        TicData.num += 1
-
-    def __str__(self) -> str:
-        return f"{self.index = }, {self.phy_point = }, {self.log_point = }"
-
-
-
 @SUBCLASSPROC # This decorator is essential.
 def trkWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # log_msg(msg)
-    trk = trkDict[hw]
-
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, trkWndProc, scID)
-            del trkDict[hw]
-
-        case MyMessages.HORI_SCROLL | MyMessages.VERT_SCROLL:
-            lwp = api.LOWORD(wp)
-            match lwp:
-                case con.TB_THUMBPOSITION:
-                    # Thumb dragging finished. Let's collect the value
-                    trk._setValueInternal(api.HIWORD(wp))
-
-                    # if freeMove property is false, we need to adjust the thumb on nearest tic.
-                    if not trk._freeMove: #Improve
-                        pos = trk._value
-                        half = trk._frequency // 2
-                        diff = trk._value % trk._frequency
-                        if diff >= half:
-                            pos = (trk._frequency - diff) + trk._value
-                        elif diff < half:
-                            pos =  trk._value - diff
-                        if trk._reversed:
-                            api.SendMessage(trk._hwnd, con.TBM_SETPOS, True, (pos * -1))
-                        else:
-                            api.SendMessage(trk._hwnd, con.TBM_SETPOS, True, pos)
-
-                        trk._value = pos
-
-                    # We need to refresh Trackbar in order to display our new drawings.
-                    api.InvalidateRect(hw, byref(trk._chanRc), False)
-
-                    trk._trackChange = TrackChange.MOUSE_DRAG
-                    if trk.onDragged: trk.onDragged(trk, EventArgs())
-                    if trk.onValueChanged: trk.onValueChanged(trk, EventArgs())
-
-                case  con.THUMB_LINE_HIGH:
-                    trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
-                    trk._trackChange = TrackChange.ARROW_HIGH
-                    # print(trk._trackChange)
-                    if trk.onValueChanged:
-                        trk.onValueChanged(trk, EventArgs())
-
-                case con.THUMB_LINE_LOW:
-                    trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
-                    trk._trackChange = TrackChange.ARROW_LOW
-                    # print(trk._trackChange)
-                    if trk.onValueChanged:
-                        trk.onValueChanged(trk, EventArgs())
-
-                case con.THUMB_PAGE_HIGH:
-                    trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
-                    # print("value ", trk._value)
-                    if not trk._lbDown:
-                        trk._trackChange = TrackChange.PAGE_HIGH
-                        # print(trk._trackChange, " 458 ")
-
-                    if trk.onValueChanged:
-                        trk.onValueChanged(trk, EventArgs())
-
-                case con.THUMB_PAGE_LOW:
-                    trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
-                    trk._trackChange = TrackChange.PAGE_LOW
-                    # print(trk._trackChange)
-                    if trk.onValueChanged:
-                        trk.onValueChanged(trk, EventArgs())
-
-                case con.TB_THUMBTRACK: # User dragging thumb.
-                    trk._setValueInternal(api.HIWORD(wp))
-                    # api.InvalidateRect(hw, byref(trk._chanRc), False)
-                    if trk.onDragging: trk.onDragging(trk, EventArgs())
-
-        case MyMessages.LABEL_COLOR:
-            # api.SetBkColor(wp, trk._bgColor.ref)
-            return trk._bkgBrush
-
-        case MyMessages.CTRL_NOTIFY:
-            nmh = cast(lp, api.LPNMHDR)[0]
-            match nmh.code:
-                case con.NM_CUSTOMDRAW:
-                    if trk._custDraw:
-                        nmcd = cast(lp, LPNMCUSTOMDRAW)[0]
-                        match nmcd.dwDrawStage:
-                            case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
-                            case con.CDDS_ITEMPREPAINT:
-                                # print(f"{nmcd.dwItemSpec = }, {con.TBCD_TICS = }, {con.TBCD_CHANNEL = }")
-                                if nmcd.dwItemSpec == con.TBCD_CHANNEL:
-                                    if trk._chanStyle == ChannelStyle.CLASSIC:
-                                        api.DrawEdge(nmcd.hdc, byref(nmcd.rc), con.EDGE_SUNKEN, con.BF_RECT | con.BF_ADJUST) # 1 style
-                                    elif trk._chanStyle == ChannelStyle.OUTLINE:
-                                        api.SelectObject(nmcd.hdc, trk._chanPen)
-                                        api.Rectangle(nmcd.hdc, nmcd.rc.left, nmcd.rc.top, nmcd.rc.right, nmcd.rc.bottom )
-                                    else:
-                                        return con.CDRF_DODEFAULT
-
-                                    if trk._selRange: # Fill the selection range
-                                        rc = trk._getThumbRect()
-                                        if trk._fillChannelRect(nmcd, rc):
-                                            api.InvalidateRect(hw, byref(nmcd.rc), False)
-                                    return con.CDRF_SKIPDEFAULT
-
-                                if nmcd.dwItemSpec == con.TBCD_TICS:
-
-                                    if not trk._noTics:
-                                        trk._drawTics(nmcd.hdc)
-                                        return con.CDRF_SKIPDEFAULT
-                                    else: con.CDRF_DODEFAULT
-
-                        return con.CDRF_DODEFAULT
-
-                case 4294967280: # con.TRBN_THUMBPOSCHANGING:
-                    trk._trackChange = TrackChange.MOUSE_CLICK
-                    return con.CDRF_DODEFAULT
-            return 0 #api.DefSubclassProc(hw, msg, wp, lp)
-
-        case con.WM_SETFOCUS: trk._gotFocusHandler()
-        case con.WM_KILLFOCUS: trk._lostFocusHandler()
-        case con.WM_LBUTTONDOWN:
-            trk._lbDown = True
-            trk._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP:
-            trk._lbDown = False
-            trk._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: trk._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: trk._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: trk._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: trk._mouseMoveHandler(msg, wp, lp)
-        case con.WM_MOUSELEAVE: trk._mouseLeaveHandler()
+    trk = HwndRegistry.get(hw)
+    handler = trk._msgMap.get(msg)
+    if handler:
+        ret = handler(trk, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, trkWndProc, scID)
+        trk._releaseBkgBrush()
+        trk._releasePens()
+        if trk._selBrush: GdiPool.release(trk._selBrush)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
 
+def _trkScrollMsg(trk, hw, msg, wp, lp):
+    lwp = api.LOWORD(wp)
+    match lwp:
+        case con.TB_THUMBPOSITION:
+            # Thumb dragging finished. Let's collect the value
+            trk._setValueInternal(api.HIWORD(wp))
+
+            # if freeMove property is false, we need to adjust the thumb on nearest tic.
+            if not trk._freeMove: #Improve
+                pos = trk._value
+                half = trk._frequency // 2
+                diff = trk._value % trk._frequency
+                if diff >= half:
+                    pos = (trk._frequency - diff) + trk._value
+                elif diff < half:
+                    pos =  trk._value - diff
+                if trk._reversed:
+                    api.SendMessage(trk._hwnd, con.TBM_SETPOS, True, (pos * -1))
+                else:
+                    api.SendMessage(trk._hwnd, con.TBM_SETPOS, True, pos)
+
+                trk._value = pos
+
+            # We need to refresh Trackbar in order to display our new drawings.
+            api.InvalidateRect(hw, byref(trk._chanRc), False)
+
+            trk._trackChange = TrackChange.MOUSE_DRAG
+            if trk.onDragged: trk.onDragged(trk, EventArgs())
+            if trk.onValueChanged: trk.onValueChanged(trk, EventArgs())
+
+        case  con.THUMB_LINE_HIGH:
+            trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
+            trk._trackChange = TrackChange.ARROW_HIGH
+            # print(trk._trackChange)
+            if trk.onValueChanged:
+                trk.onValueChanged(trk, EventArgs())
+
+        case con.THUMB_LINE_LOW:
+            trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
+            trk._trackChange = TrackChange.ARROW_LOW
+            # print(trk._trackChange)
+            if trk.onValueChanged:
+                trk.onValueChanged(trk, EventArgs())
+
+        case con.THUMB_PAGE_HIGH:
+            trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
+            # print("value ", trk._value)
+            if not trk._lbDown:
+                trk._trackChange = TrackChange.PAGE_HIGH
+                # print(trk._trackChange, " 458 ")
+
+            if trk.onValueChanged:
+                trk.onValueChanged(trk, EventArgs())
+
+        case con.THUMB_PAGE_LOW:
+            trk._setValueInternal(api.SendMessage(hw, con.TBM_GETPOS, 0, 0))
+            trk._trackChange = TrackChange.PAGE_LOW
+            # print(trk._trackChange)
+            if trk.onValueChanged:
+                trk.onValueChanged(trk, EventArgs())
+
+        case con.TB_THUMBTRACK: # User dragging thumb.
+            trk._setValueInternal(api.HIWORD(wp))
+            # api.InvalidateRect(hw, byref(trk._chanRc), False)
+            if trk.onDragging: trk.onDragging(trk, EventArgs())
+
+def _trkLabelColorMsg(trk, hw, msg, wp, lp):
+    # api.SetBkColor(wp, trk._bgColor.ref)
+    return trk._bkgBrush
+
+def _trkNotifyMsg(trk, hw, msg, wp, lp):
+    nmh = cast(lp, api.LPNMHDR)[0]
+    match nmh.code:
+        case con.NM_CUSTOMDRAW:
+            if trk._custDraw:
+                nmcd = cast(lp, LPNMCUSTOMDRAW)[0]
+                match nmcd.dwDrawStage:
+                    case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
+                    case con.CDDS_ITEMPREPAINT:
+                        # print(f"{nmcd.dwItemSpec = }, {con.TBCD_TICS = }, {con.TBCD_CHANNEL = }")
+                        if nmcd.dwItemSpec == con.TBCD_CHANNEL:
+                            if trk._chanStyle == ChannelStyle.CLASSIC:
+                                api.DrawEdge(nmcd.hdc, byref(nmcd.rc), con.EDGE_SUNKEN, con.BF_RECT | con.BF_ADJUST) # 1 style
+                            elif trk._chanStyle == ChannelStyle.OUTLINE:
+                                api.SelectObject(nmcd.hdc, trk._chanPen)
+                                api.Rectangle(nmcd.hdc, nmcd.rc.left, nmcd.rc.top, nmcd.rc.right, nmcd.rc.bottom )
+                            else:
+                                return con.CDRF_DODEFAULT
+
+                            if trk._selRange: # Fill the selection range
+                                rc = trk._getThumbRect()
+                                if trk._fillChannelRect(nmcd, rc):
+                                    api.InvalidateRect(hw, byref(nmcd.rc), False)
+                            return con.CDRF_SKIPDEFAULT
+
+                        if nmcd.dwItemSpec == con.TBCD_TICS:
+
+                            if not trk._noTics:
+                                trk._drawTics(nmcd.hdc)
+                                return con.CDRF_SKIPDEFAULT
+                            else: con.CDRF_DODEFAULT
+
+                return con.CDRF_DODEFAULT
+
+        case 4294967280: # con.TRBN_THUMBPOSCHANGING:
+            trk._trackChange = TrackChange.MOUSE_CLICK
+            return con.CDRF_DODEFAULT
+    return 0 #api.DefSubclassProc(hw, msg, wp, lp)
+
+def _trkLButtonDownMsg(trk, hw, msg, wp, lp):
+    trk._lbDown = True
+    trk._leftMouseDownHandler(msg, wp, lp)
+
+def _trkLButtonUpMsg(trk, hw, msg, wp, lp):
+    trk._lbDown = False
+    trk._leftMouseUpHandler(msg, wp, lp)
+
+TrackBar._msgTable = makeMsgMap({
+    MyMessages.HORI_SCROLL: _trkScrollMsg,
+    MyMessages.VERT_SCROLL: _trkScrollMsg,
+    MyMessages.LABEL_COLOR: _trkLabelColorMsg,
+    MyMessages.CTRL_NOTIFY: _trkNotifyMsg,
+    con.WM_LBUTTONDOWN: _trkLButtonDownMsg,
+    con.WM_LBUTTONUP: _trkLButtonUpMsg,
+})
+
+
@@ -2,7 +2,7 @@
 from ctypes.wintypes import HWND, UINT, HDC
 from ctypes import cast, addressof, create_unicode_buffer, c_wchar_p
 import ctypes as ctp
-from pyforms.src.control import Control
+from pyforms.src.control import Control, HwndRegistry, makeMsgMap
 import pyforms.src.constants as con
 from pyforms.src.commons import MyMessages
 from pyforms.src.enums import ControlType, NodeOp
@@ -12,7 +12,6 @@ from pyforms.src.colors import Color
 # from horology import Timing
 # from .winmsgs import log_msg
 
-tvDict = {}
 tvStyle = con.WS_VISIBLE|con.WS_CHILD|con.TVS_HASLINES|con.TVS_HASBUTTONS|con.TVS_LINESATROOT|con.TVS_DISABLEDRAGDROP|con.WS_BORDER
 
 
@@ -24,7 +23,7 @@ class TreeView(Control):
     _count = 1
     __slots__ = ( "_noLines", "_noButtons", "_hasCheckBox", "_fullRowSel", "_editable", "_nodeClrChange",
     			 "_showSel", "_hotTrack", "_lineColor", "_selNode", "_nodes", "_nodeCount",
-                 "_nxtNodeHwnd", "_uniqNodeID", "_nodeDict")
+                 "_nxtNodeHwnd", "_uniqNodeID", "_nodeDict", "_unloadOnCollapse")
 
     def __init__(self, parent, xpos: int = 10, ypos: int = 10, width: int = 80, height: int = 24, auto = False ) -> None:
         super().__init__()
@@ -55,6 +54,7 @@ class TreeView(Control):
         self._nxtNodeHwnd = 0
         self._uniqNodeID = 100
         self._nodeDict = {} # This dict will hold all the nodes.
+        self._unloadOnCollapse = False
         self._hwnd = None
         parent._controls.append(self)
         #Events
@@ -69,7 +69,7 @@ class TreeView(Control):
         self._createControl()
         if self._hwnd:
             # print("treeview hwnd ", self._hwnd)
-            tvDict[self._hwnd] = self
+            HwndRegistry.add(self._hwnd, self)
             # self._setSubclass(tvWndProc)
             api.SetWindowSubclass(self._hwnd, tvWndProc, Control._subclass_id, id(self))
             Control._subclass_id += 1
@@ -207,9 +207,63 @@ class TreeView(Control):
         if node._imgIndex > -1: tvi.mask |= con.TVIF_IMAGE
         if node._selImgIndex > -1: tvi.mask |= con.TVIF_SELECTEDIMAGE
         if node._fgColor.value != 0x000000: self._nodeClrChange = True
+        if node._loader:
+            # TreeView will ask us through TVN_GETDISPINFOW whether this node has children.
+            # So we can show the expand button without loading the children.
+            tvi.mask |= con.TVIF_CHILDREN
+            tvi.cChildren = con.I_CHILDRENCALLBACK
         return tvi
 
 
+    def _getDispInfoHandler(self, lpm):
+        item = cast(lpm, api.LPNMTVDISPINFOW).contents.item
+        if item.mask & con.TVIF_CHILDREN:
+            node = cast(item.lParam, ctp.py_object).value
+            item.cChildren = 1 if node._nodeCount or (node._hasChildren and not node._isLoaded) else 0
+
+
+    def _itemExpandingHandler(self, lpm):
+        nmtv = cast(lpm, api.LPNMTREEVIEWW).contents
+        if nmtv.action == con.TVE_EXPAND:
+            node = cast(nmtv.itemNew.lParam, ctp.py_object).value
+            if node._loader and not node._isLoaded: self._loadChildren(node)
+        return 0 # Returning non zero will prevent the expansion.
+
+
+    def _itemExpandedHandler(self, lpm):
+        if not self._unloadOnCollapse: return
+        nmtv = cast(lpm, api.LPNMTREEVIEWW).contents
+        if nmtv.action == con.TVE_COLLAPSE:
+            node = cast(nmtv.itemNew.lParam, ctp.py_object).value
+            if node._loader and node._isLoaded: self._unloadChildren(node)
+
+
+    def _loadChildren(self, node):
+        # Children of this node are materialized only now, when the user expands it.
+        # Node is marked as loaded only after the loader returns. If it raises, next expansion will try again.
+        children = node._loader(node)
+        node._isLoaded = True
+        if children:
+            for child in children: self._manageNodeOps(NodeOp.ADD_CHILD, child, pnode=node)
+
+        if node._nodeCount == 0:
+            # Loader gave nothing, so remove the expand button.
+            tvi = api.TVITEMW()
+            tvi.mask = con.TVIF_CHILDREN
+            tvi.hItem = node._hwnd
+            tvi.cChildren = 0
+            api.SendMessage(self._hwnd, con.TVM_SETITEMW, 0, addressof(tvi))
+
+
+    def _unloadChildren(self, node):
+        # TVE_COLLAPSERESET will delete the child items from TreeView.
+        # Next expansion will call the loader again.
+        node._isLoaded = False
+        api.SendMessage(self._hwnd, con.TVM_EXPAND, con.TVE_COLLAPSE | con.TVE_COLLAPSERESET, node._hwnd.value)
+        node._nodes.clear()
+        node._nodeCount = 0
+
+
     def _changeTVItemProps(self, prop, value):
         tvi = api.TVITEMEXW()
         if prop == 1:
@@ -304,6 +358,18 @@ class TreeView(Control):
     def hotTrack(self, value: bool): self._hotTrack = value
 
 
+    @property
+    def unloadOnCollapse(self):
+        """Returns true if lazy loaded children are deleted when their parent node collapses"""
+        return self._unloadOnCollapse
+
+    @unloadOnCollapse.setter
+    def unloadOnCollapse(self, value: bool):
+        """Set true to delete lazy loaded children when their parent node collapses.
+            Loader will be called again on next expansion."""
+        self._unloadOnCollapse = value
+
+
     @property
     def nodeCount(self): return self._nodeCount
 
@@ -334,9 +400,10 @@ class TreeView(Control):
 class TreeNode:
 
     __slots__ = ("_hwnd", "_parentNode", "_nodes", "_imgIndex", "_selImgIndex", "_nodeCount", "_fgColor",
-                 "_bgColor", "_checked", "_text", "_index", "_nodeID", "_treeHwnd", "_isCreated", "_notifyHandler" )
+                 "_bgColor", "_checked", "_text", "_index", "_nodeID", "_treeHwnd", "_isCreated", "_notifyHandler",
+                 "_loader", "_hasChildren", "_isLoaded" )
 
-    def __init__(self, text: str) -> None:
+    def __init__(self, text: str, loader = None) -> None:
         self._nodes = []
         self._imgIndex = -1
         self._selImgIndex = -1
@@ -350,6 +417,9 @@ class TreeNode:
         self._treeHwnd = 0
         self._isCreated = False
         self._notifyHandler = 0
+        self._loader = loader
+        self._hasChildren = loader is not None
+        self._isLoaded = False
 
     @property
     def imageIndex(self): return self._imgIndex
@@ -380,6 +450,37 @@ class TreeNode:
         self._bgColor = Color(value)
         if self._isCreated: self._notifyHandler(self, "backColor", value)
 
+    @property
+    def loader(self):
+        """Get the function which loads the children of this node"""
+        return self._loader
+
+    @loader.setter
+    def loader(self, value):
+        """Set a function to load the children of this node when it expands for the first time.
+            Set this before adding the node. Signature - func(node: TreeNode) -> list[TreeNode]"""
+        self._loader = value
+        self._hasChildren = value is not None
+
+    @property
+    def hasChildren(self):
+        """Returns true if this node has or might have children"""
+        return self._nodeCount > 0 or (self._hasChildren and not self._isLoaded)
+
+    @hasChildren.setter
+    def hasChildren(self, value: bool):
+        """Set false if you know that the loader will not give any children.
+            Then TreeView will not show the expand button."""
+        self._hasChildren = value
+
+    @property
+    def isLoaded(self):
+        """Returns true if the children of this node are loaded"""
+        return self._isLoaded
+
+    @property
+    def nodes(self): return self._nodes
+
     @property
     def text(self): return self._text
 
@@ -394,52 +495,37 @@ class TreeNode:
 @SUBCLASSPROC
 def tvWndProc(hw, msg, wp, lp, scID, refData) -> LRESULT:
     # log_msg(msg)
-    # with Timing("py obj time : "):
-    tv = tvDict[hw]
-        # tv = cast(refData, ctp.py_object).value
-    match msg:
-        case con.WM_DESTROY:
-            api.RemoveWindowSubclass(hw, tvWndProc, scID)
-            del tvDict[hw]
-
-        case MyMessages.CTRL_NOTIFY:
-            nmh = cast(lp, LPNMHDR).contents
-            match nmh.code:
-                case con.NM_CUSTOMDRAW:
-                    nmcd = cast(lp, LPNMCUSTOMDRAW).contents
-                    match nmcd.dwDrawStage:
-                        case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
-                        case con.CDDS_ITEMPREPAINT:
-                            if nmcd.lItemParam:
-                                # node = tv._nodeDict[nmcd.lItemParam]
-                                # node = ctp.py_object.from_param(nmcd.lItemParam)
-                                # with Timing("node time : "):
-                                    # node = tv._nodeDict.get(nmcd.lItemParam, 0)
-                                node = cast(nmcd.lItemParam, ctp.py_object).value
-                                # print(f"{nmcd.dwItemSpec = }, {nmcd.lItemParam = }, {node._text = }")
-                                return con.CDRF_DODEFAULT
-
-        #     if nm.hdr.code == con.UDN_DELTAPOS:
-        #         tv._value = float(tv._getCtrlTextEx(tv._buddy_hwnd))
-        #         tv._set_numpick_value(nm.iDelta)
-        #         tv._display_value()
-        #         if tv.on_value_changed: tv.on_value_changed(np, EventArgs())
-
-        case con.WM_SETFOCUS: tv._gotFocusHandler()
-        case con.WM_KILLFOCUS: tv._lostFocusHandler()
-        case con.WM_LBUTTONDOWN: tv._leftMouseDownHandler(msg, wp, lp)
-        case con.WM_LBUTTONUP: tv._leftMouseUpHandler(msg, wp, lp)
-        case con.WM_RBUTTONDOWN: tv._rightMouseDownHandler(msg, wp, lp)
-        case con.WM_RBUTTONUP: tv._rightMouseUpHandler(msg, wp, lp)
-        case con.WM_MOUSEWHEEL: tv._mouseWheenHandler(msg, wp, lp)
-        case con.WM_MOUSEMOVE: tv._mouseMoveHandler(msg, wp, lp)
-        # case con.WM_MOUSELEAVE:
-        #     if tv._track_mouse_leave:
-        #         if not tv._is_mouse_upon_me():
-        #             tv._isMouseEntered = False
-        #             if tv.on_mouse_leave: tv.on_mouse_leave(np, EventArgs())
+    tv = HwndRegistry.get(hw)
+    handler = tv._msgMap.get(msg)
+    if handler:
+        ret = handler(tv, hw, msg, wp, lp)
+        if ret is not None: return ret
+    elif msg == con.WM_DESTROY:
+        api.RemoveWindowSubclass(hw, tvWndProc, scID)
+        HwndRegistry.remove(hw)
 
     return api.DefSubclassProc(hw, msg, wp, lp)
 
 
+def _tvNotifyMsg(tv, hw, msg, wp, lp):
+    nmh = cast(lp, LPNMHDR).contents
+    match nmh.code:
+        case con.NM_CUSTOMDRAW:
+            nmcd = cast(lp, LPNMCUSTOMDRAW).contents
+            match nmcd.dwDrawStage:
+                case con.CDDS_PREPAINT: return con.CDRF_NOTIFYITEMDRAW
+                case con.CDDS_ITEMPREPAINT:
+                    if nmcd.lItemParam:
+                        # node = tv._nodeDict.get(nmcd.lItemParam, 0)
+                        node = cast(nmcd.lItemParam, ctp.py_object).value
+                        return con.CDRF_DODEFAULT
+
+        case con.TVN_GETDISPINFOW: tv._getDispInfoHandler(lp)
+        case con.TVN_ITEMEXPANDINGW: return tv._itemExpandingHandler(lp)
+        case con.TVN_ITEMEXPANDEDW: tv._itemExpandedHandler(lp)
+
+# Mouse leave is not handled here.
+TreeView._msgTable = makeMsgMap({MyMessages.CTRL_NOTIFY: _tvNotifyMsg}, exclude = (con.WM_MOUSELEAVE,))
+
+
 
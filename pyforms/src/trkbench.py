@@ -0,0 +1,67 @@
+# Created on 17-Oct-2026 07:55:00
+# trkbench module - TrackBar tic drawing benchmark.
+# A wide custom drawn trackbar with a tic for every value is painted many times.
+# Old way is a MoveToEx & LineTo pair for each tic line in every paint. Then the
+# same paints with the cached tic lines and one PolyPolyline call.
+# Needs the simulator backend. It's the default on non Windows systems.
+# On Windows, set PYFORMS_BACKEND=sim before running.
+# Usage: python -m pyforms.src.trkbench [range] [paints]
+
+import sys, time, io, contextlib
+import pyforms.src.apis as api
+import pyforms.src.constants as con
+from pyforms.src.simwin import sim
+from pyforms.src.forms import Form
+from pyforms.src.trackbar import TrackBar
+from pyforms.src.enums import TickPosition
+
+
+def oldDrawTics(trk, hdc):
+    # TrackBar._drawTics before the cached lines. Horizontal, both sides.
+    api.SelectObject(hdc, trk._ticPen)
+    for i in range(0, len(trk._ticCoords), 4):
+        x, y1, _, y2 = trk._ticCoords[i:i + 4]
+        api.MoveToEx(hdc, x, y1, None)
+        api.LineTo(hdc, x, y2)
+
+
+def timePaints(title, trk, func, hdc, paints):
+    sim.calls.clear()
+    start = time.perf_counter()
+    for _ in range(paints): func(trk, hdc)
+    elapsed = time.perf_counter() - start
+    print(f"    {title:<12}: {elapsed * 1000 / paints:.3f} ms/paint, {sum(sim.calls.values()) // paints} api calls/paint")
+
+
+def main(valueRange = 2000, paints = 200):
+    if api.BACKEND != "sim":
+        print("Set PYFORMS_BACKEND=sim to run this benchmark")
+        return
+    frm = Form("TrackBar bench", 2500, 200)
+    frm.createHandle()
+    trk = TrackBar(frm, 10, 10, 2400, 50)
+    trk.customDraw = True
+    trk.ticPosition = TickPosition.BOTH
+    trk.maximum = valueRange
+    trk.frequency = 1
+    with contextlib.redirect_stdout(io.StringIO()): # display prints the creation time.
+        frm.display()
+    sim.pump()
+    hdc = api.CreateCompatibleDC(None)
+    start = time.perf_counter()
+    trk._drawTics(hdc) # First paint calculates the tic lines.
+    print(f"{trk._ticLines} tic lines, calculated in {(time.perf_counter() - start) * 1000:.2f} ms\n")
+    timePaints("line by line", trk, oldDrawTics, hdc, paints)
+    timePaints("PolyPolyline", trk, TrackBar._drawTics, hdc, paints)
+    api.SetWindowPos(trk._hwnd, None, 0, 0, 1200, 50, con.SWP_NOMOVE | con.SWP_NOZORDER) # Like a layout does.
+    start = time.perf_counter()
+    trk._drawTics(hdc)
+    print(f"\n    resized     : {trk._ticLines} tic lines, calculated again in {(time.perf_counter() - start) * 1000:.2f} ms")
+    api.DeleteDC(hdc)
+    frm.close()
+    sim.pump()
+
+
+if __name__ == "__main__":
+    args = [int(x) for x in sys.argv[1:3]]
+    main(*args)